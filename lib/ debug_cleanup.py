@@ -1,14 +1,21 @@
 # lib/debug_cleanup.py
 """
-Debug and cleanup script for Personal Finance Tracker.
-Use this to investigate database issues and clean up test data.
+Debug, cleanup and maintenance script for Personal Finance Tracker.
+Use this to investigate database issues, clean up test data and keep the
+database healthy (statistics, vacuum, integrity checks, verification of the
+running totals and a size report - see maintenance.py).
 """
 
 from models import create_tables, get_session
 from models.user import User
 from models.category import Category
 from models.transaction import Transaction
+from models.user_balance import UserBalance
+from models.monthly_rollup import MonthlyRollup
+from models.archive import ArchiveState, archived_transactions, attach
+from models.cache import clear_caches
 import sqlite3
+import maintenance
 
 def inspect_database():
     """Inspect the database directly to see what's actually stored"""
@@ -93,9 +100,19 @@ def clean_database():
     
     session = get_session()
     try:
+        # Attach the archive before the first write (SQLite can't ATTACH inside a transaction)
+        has_archive = attach(session.connection())
+        
         # Delete in correct order due to foreign key constraints
+        session.query(UserBalance).delete()
+        session.query(MonthlyRollup).delete()
+        
         deleted_transactions = session.query(Transaction).count()
         session.query(Transaction).delete()
+        # User IDs are handed out again after this, so archived rows must go too
+        if has_archive:
+            deleted_transactions += session.execute(archived_transactions.delete()).rowcount
+        session.query(ArchiveState).delete()
         
         deleted_categories = session.query(Category).count()
         session.query(Category).delete()
@@ -104,6 +121,8 @@ def clean_database():
         session.query(User).delete()
         
         session.commit()
+        # Cached users and categories would outlive the rows
+        clear_caches()
         print(f"✅ Cleaned database:")
         print(f"  - Deleted {deleted_transactions} transactions")
         print(f"  - Deleted {deleted_categories} categories")
@@ -135,16 +154,148 @@ def create_test_user():
         print(f"❌ Error creating test user: {e}")
         return None
 
+def rebuild_balances():
+    """Recompute the summary tables and the search index from the transactions"""
+    print("\n🔁 REBUILDING SUMMARY TABLES...")
+    
+    try:
+        rows = UserBalance.rebuild()
+        print(f"✅ Rebuilt balances for {rows} users")
+        rows = MonthlyRollup.rebuild()
+        print(f"✅ Rebuilt {rows} monthly rollup rows")
+        Transaction.rebuild_search_index()
+        print("✅ Rebuilt the transaction search index")
+    except Exception as e:
+        print(f"❌ Error rebuilding summary tables: {e}")
+
+def check_category_counters():
+    """Verify the running category counters against the transactions and optionally repair them"""
+    print("\n✔️  CHECKING CATEGORY COUNTERS...")
+    
+    try:
+        mismatches = Category.check_counters()
+        if not mismatches:
+            print("✅ All category counters match the transactions")
+            return
+        
+        for mismatch in mismatches:
+            print(f"  {mismatch['name']} (ID {mismatch['id']}): "
+                  f"spent {mismatch['stored_spent']:.2f} vs {mismatch['actual_spent']:.2f}, "
+                  f"count {mismatch['stored_count']} vs {mismatch['actual_count']}")
+        
+        confirmation = input(f"Repair {len(mismatches)} categories? (yes/no): ").strip().lower()
+        if confirmation == 'yes':
+            Category.check_counters(repair=True)
+            print("✅ Category counters repaired")
+        else:
+            print("Repair cancelled.")
+    except Exception as e:
+        print(f"❌ Error checking category counters: {e}")
+
+def optimize_database():
+    """Refresh the query planner's statistics"""
+    print("\n📈 ANALYZING DATABASE...")
+    
+    try:
+        analyzed = maintenance.analyze()
+        print(f"✅ Statistics refreshed for {analyzed} indexes")
+    except Exception as e:
+        print(f"❌ Error analyzing database: {e}")
+
+def vacuum_database():
+    """Give free pages back to the file system"""
+    print("\n🗜️  VACUUMING DATABASE...")
+    
+    try:
+        result = maintenance.vacuum()
+        if result['full']:
+            print("ℹ️  Switched to incremental auto-vacuum (one-off full VACUUM)")
+        print(f"✅ Freed {result['freed_pages']} pages ({result['freed_bytes'] / 1024:.1f} KiB)")
+    except Exception as e:
+        print(f"❌ Error vacuuming database: {e}")
+
+def check_database_integrity():
+    """Run SQLite's integrity and foreign key checks"""
+    print("\n🩺 CHECKING DATABASE INTEGRITY...")
+    
+    try:
+        problems = maintenance.integrity_check()
+        if problems:
+            for problem in problems:
+                print(f"  ❌ {problem}")
+        else:
+            print("✅ Integrity check passed")
+        
+        orphans = maintenance.foreign_key_check()
+        if orphans:
+            for orphan in orphans:
+                print(f"  ❌ {orphan['table']} row {orphan['rowid']} points at a missing {orphan['parent']} row")
+        else:
+            print("✅ Foreign key check passed")
+    except Exception as e:
+        print(f"❌ Error checking integrity: {e}")
+
+def verify_summary_tables():
+    """Verify the running totals against the transactions, in batches"""
+    print("\n🧮 VERIFYING RUNNING TOTALS...")
+    
+    try:
+        result = maintenance.verify_aggregates(
+            progress=lambda checked: print(f"  {checked} users checked...", end="\r")
+        )
+        print(f"Checked {result['users_checked']} users in {result['batches']} batches")
+        for mismatch in result['balances']:
+            print(f"  ❌ Balance of user {mismatch['user_id']}: income {mismatch['stored_income']:.2f} vs "
+                  f"{mismatch['actual_income']:.2f}, expenses {mismatch['stored_expenses']:.2f} vs "
+                  f"{mismatch['actual_expenses']:.2f}, count {mismatch['stored_count']} vs {mismatch['actual_count']}")
+        for mismatch in result['rollups']:
+            print(f"  ❌ Rollup {mismatch['year_month']} of user {mismatch['user_id']} "
+                  f"(category {mismatch['category_id']}): count {mismatch['stored_count']} vs {mismatch['actual_count']}")
+        for mismatch in result['categories']:
+            print(f"  ❌ Category {mismatch['name']} (ID {mismatch['id']}): "
+                  f"count {mismatch['stored_count']} vs {mismatch['actual_count']}")
+        
+        if result['balances'] or result['rollups']:
+            print("Use 'Rebuild Summary Tables' to recompute balances and rollups.")
+        if result['categories']:
+            print("Use 'Check Category Counters' to repair the category counters.")
+        if not (result['balances'] or result['rollups'] or result['categories']):
+            print("✅ All running totals match the transactions")
+    except Exception as e:
+        print(f"❌ Error verifying running totals: {e}")
+
+def show_database_sizes():
+    """Show how much space each table and index takes"""
+    print("\n📦 DATABASE SIZE...")
+    
+    try:
+        report = maintenance.size_report()
+        print(f"File: {report['total_bytes'] / 1024:.1f} KiB ({report['free_bytes'] / 1024:.1f} KiB free)")
+        if report['objects'] is None:
+            print("Per-table sizes need SQLite's dbstat table, which this build doesn't have.")
+            return
+        for item in report['objects']:
+            print(f"  {item['name']:<45} {item['type']:<8} {item['bytes'] / 1024:>10.1f} KiB")
+    except Exception as e:
+        print(f"❌ Error reading database sizes: {e}")
+
 def show_menu():
     """Show debug menu options"""
     print("\n" + "="*50)
-    print("🛠️  DEBUG & CLEANUP MENU")
+    print("🛠️  DEBUG, CLEANUP & MAINTENANCE MENU")
     print("="*50)
     print("1. 🔍 Inspect Database")
     print("2. 🧪 Test User Operations")
     print("3. 👤 Create Test User")
     print("4. 🧹 Clean Database")
     print("5. 🔄 Full Reset (Clean + Create Test User)")
+    print("6. 🔁 Rebuild Summary Tables")
+    print("7. ✔️  Check Category Counters")
+    print("8. 📈 Analyze (Refresh Planner Statistics)")
+    print("9. 🗜️  Vacuum")
+    print("10. 🩺 Integrity & Foreign Key Check")
+    print("11. 🧮 Verify Running Totals")
+    print("12. 📦 Table & Index Sizes")
     print("0. 🚪 Exit")
     print("="*50)
 
@@ -173,6 +324,20 @@ def main():
         elif choice == "5":
             clean_database()
             create_test_user()
+        elif choice == "6":
+            rebuild_balances()
+        elif choice == "7":
+            check_category_counters()
+        elif choice == "8":
+            optimize_database()
+        elif choice == "9":
+            vacuum_database()
+        elif choice == "10":
+            check_database_integrity()
+        elif choice == "11":
+            verify_summary_tables()
+        elif choice == "12":
+            show_database_sizes()
         else:
             print("❌ Invalid choice.")
 
@@ -0,0 +1,151 @@
+# lib/analytics.py
+"""
+Columnar analytics over a user's transaction history for Personal Finance Tracker.
+
+Ledger.load() pulls the (date, amount, category) columns for a user straight
+from a Core select into NumPy arrays - no ORM objects, no Money objects per row -
+and every statistic is then computed with vectorized array operations.
+
+Amounts stay in integer cents inside the arrays, so totals and balance curves
+are exact; scalar results come back as Money.
+"""
+
+import numpy as np
+from sqlalchemy import select, func, Integer, String, type_coerce
+
+from models import engine
+from models.money import Money, CENTS_PER_UNIT
+from models.transaction import Transaction
+from models.archive import history_table
+
+# category_id used in the arrays for transactions without a category
+NO_CATEGORY = 0
+
+class Ledger:
+    """
+    A user's transactions as parallel NumPy arrays, oldest first:
+      dates        - datetime64[s]
+      amounts      - int64 cents (positive income, negative expenses)
+      category_ids - int64 (NO_CATEGORY when uncategorized)
+    """
+
+    def __init__(self, dates, amounts, category_ids):
+        self.dates = dates
+        self.amounts = amounts
+        self.category_ids = category_ids
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __repr__(self):
+        return f"<Ledger(transactions={len(self)})>"
+
+    @classmethod
+    def build_query(cls, user_id, start=None, end=None, source=None):
+        """
+        Core select of (date text, cents, category id) for a user, oldest first.
+        source replaces the transactions table, e.g. with archive.history_table()
+        """
+        table = Transaction.__table__ if source is None else source
+        query = select(
+            # Skip the per-row datetime and Money conversions; NumPy parses the raw values in bulk
+            type_coerce(table.c.transaction_date, String),
+            type_coerce(table.c.amount_cents, Integer),
+            func.coalesce(table.c.category_id, NO_CATEGORY)
+        ).where(table.c.user_id == user_id)
+        if start is not None:
+            query = query.where(table.c.transaction_date >= start)
+        if end is not None:
+            query = query.where(table.c.transaction_date <= end)
+        return query.order_by(table.c.transaction_date, table.c.id)
+
+    @classmethod
+    def load(cls, user_id, start=None, end=None):
+        """Load a user's transactions (optionally within a date range, archived ones included) into arrays"""
+        with engine.connect() as connection:
+            source = history_table(connection, start)
+            rows = connection.execute(cls.build_query(user_id, start, end, source)).all()
+        if not rows:
+            return cls(np.array([], dtype='datetime64[s]'), np.array([], dtype=np.int64),
+                       np.array([], dtype=np.int64))
+        dates, amounts, category_ids = zip(*rows)
+        return cls(
+            # SQLite stores 'YYYY-MM-DD HH:MM:SS[.ffffff]', which datetime64 parses directly
+            np.array(dates, dtype='datetime64[s]'),
+            np.fromiter(amounts, dtype=np.int64, count=len(rows)),
+            np.fromiter(category_ids, dtype=np.int64, count=len(rows))
+        )
+
+    def totals(self):
+        """Income, expenses, balance and count as a dict, like User.summary()"""
+        income = int(self.amounts[self.amounts > 0].sum())
+        expenses = -int(self.amounts[self.amounts < 0].sum())
+        return {
+            'income': Money(income),
+            'expenses': Money(expenses),
+            'balance': Money(income - expenses),
+            'count': len(self)
+        }
+
+    def by_category(self):
+        """
+        Totals per category: {category_id: {'income', 'expenses', 'count'}}.
+        Uncategorized transactions are under NO_CATEGORY.
+        """
+        ids, index = np.unique(self.category_ids, return_inverse=True)
+        income = np.bincount(index, weights=np.where(self.amounts > 0, self.amounts, 0), minlength=len(ids))
+        expenses = np.bincount(index, weights=np.where(self.amounts < 0, -self.amounts, 0), minlength=len(ids))
+        counts = np.bincount(index, minlength=len(ids))
+        # bincount sums in float64, which is exact for cents well past any realistic ledger
+        return {
+            int(category_id): {
+                'income': Money(int(income[i])),
+                'expenses': Money(int(expenses[i])),
+                'count': int(counts[i])
+            }
+            for i, category_id in enumerate(ids)
+        }
+
+    def daily_totals(self, expenses_only=False):
+        """
+        Net amount (or spending, as positive cents) per calendar day from the first
+        transaction to the last, including empty days.
+        Returns (days as datetime64[D], cents as int64).
+        """
+        if not len(self):
+            return np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int64)
+        amounts = -np.minimum(self.amounts, 0) if expenses_only else self.amounts
+        days = self.dates.astype('datetime64[D]')
+        offsets = (days - days[0]).astype(np.int64)
+        totals = np.bincount(offsets, weights=amounts).astype(np.int64)
+        return days[0] + np.arange(len(totals)), totals
+
+    def rolling_average(self, window=30, expenses_only=True):
+        """
+        Average daily spending (or net amount) over a trailing window of days.
+        Returns (days, averages in currency units as float64); the first window-1 days are NaN.
+        """
+        if window < 1:
+            raise ValueError("Window must be at least one day")
+        days, totals = self.daily_totals(expenses_only)
+        averages = np.full(len(totals), np.nan)
+        if len(totals) >= window:
+            # Sliding sums from a cumulative sum: O(n) whatever the window size
+            cumulative = np.concatenate(([0], np.cumsum(totals)))
+            averages[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window / CENTS_PER_UNIT
+        return days, averages
+
+    def percentiles(self, percents=(50, 90, 99), expenses_only=True):
+        """
+        Transaction size percentiles as {percent: Money}.
+        By default looks at expenses only, as positive amounts.
+        """
+        values = -self.amounts[self.amounts < 0] if expenses_only else self.amounts
+        if not len(values):
+            return {percent: Money(0) for percent in percents}
+        results = np.percentile(values, percents)
+        return {percent: Money(int(round(value))) for percent, value in zip(percents, results)}
+
+    def balance_curve(self):
+        """Running balance after each transaction: (dates, cents as int64)"""
+        return self.dates, np.cumsum(self.amounts)
@@ -0,0 +1,157 @@
+# lib/benchmarks/bench_analytics.py
+"""
+Benchmark: per-user statistics computed by looping over ORM objects from
+Transaction.find_by_user versus the NumPy Ledger in lib/analytics.py.
+
+Both sides compute the same things: totals, per-category totals, a 30-day
+rolling average of daily spending, spending percentiles and the running
+balance curve. The results are checked against each other before timing.
+
+Run from the project root:
+    python lib/benchmarks/bench_analytics.py [--transactions 200000] [--repeat 3]
+
+Uses a throwaway database in a temporary directory.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Work in a scratch directory so the real finance_tracker.db is never touched
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix='finance_bench_'))
+
+from models import create_tables
+from models.money import Money
+from models.user import User
+from models.category import Category
+from models.transaction import Transaction
+from analytics import Ledger, NO_CATEGORY
+
+WINDOW = 30
+PERCENTS = (50, 90, 99)
+
+def seed(count):
+    """One user with a few categories and `count` transactions spread over three years"""
+    create_tables()
+    user = User.create(name="Bench User", email="bench@example.com")
+    category_ids = [Category.create(name=name, user_id=user.id).id for name in ("Food", "Rent", "Travel", "Fun")]
+    generator = random.Random(42)
+    start = datetime(2022, 1, 1)
+    rows = ({
+        'description': f"Row {i}",
+        'amount': generator.randint(100, 500000) / 100 if i % 10 == 0 else -generator.randint(50, 20000) / 100,
+        'category_id': generator.choice(category_ids + [None]),
+        'transaction_date': start + timedelta(minutes=generator.randint(0, 3 * 365 * 24 * 60))
+    } for i in range(count))
+    Transaction.bulk_create(rows, user.id)
+    return user.id
+
+def orm_statistics(user_id):
+    """The old way: load every Transaction object and loop in Python"""
+    transactions = sorted(Transaction.find_by_user(user_id), key=lambda t: (t.transaction_date, t.id))
+
+    income = sum((t.amount for t in transactions if t.amount > 0), Money(0))
+    expenses = -sum((t.amount for t in transactions if t.amount < 0), Money(0))
+
+    by_category = {}
+    for t in transactions:
+        totals = by_category.setdefault(t.category_id or NO_CATEGORY, [Money(0), Money(0), 0])
+        if t.amount > 0:
+            totals[0] += t.amount
+        else:
+            totals[1] -= t.amount
+        totals[2] += 1
+
+    # Daily spending, then a trailing window average
+    daily = {}
+    for t in transactions:
+        if t.amount < 0:
+            day = t.transaction_date.date()
+            daily[day] = daily.get(day, 0) - t.amount.cents
+    rolling = []
+    if transactions:
+        first = transactions[0].transaction_date.date()
+        days = (transactions[-1].transaction_date.date() - first).days + 1
+        series = [daily.get(first + timedelta(days=i), 0) for i in range(days)]
+        for i in range(WINDOW - 1, days):
+            rolling.append(sum(series[i - WINDOW + 1:i + 1]) / WINDOW / 100)
+
+    # Nearest-rank style percentiles on sorted expense sizes (linear interpolation like NumPy)
+    sizes = sorted(-t.amount.cents for t in transactions if t.amount < 0)
+    percentiles = {}
+    for percent in PERCENTS:
+        position = (len(sizes) - 1) * percent / 100
+        lower = int(position)
+        upper = min(lower + 1, len(sizes) - 1)
+        percentiles[percent] = Money(round(sizes[lower] + (sizes[upper] - sizes[lower]) * (position - lower)))
+
+    balance, curve = Money(0), []
+    for t in transactions:
+        balance += t.amount
+        curve.append(balance)
+
+    return {
+        'income': income, 'expenses': expenses, 'categories': len(by_category),
+        'rolling_last': rolling[-1] if rolling else None, 'percentiles': percentiles,
+        'final_balance': curve[-1] if curve else Money(0)
+    }
+
+def numpy_statistics(user_id):
+    """The new way: load three columns into arrays and use vectorized operations"""
+    ledger = Ledger.load(user_id)
+    totals = ledger.totals()
+    by_category = ledger.by_category()
+    _, rolling = ledger.rolling_average(WINDOW)
+    percentiles = ledger.percentiles(PERCENTS)
+    _, curve = ledger.balance_curve()
+    return {
+        'income': totals['income'], 'expenses': totals['expenses'], 'categories': len(by_category),
+        'rolling_last': float(rolling[-1]) if len(rolling) >= WINDOW else None, 'percentiles': percentiles,
+        'final_balance': Money(int(curve[-1])) if len(curve) else Money(0)
+    }
+
+def best_time(func, user_id, repeat):
+    """Fastest of `repeat` runs, and the result of the last one"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(user_id)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=200000, help='transactions for the bench user')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per approach (best is reported)')
+    args = parser.parse_args()
+
+    print(f"Seeding {args.transactions} transactions...")
+    user_id = seed(args.transactions)
+
+    orm_seconds, orm_result = best_time(orm_statistics, user_id, args.repeat)
+    numpy_seconds, numpy_result = best_time(numpy_statistics, user_id, args.repeat)
+
+    # Same answers, or the timing means nothing (rolling averages compared to the cent)
+    for key in orm_result:
+        expected, actual = orm_result[key], numpy_result[key]
+        if key == 'rolling_last' and expected is not None:
+            matches = abs(expected - actual) < 0.01
+        else:
+            matches = expected == actual
+        if not matches:
+            raise SystemExit(f"Results differ for {key}: ORM {expected!r} vs NumPy {actual!r}")
+
+    print(f"{'Approach':<24} {'Seconds':>9}")
+    print("-" * 34)
+    print(f"{'ORM objects + loops':<24} {orm_seconds:>9.3f}")
+    print(f"{'NumPy Ledger':<24} {numpy_seconds:>9.3f}")
+    print(f"Speedup: {orm_seconds / numpy_seconds:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# lib/benchmarks/bench_archive.py
+"""
+Benchmark: the everyday queries before and after archiving old transactions.
+
+Generates several years of datagen transactions, times a set of queries,
+moves everything older than --keep-days to the archive database with
+archive.archive_transactions(), and times the same queries again. Queries
+limited to recent dates should only read the (now much smaller) main
+database; full-history queries read both files and show what the union costs.
+Results are compared so both runs are known to return the same rows.
+
+Run from the project root:
+    python lib/benchmarks/bench_archive.py [--transactions 300000] [--years 3] [--keep-days 365]
+
+Uses a throwaway database in a temporary directory.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def timed(func, repeat):
+    """Median seconds of `repeat` calls, and the last result"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+def build_cases(user_id, recent):
+    """(label, function) pairs; each function returns something comparable between runs"""
+    from models.user import User
+    from models.category import Category
+    from models.transaction import Transaction
+    from analytics import Ledger
+    from exporter import iter_export_rows
+
+    def first_page():
+        transactions, _ = Transaction.get_page(user_id=user_id, with_category=True)
+        return [transaction.id for transaction in transactions]
+
+    return (
+        ("summary (running totals)", lambda: User.find_by_id(user_id).summary()),
+        ("spending report", lambda: [row['spent'] for row in Category.spending_report(user_id)]),
+        ("first page of history", first_page),
+        (f"export since {recent:%Y-%m-%d}", lambda: sum(1 for _ in iter_export_rows(user_id, start=recent))),
+        (f"ledger since {recent:%Y-%m-%d}", lambda: Ledger.load(user_id, start=recent).totals()),
+        ("export, full history", lambda: sum(1 for _ in iter_export_rows(user_id))),
+        ("find_by_user, full history", lambda: len(Transaction.find_by_user(user_id))),
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--transactions', type=int, default=300000)
+    parser.add_argument('--years', type=float, default=3)
+    parser.add_argument('--keep-days', type=int, default=365, help='archive transactions older than this')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per query')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='finance_bench_')
+    db_path = os.path.join(workdir, 'bench.db')
+    # The engine is configured at import time, so point it at the scratch file first
+    os.environ['FINANCE_DB_URL'] = f"sqlite:///{db_path}"
+    sys.path.insert(0, LIB_DIR)
+
+    import datagen
+    from sqlalchemy import func
+    from models import session_scope
+    from models.archive import archive_transactions, archive_path
+    from models.cache import clear_caches
+    from models.transaction import Transaction
+
+    print(f"Generating {args.transactions} transactions over {args.years:g} years for {args.users} users...")
+    dataset = datagen.populate(args.users, args.categories, args.transactions, args.seed, years=args.years)
+    with session_scope() as session:
+        user_id, user_rows = session.query(Transaction.user_id, func.count(Transaction.id)).group_by(
+            Transaction.user_id).order_by(func.count(Transaction.id).desc()).first()
+        newest = session.query(func.max(Transaction.transaction_date)).scalar()
+    cutoff = newest.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=args.keep_days)
+    recent = cutoff + timedelta(days=args.keep_days // 4)
+    cases = build_cases(user_id, recent)
+
+    def run():
+        clear_caches()
+        return [timed(case, args.repeat) for _, case in cases]
+
+    before = run()
+    size_before = os.path.getsize(db_path)
+    started = time.perf_counter()
+    moved = archive_transactions(cutoff)
+    archive_seconds = time.perf_counter() - started
+    # Let the freed pages go so the file size reflects what's left
+    from maintenance import vacuum
+    vacuum()
+    after = run()
+
+    print(f"Archived {moved} of {dataset['transactions']} transactions dated before {cutoff:%Y-%m-%d} "
+          f"in {archive_seconds:.1f}s; main file {size_before / 2**20:.1f} MB -> "
+          f"{os.path.getsize(db_path) / 2**20:.1f} MB, archive {os.path.getsize(archive_path()) / 2**20:.1f} MB")
+    print(f"Busiest user: {user_rows} transactions\n")
+    print(f"{'Query':<32} {'Before ms':>10} {'After ms':>10} {'Speedup':>8}")
+    print("-" * 64)
+    for (label, _), (old, old_result), (new, new_result) in zip(cases, before, after):
+        if old_result != new_result:
+            raise SystemExit(f"Results differ for {label}: {old_result!r} vs {new_result!r}")
+        print(f"{label:<32} {old * 1000:>10.2f} {new * 1000:>10.2f} {old / new:>7.1f}x")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# lib/benchmarks/bench_date_range.py
+"""
+Benchmark: "last N days" views the old way (load the user's whole history,
+then filter and add up in Python) versus the start/end parameters, which
+push the range into SQL so the (user_id, transaction_date, amount_cents)
+index serves it as one range scan.
+
+Both sides are checked to return the same rows and totals.
+
+Run from the project root:
+    python lib/benchmarks/bench_date_range.py [--transactions 200000] [--days 30]
+
+Uses a throwaway database in a temporary directory.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def timed(func, repeat):
+    """Median seconds of `repeat` calls, and the last result"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--transactions', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=30, help='length of the date range viewed')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per query')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='finance_bench_')
+    # The engine is configured at import time, so point it at the scratch file first
+    os.environ['FINANCE_DB_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    sys.path.insert(0, LIB_DIR)
+
+    import datagen
+    from sqlalchemy import func
+    from models import session_scope
+    from models.money import Money
+    from models.user import User
+    from models.transaction import Transaction
+
+    print(f"Generating {args.transactions} transactions for {args.users} users...")
+    datagen.populate(args.users, args.categories, args.transactions, args.seed)
+    with session_scope() as session:
+        user_id, user_rows = session.query(Transaction.user_id, func.count(Transaction.id)).group_by(
+            Transaction.user_id).order_by(func.count(Transaction.id).desc()).first()
+        newest = session.query(func.max(Transaction.transaction_date)).scalar()
+    end = newest
+    start = end - timedelta(days=args.days)
+    user = User.find_by_id(user_id)
+
+    def legacy_rows():
+        return sorted(t.id for t in Transaction.find_by_user(user_id) if start <= t.transaction_date <= end)
+
+    def legacy_summary():
+        amounts = [t.amount for t in Transaction.find_by_user(user_id) if start <= t.transaction_date <= end]
+        income = sum((amount for amount in amounts if amount > 0), Money(0))
+        expenses = -sum((amount for amount in amounts if amount < 0), Money(0))
+        return {'income': income, 'expenses': expenses, 'balance': income - expenses, 'count': len(amounts)}
+
+    cases = (
+        ("transactions in range", legacy_rows,
+         lambda: sorted(t.id for t in Transaction.find_by_user(user_id, start=start, end=end))),
+        ("summary of range", legacy_summary, lambda: user.summary(start, end)),
+    )
+    print(f"Busiest user: {user_rows} transactions; range: last {args.days} days\n")
+    print(f"{'Query':<24} {'Whole history ms':>17} {'Range ms':>10} {'Speedup':>8}")
+    print("-" * 62)
+    for label, legacy, ranged in cases:
+        before, expected = timed(legacy, args.repeat)
+        after, result = timed(ranged, args.repeat)
+        if expected != result:
+            raise SystemExit(f"Results differ for {label}: {expected!r} vs {result!r}")
+        print(f"{label:<24} {before * 1000:>17.1f} {after * 1000:>10.1f} {before / after:>7.1f}x")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# lib/benchmarks/bench_delete.py
+"""
+Benchmark: deleting a heavy user and a heavy category the old way (the ORM
+loads every child row and deletes them one by one) versus the bulk
+DELETE ... WHERE paths in User.delete and Category.delete, which lean on
+ON DELETE CASCADE foreign keys.
+
+Each run starts from a fresh copy of the same datagen database, so both
+sides delete exactly the same rows; the remaining row counts are checked
+against each other.
+
+Run from the project root:
+    python lib/benchmarks/bench_delete.py [--transactions 200000] [--repeat 3]
+
+Uses a throwaway database in a temporary directory.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def legacy_delete_user(user_id):
+    """What User.delete used to do: cascade="all, delete-orphan" loads and deletes every child"""
+    from models import session_scope
+    from models.user import User
+    from models.user_balance import UserBalance
+    from models.monthly_rollup import MonthlyRollup
+
+    with session_scope() as session:
+        user = session.get(User, user_id)
+        # Touching the collections is what the old cascade did before deleting
+        for category in user.categories:
+            category.transactions
+        user.transactions
+        session.query(UserBalance).filter_by(user_id=user_id).delete()
+        session.query(MonthlyRollup).filter_by(user_id=user_id).delete()
+        session.delete(user)
+
+def legacy_delete_category(category_id):
+    """What Category.delete used to do: adjust the totals, then let the ORM cascade delete"""
+    from sqlalchemy import func, case
+    from models import session_scope
+    from models.category import Category
+    from models.transaction import Transaction
+    from models.user_balance import UserBalance
+    from models.monthly_rollup import MonthlyRollup
+
+    with session_scope() as session:
+        category = session.get(Category, category_id)
+        income, expenses, count = session.query(
+            func.coalesce(func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((Transaction.amount < 0, -Transaction.amount), else_=0)), 0),
+            func.count(Transaction.id)
+        ).filter(Transaction.category_id == category_id).one()
+        if count:
+            UserBalance.apply(session, category.user_id, -income, -expenses, -count)
+        session.query(MonthlyRollup).filter_by(category_id=category_id).delete()
+        category.transactions
+        session.delete(category)
+
+def delete_user(user_id):
+    """User.delete: one DELETE per table"""
+    from models.user import User
+    User.find_by_id(user_id).delete()
+
+def delete_category(category_id):
+    """Category.delete: one aggregate query, then one DELETE per table"""
+    from models.category import Category
+    Category.find_by_id(category_id).delete()
+
+def row_counts():
+    """Rows left in every table, to check both sides deleted the same data"""
+    from models import session_scope
+    from models.user import User
+    from models.category import Category
+    from models.transaction import Transaction
+    from models.user_balance import UserBalance
+    from models.monthly_rollup import MonthlyRollup
+
+    with session_scope() as session:
+        counts = {model.__tablename__: session.query(model).count()
+                  for model in (User, Category, Transaction, UserBalance, MonthlyRollup)}
+        counts['mismatched_counters'] = len(Category.check_counters(session=session))
+        return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--transactions', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per delete path')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='finance_bench_')
+    db_path = os.path.join(workdir, 'bench.db')
+    template_path = os.path.join(workdir, 'template.db')
+    # The engine is configured at import time, so point it at the scratch file first
+    os.environ['FINANCE_DB_URL'] = f"sqlite:///{db_path}"
+    sys.path.insert(0, LIB_DIR)
+
+    import datagen
+    from sqlalchemy import func
+    from models import engine, session_scope
+    from models.cache import clear_caches
+    from models.transaction import Transaction
+
+    print(f"Generating {args.transactions} transactions for {args.users} users...")
+    datagen.populate(args.users, args.categories, args.transactions, args.seed)
+    engine.dispose()
+    shutil.copyfile(db_path, template_path)
+
+    # The busiest user, and their biggest category
+    with session_scope() as session:
+        user_id, user_rows = session.query(Transaction.user_id, func.count(Transaction.id)).group_by(
+            Transaction.user_id).order_by(func.count(Transaction.id).desc()).first()
+        category_id, category_rows = session.query(Transaction.category_id, func.count(Transaction.id)).filter(
+            Transaction.user_id == user_id, Transaction.category_id.isnot(None)
+        ).group_by(Transaction.category_id).order_by(func.count(Transaction.id).desc()).first()
+
+    def restore():
+        """Put the untouched database back before each run"""
+        engine.dispose()
+        shutil.copyfile(template_path, db_path)
+        clear_caches()
+
+    cases = (
+        (f"user ({user_rows} transactions)", user_id, legacy_delete_user, delete_user),
+        (f"category ({category_rows} transactions)", category_id, legacy_delete_category, delete_category),
+    )
+    print(f"\n{'Delete':<32} {'ORM cascade ms':>15} {'Bulk ms':>10} {'Speedup':>8}")
+    print("-" * 68)
+    for label, ident, legacy, bulk in cases:
+        medians = []
+        remaining = []
+        for delete in (legacy, bulk):
+            timings = []
+            for _ in range(args.repeat):
+                restore()
+                started = time.perf_counter()
+                delete(ident)
+                timings.append(time.perf_counter() - started)
+            medians.append(statistics.median(timings))
+            remaining.append(row_counts())
+        if remaining[0] != remaining[1]:
+            raise SystemExit(f"Delete paths disagree for {label}: {remaining[0]} vs {remaining[1]}")
+        before, after = medians
+        print(f"{label:<32} {before * 1000:>15.1f} {after * 1000:>10.1f} {before / after:>7.1f}x")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# lib/benchmarks/bench_hot_paths.py
+"""
+Benchmark suite for the model and helper hot paths, on a synthetic dataset
+from datagen.py. Results are written as JSON so runs can be compared across
+commits.
+
+Run from the project root:
+    python lib/benchmarks/bench_hot_paths.py [--transactions 200000] [--output results.json]
+    python lib/benchmarks/bench_hot_paths.py --db /tmp/finance_big.db --compare before.json
+
+Without --db a fresh dataset is generated in a temporary directory. With --db
+an existing datagen database is reused, which saves regenerating millions of
+rows for every run. Lookup caches are cleared before each timed call, so the
+numbers measure database work rather than cache hits.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=LIB_DIR, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def hot_paths(user_id):
+    """(name, callable) for every path we time, all for the busiest user"""
+    import helpers
+    from models.user import User
+    from models.category import Category
+    from models.transaction import Transaction
+
+    def user_balance():
+        return User.find_by_id(user_id).balance
+
+    def category_total_spent():
+        return sum((category.total_spent for category in Category.find_by_user(user_id)), 0)
+
+    def financial_summary():
+        helpers.current_user = User.find_by_id(user_id)
+        # The report itself, without the menu entry's date prompt; it prints a lot,
+        # and we only want its database and formatting cost
+        with contextlib.redirect_stdout(io.StringIO()):
+            helpers.view_financial_summary()
+
+    return [
+        ('User.get_all', User.get_all),
+        ('User.balance', user_balance),
+        ('Transaction.find_by_user', lambda: Transaction.find_by_user(user_id)),
+        ('Category.total_spent', category_total_spent),
+        ('view_financial_summary', financial_summary),
+    ]
+
+def time_path(func, repeat, counter):
+    """Run func `repeat` times; returns timing statistics and SQL statements per call"""
+    from models.cache import clear_caches
+
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        counter['statements'] = 0
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+        'max': max(timings),
+        'runs': repeat,
+        'statements': counter['statements']
+    }
+
+def compare(results, baseline_path):
+    """Print each path's median against a previous results file"""
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit') or '?'}):")
+    for name, result in results['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            print(f"  {name:<26} (new)")
+            continue
+        ratio = before['median'] / result['median'] if result['median'] else float('inf')
+        print(f"  {name:<26} {before['median'] * 1000:>9.2f}ms -> {result['median'] * 1000:>9.2f}ms  ({ratio:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', help='existing database from datagen.py (default: generate a new one)')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--transactions', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per path')
+    parser.add_argument('--output', default='bench_hot_paths.json', help='where to write the JSON results')
+    parser.add_argument('--compare', help='previous results file to compare against')
+    args = parser.parse_args()
+
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(
+        tempfile.mkdtemp(prefix='finance_bench_'), 'bench.db')
+    output_path = os.path.abspath(args.output)
+    # The engine is configured at import time, so point it at the dataset first
+    os.environ['FINANCE_DB_URL'] = f"sqlite:///{db_path}"
+    sys.path.insert(0, LIB_DIR)
+
+    import datagen
+    from sqlalchemy import event, func
+    from models import engine, create_tables, session_scope
+    from models.transaction import Transaction
+
+    if args.db:
+        create_tables()
+        dataset = {'database': db_path}
+    else:
+        print(f"Generating {args.transactions} transactions for {args.users} users...")
+        dataset = datagen.populate(args.users, args.categories, args.transactions, args.seed)
+
+    # Benchmark the busiest user - the worst case for per-user paths
+    with session_scope() as session:
+        busiest = session.query(Transaction.user_id, func.count(Transaction.id)).group_by(
+            Transaction.user_id).order_by(func.count(Transaction.id).desc()).first()
+        if busiest is None:
+            raise SystemExit(f"No transactions in {db_path}; create it with datagen.py first")
+        user_id, user_rows = busiest
+        dataset['total_transactions'] = session.query(func.count(Transaction.id)).scalar()
+    dataset['benchmark_user_transactions'] = user_rows
+
+    counter = {'statements': 0}
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counter['statements'] += 1
+    event.listen(engine, 'before_cursor_execute', count_statement)
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'dataset': dataset,
+        'results': {}
+    }
+    print(f"{'Path':<26} {'Median ms':>10} {'Min ms':>9} {'Statements':>10}")
+    print("-" * 58)
+    for name, path in hot_paths(user_id):
+        result = time_path(path, args.repeat, counter)
+        results['results'][name] = result
+        print(f"{name:<26} {result['median'] * 1000:>10.2f} {result['min'] * 1000:>9.2f} {result['statements']:>10}")
+
+    with open(output_path, 'w') as output:
+        json.dump(results, output, indent=2)
+    print(f"\nResults written to {output_path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
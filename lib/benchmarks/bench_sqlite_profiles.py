@@ -0,0 +1,95 @@
+# lib/benchmarks/bench_sqlite_profiles.py
+"""
+Benchmark: write and read throughput for each SQLite engine profile
+(see lib/models/config.py).
+
+Run from the project root:
+    python lib/benchmarks/bench_sqlite_profiles.py [--writes 500] [--bulk 50000] [--reads 200]
+
+Each profile runs in its own process against a fresh database in a temporary
+directory, because the engine is configured once at import time.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_worker(args):
+    """Time the workload against whatever engine the environment configures"""
+    sys.path.insert(0, LIB_DIR)
+    from models import create_tables, settings
+    from models.user import User
+    from models.category import Category
+    from models.transaction import Transaction
+    
+    create_tables()
+    user = User.create(name="Bench User", email="bench@example.com")
+    category = Category.create(name="Food", user_id=user.id, budget_limit=500.0)
+    results = {'profile': settings['profile']}
+    
+    # Small writes: one commit per transaction, like the interactive CLI
+    started = time.perf_counter()
+    for i in range(args.writes):
+        Transaction.create(f"Expense {i}", -10.0, user.id, category.id)
+    results['single_writes_per_sec'] = args.writes / (time.perf_counter() - started)
+    
+    # Bulk writes: one large transaction, like a statement import
+    rows = ({'description': f"Row {i}", 'amount': -1.0 - (i % 100), 'category_id': category.id}
+            for i in range(args.bulk))
+    started = time.perf_counter()
+    Transaction.bulk_create(rows, user.id)
+    results['bulk_rows_per_sec'] = args.bulk / (time.perf_counter() - started)
+    
+    # Reads: the aggregate queries and first page the CLI runs most often
+    started = time.perf_counter()
+    for _ in range(args.reads):
+        user.summary()
+        Category.spending_report(user.id)
+        Transaction.get_page(user_id=user.id)
+    results['read_rounds_per_sec'] = args.reads / (time.perf_counter() - started)
+    
+    print(json.dumps(results))
+
+def run_profile(profile, args):
+    """Run the worker for one profile in a subprocess and return its results"""
+    workdir = tempfile.mkdtemp(prefix=f'finance_bench_{profile}_')
+    env = dict(os.environ)
+    env['FINANCE_DB_PROFILE'] = profile
+    env['FINANCE_DB_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    command = [sys.executable, os.path.abspath(__file__), '--worker',
+               '--writes', str(args.writes), '--bulk', str(args.bulk), '--reads', str(args.reads)]
+    output = subprocess.run(command, env=env, cwd=workdir, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writes', type=int, default=500, help='single-row commits to time')
+    parser.add_argument('--bulk', type=int, default=50000, help='rows inserted in one bulk transaction')
+    parser.add_argument('--reads', type=int, default=200, help='rounds of summary/report/page reads')
+    parser.add_argument('--profiles', nargs='+', help='profiles to compare (default: all)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker(args)
+        return
+    
+    sys.path.insert(0, LIB_DIR)
+    from models.config import PROFILES
+    profiles = args.profiles or list(PROFILES)
+    
+    print(f"{'Profile':<14} {'Single writes/s':>16} {'Bulk rows/s':>12} {'Read rounds/s':>14}")
+    print("-" * 60)
+    for profile in profiles:
+        result = run_profile(profile, args)
+        print(f"{result['profile']:<14} {result['single_writes_per_sec']:>16.0f} "
+              f"{result['bulk_rows_per_sec']:>12.0f} {result['read_rounds_per_sec']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
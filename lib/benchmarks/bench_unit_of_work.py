@@ -0,0 +1,108 @@
+# lib/benchmarks/bench_unit_of_work.py
+"""
+Benchmark: database round trips for common flows, one session per model call
+versus one shared unit of work (models.session_scope).
+
+Run from the project root:
+    python lib/benchmarks/bench_unit_of_work.py [--transactions 200]
+
+Uses a throwaway database in a temporary directory.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Work in a scratch directory so the real finance_tracker.db is never touched
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(tempfile.mkdtemp(prefix='finance_bench_'))
+
+from sqlalchemy import event
+
+from models import engine, create_tables, session_scope
+from models.user import User
+from models.category import Category
+from models.transaction import Transaction
+
+class RoundTripCounter:
+    """Count SQL statements and commits issued on the engine"""
+    
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+        event.listen(engine, 'commit', self._on_commit)
+    
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+    
+    def _on_commit(self, conn):
+        self.commits += 1
+    
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+def add_expenses_per_call(user, category, count):
+    """Old pattern: every create opens, commits and closes its own session"""
+    for i in range(count):
+        Transaction.create(f"Expense {i}", -10.0, user.id, category.id)
+
+def add_expenses_one_unit(user, category, count):
+    """New pattern: all creates share one session and one transaction"""
+    with session_scope() as session:
+        for i in range(count):
+            Transaction.create(f"Expense {i}", -10.0, user.id, category.id, session=session)
+
+def login_and_add_per_call(email, count):
+    """CLI flow: log in, pick a category, add a transaction, show the summary"""
+    for i in range(count):
+        user = User.find_by_email(email)
+        categories = Category.find_by_user(user.id)
+        Transaction.create(f"Lunch {i}", -12.5, user.id, categories[0].id)
+        user.summary()
+
+def login_and_add_one_unit(email, count):
+    """Same CLI flow, each iteration in a single unit of work"""
+    for i in range(count):
+        with session_scope() as session:
+            user = User.find_by_email(email, session=session)
+            categories = Category.find_by_user(user.id, session=session)
+            Transaction.create(f"Lunch {i}", -12.5, user.id, categories[0].id, session=session)
+            user.summary(session=session)
+
+def measure(counter, label, func, *args):
+    """Run one flow and return its statement count, commit count and time"""
+    counter.reset()
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+    return {'flow': label, 'statements': counter.statements, 'commits': counter.commits, 'seconds': elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=200, help='transactions added per flow')
+    args = parser.parse_args()
+    
+    create_tables()
+    user = User.create(name="Bench User", email="bench@example.com")
+    category = Category.create(name="Food", user_id=user.id, budget_limit=500.0)
+    
+    counter = RoundTripCounter()
+    n = args.transactions
+    results = [
+        measure(counter, f"add {n} expenses, session per call", add_expenses_per_call, user, category, n),
+        measure(counter, f"add {n} expenses, one unit of work", add_expenses_one_unit, user, category, n),
+        measure(counter, f"login+add+summary x{n}, session per call", login_and_add_per_call, user.email, n),
+        measure(counter, f"login+add+summary x{n}, unit of work each", login_and_add_one_unit, user.email, n),
+    ]
+    
+    print(f"{'Flow':<46} {'Statements':>10} {'Commits':>8} {'Seconds':>9}")
+    print("-" * 76)
+    for result in results:
+        print(f"{result['flow']:<46} {result['statements']:>10} {result['commits']:>8} {result['seconds']:>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# lib/benchmarks/datagen.py
+"""
+Deterministic synthetic data for Personal Finance Tracker.
+
+Populates N users, M categories per user and any number of transactions
+with realistic shapes: a monthly salary and rent, frequent small grocery
+and coffee purchases, rarer large travel spends, more shopping at weekends.
+The same seed always produces the same database.
+
+Run from the project root:
+    python lib/benchmarks/datagen.py --db /tmp/finance_big.db --users 20 --categories 8 --transactions 2000000
+
+Rows go in through Transaction.bulk_create, so balances, monthly rollups and
+category counters are maintained exactly as they are for real imports.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, median expense in dollars, spread of the log-normal, relative frequency)
+# Spread is the sigma of log(amount); frequency is how often a transaction lands here
+CATEGORY_PROFILES = (
+    ('Groceries', 45.0, 0.6, 30),
+    ('Coffee', 4.5, 0.3, 25),
+    ('Dining', 28.0, 0.5, 15),
+    ('Transport', 12.0, 0.7, 12),
+    ('Shopping', 60.0, 0.9, 8),
+    ('Utilities', 90.0, 0.3, 3),
+    ('Entertainment', 25.0, 0.6, 5),
+    ('Travel', 400.0, 0.8, 1),
+    ('Health', 55.0, 0.7, 2),
+    ('Gifts', 40.0, 0.8, 2),
+)
+
+# Share of transactions that are income (paychecks, refunds, side income)
+INCOME_SHARE = 0.04
+MONTHLY_SALARY = (2500.0, 9000.0)
+MONTHLY_RENT = (700.0, 2500.0)
+
+DEFAULT_YEARS = 3
+
+def category_profiles(count):
+    """The first `count` profiles, repeating with numbered names past the built-in list"""
+    profiles = []
+    for i in range(count):
+        name, median, spread, weight = CATEGORY_PROFILES[i % len(CATEGORY_PROFILES)]
+        if i >= len(CATEGORY_PROFILES):
+            name = f"{name} {i // len(CATEGORY_PROFILES) + 1}"
+        profiles.append((name, median, spread, weight))
+    return profiles
+
+def random_moment(generator, start, days):
+    """A time within the span, weighted towards weekends and daytime"""
+    while True:
+        day = start + timedelta(days=generator.randrange(days))
+        # Saturdays and Sundays get roughly 1.6x the weekday volume
+        if day.weekday() >= 5 or generator.random() < 0.62:
+            break
+    minutes = int(min(max(generator.gauss(14 * 60, 4 * 60), 6 * 60), 23 * 60 + 59))
+    return day + timedelta(minutes=minutes)
+
+def generate_rows(generator, count, category_ids, profiles, start, days):
+    """
+    Yield `count` transaction dicts for one user, ready for Transaction.bulk_create.
+    Monthly salary and rent are included in the count.
+    """
+    salary = round(generator.uniform(*MONTHLY_SALARY), 2)
+    rent = round(generator.uniform(*MONTHLY_RENT), 2)
+    months = max(days // 30, 1)
+    fixed = min(count, months * 2)
+
+    # Paydays on the 1st, rent on the 3rd
+    for month in range(fixed // 2):
+        year, month_index = divmod(start.month - 1 + month, 12)
+        first = datetime(start.year + year, month_index + 1, 1)
+        yield {'description': "Salary", 'amount': salary, 'category_id': None,
+               'transaction_date': first + timedelta(hours=9)}
+        yield {'description': "Rent", 'amount': -rent, 'category_id': category_ids[0],
+               'transaction_date': first + timedelta(days=2, hours=10)}
+
+    weights = [profile[3] for profile in profiles]
+    for i in range(count - (fixed // 2) * 2):
+        moment = random_moment(generator, start, days)
+        if generator.random() < INCOME_SHARE:
+            amount = round(generator.lognormvariate(math.log(80.0), 1.0), 2)
+            yield {'description': generator.choice(("Refund", "Side job", "Interest", "Transfer in")),
+                   'amount': max(amount, 0.01), 'category_id': None, 'transaction_date': moment}
+            continue
+        index = generator.choices(range(len(profiles)), weights=weights)[0]
+        name, median, spread, _ = profiles[index]
+        amount = round(generator.lognormvariate(math.log(median), spread), 2)
+        yield {'description': f"{name} #{generator.randrange(1, 500)}", 'amount': -max(amount, 0.01),
+               'category_id': category_ids[index], 'transaction_date': moment}
+
+def populate(users=10, categories=8, transactions=100000, seed=42, years=DEFAULT_YEARS, end=None,
+             progress=None):
+    """
+    Fill the configured database with synthetic data. Transactions are spread
+    across users unevenly (some users are much busier than others), over the
+    `years` before `end` (default: 2025-01-01, so output doesn't depend on today).
+    Returns a dict describing the dataset.
+    """
+    from models import create_tables, session_scope
+    from models.user import User
+    from models.category import Category
+    from models.transaction import Transaction
+
+    generator = random.Random(seed)
+    end = end or datetime(2025, 1, 1)
+    days = int(365 * years)
+    start = end - timedelta(days=days)
+    profiles = [('Rent', 1200.0, 0.0, 0)] + category_profiles(max(categories - 1, 0))
+
+    create_tables()
+    # Busy users get more rows: weights from a Pareto-ish distribution
+    weights = [generator.paretovariate(1.5) for _ in range(users)]
+    total_weight = sum(weights)
+    counts = [int(transactions * weight / total_weight) for weight in weights]
+    counts[0] += transactions - sum(counts)
+
+    started = time.perf_counter()
+    created = 0
+    for number, count in enumerate(counts, start=1):
+        with session_scope() as session:
+            user = User.create(name=f"User {number}", email=f"user{number}@example.com", session=session)
+            category_ids = [
+                Category.create(name=name, user_id=user.id, session=session,
+                                budget_limit=round(median * 30, -1) if weight else 0).id
+                for name, median, _, weight in profiles
+            ]
+            rows = generate_rows(generator, count, category_ids, profiles, start, days)
+            created += Transaction.bulk_create(rows, user.id, session=session)
+        if progress:
+            progress(number, users, created)
+
+    return {
+        'users': users,
+        'categories_per_user': len(profiles),
+        'transactions': created,
+        'seed': seed,
+        'start': start.date().isoformat(),
+        'end': end.date().isoformat(),
+        'seconds': time.perf_counter() - started
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', required=True, help='SQLite file to create (must not exist)')
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--categories', type=int, default=8, help='categories per user, including Rent')
+    parser.add_argument('--transactions', type=int, default=100000, help='total across all users')
+    parser.add_argument('--years', type=float, default=DEFAULT_YEARS, help='span of transaction dates')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        raise SystemExit(f"{args.db} already exists; pick a new path so existing data isn't mixed in")
+    # The engine is configured at import time, so point it at the target file first
+    os.environ['FINANCE_DB_URL'] = f"sqlite:///{os.path.abspath(args.db)}"
+    sys.path.insert(0, LIB_DIR)
+
+    def progress(number, total, created):
+        print(f"  user {number}/{total}: {created} transactions so far", flush=True)
+
+    dataset = populate(args.users, args.categories, args.transactions, args.seed, args.years,
+                       progress=progress)
+    print(f"Created {dataset['transactions']} transactions for {dataset['users']} users "
+          f"in {dataset['seconds']:.1f}s -> {args.db}")
+
+if __name__ == "__main__":
+    main()
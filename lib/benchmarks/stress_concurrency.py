@@ -0,0 +1,185 @@
+# lib/benchmarks/stress_concurrency.py
+"""
+Stress test: several processes reading and writing one database at once,
+the way interactive users, imports and report jobs share finance_tracker.db.
+
+Each worker process runs a mix of Transaction.create, Transaction.delete and
+reads (balance, spending report, a page of history) against users shared by
+all workers, so writers contend for the same summary rows. Afterwards the
+running totals are verified and the database integrity is checked.
+
+Run from the project root:
+    python lib/benchmarks/stress_concurrency.py [--processes 8] [--operations 300]
+    python lib/benchmarks/stress_concurrency.py --baseline   # no busy timeout or retries, rollback journal
+
+Reports throughput, error rate (by error message) and write latency.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+LIB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Share of operations of each kind
+WRITE_SHARE = 0.55
+DELETE_SHARE = 0.10
+
+# Settings that recreate the behaviour before concurrency support, for --baseline
+BASELINE_ENVIRONMENT = {
+    'FINANCE_DB_JOURNAL_MODE': 'DELETE',
+    'FINANCE_DB_BUSY_TIMEOUT': '0',
+    'FINANCE_DB_WRITE_ATTEMPTS': '1'
+}
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+def run_worker(args):
+    """Run the operation mix and print one JSON line of results"""
+    sys.path.insert(0, LIB_DIR)
+    from models.user import User
+    from models.category import Category
+    from models.transaction import Transaction
+
+    generator = random.Random(args.seed)
+    user_ids = [int(user_id) for user_id in args.user_ids.split(',')]
+    categories = {user_id: [category.id for category in Category.find_by_user(user_id)] for user_id in user_ids}
+    created = []
+    counts = Counter()
+    errors = Counter()
+    write_latencies = []
+
+    started = time.perf_counter()
+    for i in range(args.operations):
+        user_id = generator.choice(user_ids)
+        roll = generator.random()
+        operation_started = time.perf_counter()
+        try:
+            if roll < WRITE_SHARE:
+                operation = 'create'
+                transaction = Transaction.create(
+                    description=f"Stress {args.seed}-{i}",
+                    amount=-round(generator.uniform(1, 80), 2),
+                    user_id=user_id,
+                    category_id=generator.choice(categories[user_id])
+                )
+                created.append(transaction)
+            elif roll < WRITE_SHARE + DELETE_SHARE and created:
+                operation = 'delete'
+                created.pop(generator.randrange(len(created))).delete()
+            else:
+                operation = 'read'
+                User.find_by_id(user_id).summary()
+                Category.spending_report(user_id)
+                Transaction.get_page(user_id=user_id)
+            counts[operation] += 1
+            if operation != 'read':
+                write_latencies.append(time.perf_counter() - operation_started)
+        except Exception as e:
+            errors[f"{type(e).__name__}: {str(e).splitlines()[0][:80]}"] += 1
+
+    print(json.dumps({
+        'seconds': time.perf_counter() - started,
+        'counts': counts,
+        'errors': errors,
+        'write_latencies': write_latencies
+    }))
+
+def setup_database(users, categories):
+    """Create the shared users and categories; returns the user IDs"""
+    from models import create_tables
+    from models.user import User
+    from models.category import Category
+
+    create_tables()
+    user_ids = []
+    for number in range(1, users + 1):
+        user = User.create(name=f"Stress {number}", email=f"stress{number}@example.com")
+        for index in range(categories):
+            Category.create(name=f"Category {index + 1}", user_id=user.id, budget_limit=500)
+        user_ids.append(user.id)
+    return user_ids
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=300, help='operations per process')
+    parser.add_argument('--users', type=int, default=3, help='users shared by every process')
+    parser.add_argument('--categories', type=int, default=4, help='categories per user')
+    parser.add_argument('--baseline', action='store_true',
+                        help='rollback journal, no busy timeout and no retries, for comparison')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--seed', type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument('--user-ids', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='finance_stress_')
+    environment = dict(os.environ, FINANCE_DB_URL=f"sqlite:///{os.path.join(workdir, 'stress.db')}")
+    if args.baseline:
+        environment.update(BASELINE_ENVIRONMENT)
+    # Configure this process the same way before the engine is created on import
+    os.environ.update(environment)
+    sys.path.insert(0, LIB_DIR)
+    from models import settings, engine
+    import maintenance
+
+    user_ids = setup_database(args.users, args.categories)
+    engine.dispose()
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+    print(f"{args.processes} processes x {args.operations} operations; journal_mode={journal_mode}, "
+          f"busy_timeout={settings.get('busy_timeout') or 0}ms, write_attempts={settings['write_attempts']}")
+
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--operations', str(args.operations),
+               '--user-ids', ','.join(map(str, user_ids))]
+    started = time.perf_counter()
+    workers = [
+        subprocess.Popen(command + ['--seed', str(seed)], env=environment, cwd=workdir,
+                         stdout=subprocess.PIPE, text=True)
+        for seed in range(args.processes)
+    ]
+    results = [json.loads(worker.communicate()[0].strip().splitlines()[-1]) for worker in workers]
+    elapsed = time.perf_counter() - started
+
+    counts = Counter()
+    errors = Counter()
+    latencies = []
+    for result in results:
+        counts.update(result['counts'])
+        errors.update(result['errors'])
+        latencies += result['write_latencies']
+    attempted = sum(counts.values()) + sum(errors.values())
+
+    print(f"\nCompleted {sum(counts.values())} of {attempted} operations in {elapsed:.1f}s "
+          f"({sum(counts.values()) / elapsed:.0f} ops/s)")
+    print("  " + ", ".join(f"{name}: {count}" for name, count in sorted(counts.items())))
+    print(f"Errors: {sum(errors.values())} ({sum(errors.values()) / attempted:.1%})")
+    for message, count in errors.most_common():
+        print(f"  {count:>6}x {message}")
+    if latencies:
+        print(f"Write latency: median {statistics.median(latencies) * 1000:.1f}ms, "
+              f"p95 {percentile(latencies, 95) * 1000:.1f}ms, max {max(latencies) * 1000:.1f}ms")
+
+    # Whatever happened, the running totals must still match the rows
+    verified = maintenance.verify_aggregates()
+    mismatches = sum(len(verified[name]) for name in ('balances', 'rollups', 'categories'))
+    problems = maintenance.integrity_check(quick=True)
+    print(f"Running totals: {'consistent' if not mismatches else f'{mismatches} mismatches'}; "
+          f"integrity: {'ok' if not problems else problems}")
+
+if __name__ == "__main__":
+    main()
@@ -13,17 +13,28 @@ from helpers import (
     display_user_transactions,
     display_category_transactions,
     display_all_transactions,
+    search_transactions,
     delete_transaction,
-    view_financial_summary,
+    import_transactions,
+    export_user_transactions,
+    ask_financial_summary,
+    view_monthly_report,
     current_user
 )
-from models import create_tables
+from models import create_tables, profiler
+import argparse
 
 def main():
     """
     Main function that runs the CLI application.
     This uses a while loop to keep the program running until user chooses to exit.
     """
+    parser = argparse.ArgumentParser(description="Personal Finance Tracker (interactive)")
+    parser.add_argument('--profile', action='store_true',
+                        help='report SQL statements, time and likely N+1 queries after each action')
+    if parser.parse_args().profile:
+        profiler.enable()
+    
     # Create database tables if they don't exist
     create_tables()
     
@@ -45,10 +56,17 @@ def main():
         elif choice == "3":
             handle_transaction_management()
         elif choice == "4":
-            view_financial_summary()
+            run_action(ask_financial_summary)
+        elif choice == "5":
+            run_action(view_monthly_report)
         else:
             print("❌ Invalid choice. Please select a number from the menu.")
 
+def run_action(action):
+    """Run one menu action, reporting its SQL when profiling is on"""
+    with profiler.action(action.__name__):
+        return action()
+
 def show_main_menu():
     """
     Display the main menu options.
@@ -70,6 +88,7 @@ def show_main_menu():
     print("2. 📁 Category Management") 
     print("3. 💰 Transaction Management")
     print("4. 📊 View Financial Summary")
+    print("5. 📈 Monthly Report")
     print("0. 🚪 Exit")
     print("="*50)
 
@@ -94,16 +113,16 @@ def handle_user_management():
         if choice == "0":
             break
         elif choice == "1":
-            create_user()
+            run_action(create_user)
         elif choice == "2":
             global current_user
-            user = login_user()
+            user = run_action(login_user)
             if user:
                 current_user = user
         elif choice == "3":
-            display_all_users()
+            run_action(display_all_users)
         elif choice == "4":
-            delete_user()
+            run_action(delete_user)
         else:
             print("❌ Invalid choice.")
 
@@ -128,13 +147,13 @@ def handle_category_management():
         if choice == "0":
             break
         elif choice == "1":
-            create_category()
+            run_action(create_category)
         elif choice == "2":
-            display_user_categories()
+            run_action(display_user_categories)
         elif choice == "3":
-            display_all_categories()
+            run_action(display_all_categories)
         elif choice == "4":
-            delete_category()
+            run_action(delete_category)
         else:
             print("❌ Invalid choice.")
 
@@ -152,6 +171,9 @@ def handle_transaction_management():
         print("3. 📁 View Category Transactions")
         print("4. 🌐 View All Transactions")
         print("5. 🗑️  Delete Transaction")
+        print("6. 📥 Import Bank Statement (CSV/OFX)")
+        print("7. 📤 Export Transactions (CSV/JSONL)")
+        print("8. 🔍 Search Transactions")
         print("0. ⬅️  Back to Main Menu")
         print("="*40)
         
@@ -160,15 +182,21 @@ def handle_transaction_management():
         if choice == "0":
             break
         elif choice == "1":
-            add_transaction()
+            run_action(add_transaction)
         elif choice == "2":
-            display_user_transactions()
+            run_action(display_user_transactions)
         elif choice == "3":
-            display_category_transactions()
+            run_action(display_category_transactions)
         elif choice == "4":
-            display_all_transactions()
+            run_action(display_all_transactions)
         elif choice == "5":
-            delete_transaction()
+            run_action(delete_transaction)
+        elif choice == "6":
+            run_action(import_transactions)
+        elif choice == "7":
+            run_action(export_user_transactions)
+        elif choice == "8":
+            run_action(search_transactions)
         else:
             print("❌ Invalid choice.")
 
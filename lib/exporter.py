@@ -0,0 +1,124 @@
+# lib/exporter.py
+"""
+Streaming export of transactions for Personal Finance Tracker.
+Rows are read with a Core select in batches and written out one at a time,
+so memory use stays the same however many transactions are exported.
+
+Supported formats:
+  csv   - header row followed by one line per transaction
+  jsonl - one JSON object per line
+Either can be gzip-compressed.
+"""
+
+import csv
+import gzip
+import json
+import time
+
+from sqlalchemy import select
+
+from models import engine
+from models.archive import history_table
+from models.category import Category
+from models.money import Money
+from models.transaction import Transaction
+
+SUPPORTED_FORMATS = ('csv', 'jsonl')
+
+# Columns written for every exported transaction, in order
+EXPORT_COLUMNS = (
+    'id', 'user_id', 'transaction_date', 'description', 'amount',
+    'category_id', 'category', 'created_at'
+)
+
+# Rows fetched from the database per round trip
+DEFAULT_EXPORT_BATCH = 1000
+
+def build_export_query(user_id=None, start=None, end=None, source=None):
+    """
+    Build the Core select for an export, oldest transaction first.
+    source replaces the transactions table, e.g. with archive.history_table()
+    """
+    transactions = Transaction.__table__ if source is None else source
+    categories = Category.__table__
+    query = select(
+        transactions.c.id,
+        transactions.c.user_id,
+        transactions.c.transaction_date,
+        transactions.c.description,
+        transactions.c.amount_cents.label('amount'),
+        transactions.c.category_id,
+        categories.c.name.label('category'),
+        transactions.c.created_at
+    ).select_from(
+        transactions.outerjoin(categories, categories.c.id == transactions.c.category_id)
+    )
+    if user_id is not None:
+        query = query.where(transactions.c.user_id == user_id)
+    if start is not None:
+        query = query.where(transactions.c.transaction_date >= start)
+    if end is not None:
+        query = query.where(transactions.c.transaction_date <= end)
+    return query.order_by(transactions.c.transaction_date, transactions.c.id)
+
+def iter_export_rows(user_id=None, start=None, end=None, batch_size=DEFAULT_EXPORT_BATCH):
+    """Yield transactions (archived ones included) as plain dicts, fetching them from the database in batches"""
+    with engine.connect() as connection:
+        query = build_export_query(user_id, start, end, history_table(connection, start))
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for row in result:
+            yield dict(row._mapping)
+
+def _format_value(value):
+    """Dates are written as ISO strings, money as an exact decimal amount; everything else as-is"""
+    if isinstance(value, Money):
+        return value.amount
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def open_output(path, compress=None):
+    """Open the output file for text writing, gzip-compressed for .gz paths or when asked"""
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+def write_rows(rows, output, fmt='csv'):
+    """Write rows to an open text file as they arrive. Returns the number written."""
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(output)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow([_format_value(row[column]) for column in EXPORT_COLUMNS])
+            count += 1
+    else:
+        for row in rows:
+            record = {column: _format_value(row[column]) for column in EXPORT_COLUMNS}
+            # Decimal amounts are written as JSON numbers
+            output.write(json.dumps(record, default=float) + '\n')
+            count += 1
+    return count
+
+def export_transactions(path, fmt='csv', user_id=None, start=None, end=None, compress=None,
+                        batch_size=DEFAULT_EXPORT_BATCH):
+    """
+    Export transactions to a CSV or JSONL file, optionally filtered by user and date range.
+    Returns a dict with the number of rows, elapsed seconds and rows per second.
+    """
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+
+    started = time.perf_counter()
+    with open_output(path, compress) as output:
+        count = write_rows(iter_export_rows(user_id, start, end, batch_size), output, fmt)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'rows': count,
+        'seconds': elapsed,
+        'rows_per_second': count / elapsed if elapsed > 0 else 0.0
+    }
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# lib/finance.py
+"""
+Scriptable command-line interface for Personal Finance Tracker.
+
+    python lib/finance.py add-tx --user me@example.com --amount -12.50 --description "Lunch" --category Food
+    python lib/finance.py list --user me@example.com --since 2024-01-01 [--json]
+    python lib/finance.py summary --user me@example.com --days 30 --json
+    python lib/finance.py maintenance [--analyze] [--vacuum] [--check] [--verify] [--sizes]
+    python lib/finance.py archive --older-than-days 365 [--batch-size 5000]
+
+Output is meant for pipes and cron jobs: CSV or JSON on stdout, errors on
+stderr and a non-zero exit status on failure. --profile (or FINANCE_PROFILE=1)
+adds a report of the SQL each command ran. The interactive menu is still
+lib/cli.py.
+
+SQLAlchemy and the models are only imported once a command actually runs,
+so --help and argument errors return immediately.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+
+def parse_date(value):
+    """argparse type for YYYY-MM-DD dates"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', use YYYY-MM-DD")
+
+def to_json(value):
+    """json.dumps fallback: Money and Decimal as numbers, dates as ISO strings"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return float(getattr(value, 'amount', value))
+
+def date_range(args):
+    """
+    (start, end) from --since/--until/--days; either may be None.
+    --until covers the whole day; --days N means the last N days, today included.
+    """
+    if args.days:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=args.days - 1), None
+    end = args.until.replace(hour=23, minute=59, second=59, microsecond=999999) if args.until else None
+    return args.since, end
+
+def add_date_options(parser):
+    """--since/--until, or --days, for commands that show a date range"""
+    parser.add_argument('--since', type=parse_date, help='first date to include, YYYY-MM-DD')
+    parser.add_argument('--until', type=parse_date, help='last date to include, YYYY-MM-DD')
+    parser.add_argument('--days', type=int, help='only the last N days, today included (overrides --since/--until)')
+
+def print_json(data):
+    """Print one JSON document on stdout"""
+    print(json.dumps(data, default=to_json))
+
+def load_models():
+    """Import every model so the relationships between them can be resolved"""
+    from models import user, category, transaction, user_balance, monthly_rollup, archive
+
+def find_user(value, session):
+    """Look a user up by numeric ID or by email"""
+    from models.user import User
+    user = User.find_by_id(int(value), session=session) if value.isdigit() else User.find_by_email(value, session=session)
+    if not user:
+        raise ValueError(f"No user found for '{value}'")
+    return user
+
+def find_category(user, name, session):
+    """Look up one of a user's categories by name (case-insensitive)"""
+    from models.category import Category
+    for category in Category.find_by_user(user.id, session=session):
+        if category.name.lower() == name.lower():
+            return category
+    raise ValueError(f"User '{user.email}' has no category named '{name}'")
+
+def command_add_tx(args):
+    """Add one transaction and print its ID (or the whole row with --json)"""
+    from models import session_scope, call_with_retries
+    from models.money import Money
+    from models.transaction import Transaction
+
+    amount = Money.parse(args.amount)
+
+    def record():
+        # Retried as a whole if another process holds the database lock
+        with session_scope(write=True) as session:
+            user = find_user(args.user, session)
+            category = find_category(user, args.category, session) if args.category else None
+            transaction = Transaction.create(
+                description=args.description,
+                amount=amount,
+                user_id=user.id,
+                category_id=category.id if category else None,
+                transaction_date=args.date,
+                session=session
+            )
+            return transaction, category, bool(category and amount < 0 and category.is_over_budget)
+
+    transaction, category, over_budget = call_with_retries(record)
+
+    if args.json:
+        print_json({
+            'id': transaction.id,
+            'user_id': transaction.user_id,
+            'transaction_date': transaction.transaction_date,
+            'description': transaction.description,
+            'amount': transaction.amount,
+            'category': category.name if category else None,
+            'over_budget': over_budget
+        })
+    else:
+        print(transaction.id)
+    if over_budget:
+        print(f"warning: over budget for '{category.name}'", file=sys.stderr)
+
+def command_list(args):
+    """Stream a user's transactions, oldest first, as CSV or JSON lines"""
+    from models import session_scope
+    from exporter import iter_export_rows, write_rows
+
+    with session_scope() as session:
+        user_id = find_user(args.user, session).id
+    start, end = date_range(args)
+    rows = iter_export_rows(user_id, start=start, end=end)
+    write_rows(rows, sys.stdout, 'jsonl' if args.json else 'csv')
+
+def command_summary(args):
+    """Print a user's totals and per-category spending, for all time or a date range"""
+    from models import session_scope
+    from models.category import Category
+
+    start, end = date_range(args)
+    with session_scope() as session:
+        user = find_user(args.user, session)
+        summary = user.summary(start, end, session=session)
+        categories = Category.spending_report(user.id, start, end, session=session)
+
+    if args.json:
+        print_json({
+            'user': {'id': user.id, 'name': user.name, 'email': user.email},
+            'since': start,
+            'until': end,
+            'income': summary['income'],
+            'expenses': summary['expenses'],
+            'balance': summary['balance'],
+            'transactions': summary['count'],
+            'categories': [
+                {
+                    'name': category['name'],
+                    'spent': category['spent'],
+                    'budget_limit': category['budget_limit'],
+                    'over_budget': category['is_over_budget']
+                }
+                for category in categories
+            ]
+        })
+        return
+
+    print(f"income\t{summary['income']:.2f}")
+    print(f"expenses\t{summary['expenses']:.2f}")
+    print(f"balance\t{summary['balance']:.2f}")
+    print(f"transactions\t{summary['count']}")
+    for category in categories:
+        print(f"category\t{category['name']}\t{category['spent']:.2f}\t{category['budget_limit']:.2f}")
+
+def command_maintenance(args):
+    """
+    Run the requested maintenance operations (all but --vacuum when none are given).
+    Returns 1 if a check found problems, so cron jobs can alert on it.
+    """
+    import maintenance
+
+    chosen = [args.analyze, args.vacuum, args.check, args.verify, args.sizes]
+    if not any(chosen):
+        args.analyze = args.check = args.verify = args.sizes = True
+    report = {}
+    if args.analyze:
+        report['analyzed_indexes'] = maintenance.analyze(full=args.full)
+    if args.vacuum:
+        report['vacuum'] = maintenance.vacuum(args.pages)
+    if args.check:
+        report['integrity'] = maintenance.integrity_check(quick=not args.full)
+        report['foreign_keys'] = maintenance.foreign_key_check()
+    if args.verify:
+        report['aggregates'] = maintenance.verify_aggregates(
+            args.batch_size or maintenance.DEFAULT_VERIFY_BATCH, args.pause)
+    if args.sizes:
+        report['sizes'] = maintenance.size_report()
+
+    aggregates = report.get('aggregates', {})
+    problems = (len(report.get('integrity', [])) + len(report.get('foreign_keys', []))
+                + sum(len(aggregates.get(name, [])) for name in ('balances', 'rollups', 'categories')))
+    if args.json:
+        print_json(report)
+        return 1 if problems else 0
+
+    if 'analyzed_indexes' in report:
+        print(f"analyze\t{report['analyzed_indexes']} indexes")
+    if 'vacuum' in report:
+        vacuum = report['vacuum']
+        print(f"vacuum\t{'full' if vacuum['full'] else 'incremental'}\t{vacuum['freed_bytes']} bytes freed")
+    for problem in report.get('integrity', []):
+        print(f"integrity\t{problem}")
+    for row in report.get('foreign_keys', []):
+        print(f"foreign_key\t{row['table']}\t{row['rowid']}\t{row['parent']}")
+    if aggregates:
+        print(f"verified\t{aggregates['users_checked']} users")
+        for name in ('balances', 'rollups', 'categories'):
+            for mismatch in aggregates[name]:
+                print(f"mismatch\t{name}\t{json.dumps(mismatch, default=to_json)}")
+    if 'sizes' in report:
+        sizes = report['sizes']
+        print(f"size\ttotal\t{sizes['total_bytes']}")
+        print(f"size\tfree\t{sizes['free_bytes']}")
+        for item in sizes['objects'] or []:
+            print(f"size\t{item['type']}\t{item['name']}\t{item['bytes']}")
+    if problems:
+        print(f"warning: {problems} problems found", file=sys.stderr)
+    return 1 if problems else 0
+
+def command_archive(args):
+    """Move transactions dated before a cutoff to the archive database"""
+    from models import archive
+
+    if args.before:
+        before = args.before
+    else:
+        before = (datetime.now() - timedelta(days=args.older_than_days)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+    moved = archive.archive_transactions(before, args.batch_size or archive.DEFAULT_ARCHIVE_BATCH)
+    if args.json:
+        print_json({'archived': moved, 'before': before, 'path': archive.archive_path()})
+    else:
+        print(f"archived\t{moved}\tbefore {before:%Y-%m-%d}\t{archive.archive_path()}")
+
+def build_parser():
+    """Argument parser with one subparser per command"""
+    parser = argparse.ArgumentParser(
+        prog='finance',
+        description="Personal Finance Tracker - scriptable commands",
+        epilog="Run lib/cli.py without arguments for the interactive menu."
+    )
+    parser.add_argument('--profile', action='store_true',
+                        help='report SQL statements and likely N+1 queries on stderr')
+    subcommands = parser.add_subparsers(dest='command', metavar='COMMAND', required=True)
+
+    add_tx = subcommands.add_parser('add-tx', help='add a transaction')
+    add_tx.add_argument('--user', required=True, help='user ID or email')
+    add_tx.add_argument('--amount', required=True, help='positive for income, negative for an expense')
+    add_tx.add_argument('--description', required=True)
+    add_tx.add_argument('--category', help='category name')
+    add_tx.add_argument('--date', type=parse_date, help='YYYY-MM-DD (default: now)')
+    add_tx.add_argument('--json', action='store_true', help='print the new transaction as JSON')
+    add_tx.set_defaults(handler=command_add_tx)
+
+    list_tx = subcommands.add_parser('list', help="list a user's transactions")
+    list_tx.add_argument('--user', required=True, help='user ID or email')
+    add_date_options(list_tx)
+    list_tx.add_argument('--json', action='store_true', help='one JSON object per line instead of CSV')
+    list_tx.set_defaults(handler=command_list)
+
+    summary = subcommands.add_parser('summary', help="show a user's totals")
+    summary.add_argument('--user', required=True, help='user ID or email')
+    add_date_options(summary)
+    summary.add_argument('--json', action='store_true', help='print a JSON object')
+    summary.set_defaults(handler=command_summary)
+
+    maintain = subcommands.add_parser('maintenance', help='check, tune and compact the database')
+    maintain.add_argument('--analyze', action='store_true', help='refresh query planner statistics')
+    maintain.add_argument('--vacuum', action='store_true',
+                          help='release free pages (the first run rewrites the whole file)')
+    maintain.add_argument('--check', action='store_true', help='run integrity and foreign key checks')
+    maintain.add_argument('--verify', action='store_true', help='verify the stored running totals')
+    maintain.add_argument('--sizes', action='store_true', help='report table and index sizes')
+    maintain.add_argument('--full', action='store_true',
+                          help='full ANALYZE and full integrity_check instead of the quick versions')
+    maintain.add_argument('--pages', type=int, help='most free pages to release with --vacuum (default: all)')
+    maintain.add_argument('--batch-size', type=int, help='users verified per batch (default: 200)')
+    maintain.add_argument('--pause', type=float, default=0.0, help='seconds to sleep between verify batches')
+    maintain.add_argument('--json', action='store_true', help='print a JSON object')
+    maintain.set_defaults(handler=command_maintenance)
+
+    archive = subcommands.add_parser('archive', help='move old transactions to the archive database')
+    cutoff = archive.add_mutually_exclusive_group(required=True)
+    cutoff.add_argument('--before', type=parse_date, help='archive transactions dated before YYYY-MM-DD')
+    cutoff.add_argument('--older-than-days', type=int, help='archive transactions older than this many days')
+    archive.add_argument('--batch-size', type=int, help='transactions moved per database transaction (default: 5000)')
+    archive.add_argument('--json', action='store_true', help='print a JSON object')
+    archive.set_defaults(handler=command_archive)
+
+    return parser
+
+def main(argv=None):
+    """Run one command; returns the process exit status"""
+    args = build_parser().parse_args(argv)
+    try:
+        from models import create_tables, profiler
+        load_models()
+        # A no-op unless the database is new or behind the latest migration
+        create_tables()
+        if args.profile:
+            profiler.enable()
+        with profiler.action(args.command):
+            # Handlers may return an exit status (e.g. maintenance checks that found problems)
+            status = args.handler(args)
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head); not an error
+        sys.stderr.close()
+        return 0
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return status or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
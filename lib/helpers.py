@@ -1,13 +1,34 @@
 # lib/helpers.py
+from models import session_scope, call_with_retries
 from models.user import User
 from models.category import Category
 from models.transaction import Transaction
+from models.monthly_rollup import MonthlyRollup
+from models.money import Money
+from importer import import_statement, SUPPORTED_FORMATS
+from exporter import export_transactions, SUPPORTED_FORMATS as EXPORT_FORMATS
 from datetime import datetime
+import os
 import re
 
 # Global variable to store current user
 current_user = None
 
+# Number of transactions shown before asking whether to load more
+PAGE_SIZE = 20
+
+# Sort choices on the All Users screen: (sort key, descending)
+USER_SORTS = {
+    '1': ('id', False),
+    '2': ('name', False),
+    '3': ('balance', True),
+    '4': ('transactions', True)
+}
+
+# How many months the monthly report covers, and how wide its bars are
+REPORT_MONTHS = 12
+BAR_WIDTH = 30
+
 def exit_program():
     """Exit the program gracefully"""
     print("Thank you for using Personal Finance Tracker. Goodbye!")
@@ -19,15 +40,35 @@ def validate_email(email):
     return re.match(pattern, email) is not None
 
 def validate_amount(amount_str):
-    """Validate and convert amount string to float"""
+    """Validate and convert amount string to Money"""
     try:
-        amount = float(amount_str)
+        amount = Money.parse(amount_str)
         if amount == 0:
             raise ValueError("Amount cannot be zero")
         return amount
     except ValueError:
         raise ValueError("Please enter a valid number")
 
+def parse_optional_date(prompt):
+    """Ask for an optional YYYY-MM-DD date; returns None when skipped"""
+    while True:
+        value = input(prompt).strip()
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            print("Please use the format YYYY-MM-DD.")
+
+def ask_date_range():
+    """Ask for optional from/to dates; returns (start, end) with the whole end day included"""
+    start = parse_optional_date("From date (YYYY-MM-DD, optional): ")
+    end = parse_optional_date("To date (YYYY-MM-DD, optional): ")
+    if end:
+        # Include the whole end day
+        end = end.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return start, end
+
 def get_user_input(prompt, validator=None):
     """Get user input with optional validation"""
     while True:
@@ -46,6 +87,27 @@ def get_user_input(prompt, validator=None):
             print("\nOperation cancelled.")
             return None
 
+def page_through(fetch_page, display):
+    """
+    Show results one page at a time.
+    fetch_page(after) returns (items, next_cursor); display(item) prints one item.
+    Returns the number of items shown.
+    """
+    shown = 0
+    after = None
+    while True:
+        items, after = fetch_page(after)
+        for item in items:
+            display(item)
+        shown += len(items)
+        
+        if after is None:
+            break
+        more = input(f"Showing {shown} so far. Press Enter for more or 'q' to stop: ").strip().lower()
+        if more == 'q':
+            break
+    return shown
+
 # User Management Functions
 def create_user():
     """Create a new user account"""
@@ -87,18 +149,24 @@ def login_user():
         return None
 
 def display_all_users():
-    """Display all users in the system"""
+    """Display all users in the system, a page at a time"""
     print("\n=== All Users ===")
+    print("Sort by: 1. ID  2. Name  3. Balance (highest first)  4. Transactions (most first)")
+    sort, descending = USER_SORTS.get(input("Choice (Enter for ID): ").strip(), USER_SORTS['1'])
+    
     try:
-        users_data = User.get_all()
-        if not users_data:
-            print("No users found.")
-            return
-        
-        for user_info in users_data:
+        def display(user_info):
             print(f"ID: {user_info['id']} | Name: {user_info['name']} | Email: {user_info['email']}")
             print(f"  Balance: ${user_info['balance']:.2f} | Categories: {user_info['categories_count']} | Transactions: {user_info['transactions_count']}")
             print("-" * 50)
+        
+        # Each page is one grouped query, however many users and transactions there are
+        shown = page_through(
+            lambda after: User.get_page(sort=sort, descending=descending, after=after, limit=PAGE_SIZE),
+            display
+        )
+        if not shown:
+            print("No users found.")
     except Exception as e:
         print(f"❌ Error retrieving users: {e}")
 
@@ -143,16 +211,16 @@ def create_category():
         return
     
     budget_input = input("Enter budget limit for this category (optional, press Enter to skip): ").strip()
-    budget_limit = 0.0
+    budget_limit = Money(0)
     if budget_input:
         try:
-            budget_limit = float(budget_input)
+            budget_limit = Money.parse(budget_input)
             if budget_limit < 0:
                 print("Budget limit cannot be negative. Setting to 0.")
-                budget_limit = 0.0
+                budget_limit = Money(0)
         except ValueError:
             print("Invalid budget amount. Setting to 0.")
-            budget_limit = 0.0
+            budget_limit = Money(0)
     
     try:
         category = Category.create(name=name, user_id=current_user.id, budget_limit=budget_limit)
@@ -169,20 +237,20 @@ def display_user_categories():
     
     print(f"\n=== {current_user.name}'s Categories ===")
     try:
-        categories = Category.find_by_user(current_user.id)
+        categories = Category.spending_report(current_user.id)
         if not categories:
             print("No categories found. Create some categories first!")
             return
         
         for category in categories:
             budget_info = ""
-            if category.budget_limit > 0:
-                remaining = category.remaining_budget
-                status = "⚠️ OVER BUDGET" if category.is_over_budget else "✅"
-                budget_info = f" | Budget: ${category.budget_limit:.2f} | Remaining: ${remaining:.2f} {status}"
+            if category['budget_limit'] > 0:
+                remaining = category['remaining_budget']
+                status = "⚠️ OVER BUDGET" if category['is_over_budget'] else "✅"
+                budget_info = f" | Budget: ${category['budget_limit']:.2f} | Remaining: ${remaining:.2f} {status}"
             
-            print(f"ID: {category.id} | Name: {category.name} | Spent: ${category.total_spent:.2f}{budget_info}")
-            print(f"  Transactions: {len(category.transactions)}")
+            print(f"ID: {category['id']} | Name: {category['name']} | Spent: ${category['spent']:.2f}{budget_info}")
+            print(f"  Transactions: {category['transactions_count']}")
             print("-" * 70)
     except Exception as e:
         print(f"❌ Error retrieving categories: {e}")
@@ -191,14 +259,14 @@ def display_all_categories():
     """Display all categories in the system"""
     print("\n=== All Categories ===")
     try:
-        categories = Category.get_all()
+        categories = Category.spending_report()
         if not categories:
             print("No categories found.")
             return
         
         for category in categories:
-            print(f"ID: {category.id} | Name: {category.name} | User: {category.user.name}")
-            print(f"  Budget: ${category.budget_limit:.2f} | Spent: ${category.total_spent:.2f}")
+            print(f"ID: {category['id']} | Name: {category['name']} | User: {category['user_name']}")
+            print(f"  Budget: ${category['budget_limit']:.2f} | Spent: ${category['spent']:.2f}")
             print("-" * 50)
     except Exception as e:
         print(f"❌ Error retrieving categories: {e}")
@@ -266,7 +334,8 @@ def add_transaction():
         return
     
     try:
-        amount = float(amount_str)
+        # Parsed straight to whole cents, so "19.99" is stored exactly
+        amount = Money.parse(amount_str)
         if amount <= 0:
             print("❌ Amount must be positive.")
             return
@@ -298,66 +367,112 @@ def add_transaction():
                     print("❌ Invalid category selection.")
                     return
     
+    def record():
+        """One unit of work: the insert and the budget check share a session and a transaction"""
+        with session_scope(write=True) as session:
+            transaction = Transaction.create(
+                description=description,
+                amount=amount,
+                user_id=current_user.id,
+                category_id=category_id,
+                session=session
+            )
+            category = transaction.category
+            return (category.name if category else None), bool(category and category.is_over_budget)
+    
     try:
-        transaction = Transaction.create(
-            description=description,
-            amount=amount,
-            user_id=current_user.id,
-            category_id=category_id
-        )
+        # Retried as a whole if another process holds the database lock
+        category_name, over_budget = call_with_retries(record)
         
         trans_type = "Income" if is_income else "Expense"
-        category_name = ""
-        if transaction.category:
-            category_name = f" in category '{transaction.category.name}'"
-        
-        print(f"✅ {trans_type} of ${abs(amount):.2f}{category_name} added successfully!")
+        in_category = f" in category '{category_name}'" if category_name else ""
+        print(f"✅ {trans_type} of ${abs(amount):.2f}{in_category} added successfully!")
         
         # Check budget warning for expenses
-        if not is_income and transaction.category and transaction.category.is_over_budget:
-            print(f"⚠️  WARNING: You've exceeded your budget for '{transaction.category.name}'!")
+        if not is_income and over_budget:
+            print(f"⚠️  WARNING: You've exceeded your budget for '{category_name}'!")
             
     except Exception as e:
         print(f"❌ Error adding transaction: {e}")
 
 def display_user_transactions():
-    """Display all transactions for current user"""
+    """Display the current user's transactions, optionally only those in a date range"""
     if not current_user:
         print("❌ Please login first.")
         return
     
     print(f"\n=== {current_user.name}'s Transaction History ===")
+    # Leave both dates empty for the whole history
+    start, end = ask_date_range()
     try:
-        transactions = Transaction.find_by_user(current_user.id)
-        if not transactions:
+        # Look up category names once instead of loading them for every row
+        category_names = {cat.id: cat.name for cat in Category.find_by_user(current_user.id)}
+        
+        def display(transaction):
+            trans_type = "📈 INCOME" if transaction.is_income else "📉 EXPENSE"
+            category_name = category_names.get(transaction.category_id, "No Category")
+            date_str = transaction.transaction_date.strftime("%Y-%m-%d %H:%M")
+            
+            print(f"ID: {transaction.id} | {trans_type} | {transaction.formatted_amount}")
+            print(f"  Description: {transaction.description}")
+            print(f"  Category: {category_name} | Date: {date_str}")
+            print("-" * 70)
+        
+        shown = page_through(
+            lambda after: Transaction.get_page(user_id=current_user.id, after=after, limit=PAGE_SIZE,
+                                               start=start, end=end),
+            display
+        )
+        if not shown:
             print("No transactions found. Add some transactions first!")
             return
         
-        total_income = 0
-        total_expenses = 0
+        # Totals come from one aggregate query, not from the rows shown above
+        summary = current_user.summary(start, end)
+        print(f"\n💰 SUMMARY:")
+        print(f"Total Income: ${summary['income']:.2f}")
+        print(f"Total Expenses: ${summary['expenses']:.2f}")
+        print(f"Net Balance: ${summary['balance']:.2f}")
         
-        for transaction in transactions:
+    except Exception as e:
+        print(f"❌ Error retrieving transactions: {e}")
+
+def search_transactions():
+    """Search the current user's transaction descriptions, best matches first"""
+    if not current_user:
+        print("❌ Please login first.")
+        return
+    
+    print("\n=== Search Transactions ===")
+    query = get_user_input("Search for (e.g. 'amazon' or 'coffee shop'): ")
+    if not query:
+        return
+    start, end = ask_date_range()
+    
+    try:
+        category_names = {cat.id: cat.name for cat in Category.find_by_user(current_user.id)}
+        
+        def display(transaction):
             trans_type = "📈 INCOME" if transaction.is_income else "📉 EXPENSE"
-            category_name = transaction.category.name if transaction.category else "No Category"
+            category_name = category_names.get(transaction.category_id, "No Category")
             date_str = transaction.transaction_date.strftime("%Y-%m-%d %H:%M")
             
-            print(f"ID: {transaction.id} | {trans_type} | ${transaction.formatted_amount}")
+            print(f"ID: {transaction.id} | {trans_type} | {transaction.formatted_amount}")
             print(f"  Description: {transaction.description}")
             print(f"  Category: {category_name} | Date: {date_str}")
             print("-" * 70)
-            
-            if transaction.is_income:
-                total_income += transaction.amount
-            else:
-                total_expenses += abs(transaction.amount)
         
-        print(f"\n💰 SUMMARY:")
-        print(f"Total Income: ${total_income:.2f}")
-        print(f"Total Expenses: ${total_expenses:.2f}")
-        print(f"Net Balance: ${total_income - total_expenses:.2f}")
+        # Served by the full-text index, so it stays fast however long the history is
+        shown = page_through(
+            lambda offset: Transaction.search(current_user.id, query, date_range=(start, end),
+                                              limit=PAGE_SIZE, offset=offset),
+            display
+        )
+        if not shown:
+            print(f"No transactions match '{query}'.")
         
     except Exception as e:
-        print(f"❌ Error retrieving transactions: {e}")
+        print(f"❌ Error searching transactions: {e}")
 
 def display_category_transactions():
     """Display transactions for a specific category"""
@@ -368,49 +483,56 @@ def display_category_transactions():
     print("\n=== Category Transactions ===")
     
     # Show user's categories
-    categories = Category.find_by_user(current_user.id)
+    categories = Category.spending_report(current_user.id)
     if not categories:
         print("No categories found. Create some categories first!")
         return
     
     print("Your categories:")
     for cat in categories:
-        print(f"{cat.id}. {cat.name} (${cat.total_spent:.2f} spent)")
+        print(f"{cat['id']}. {cat['name']} (${cat['spent']:.2f} spent)")
     
     category_id = get_user_input("Enter category ID: ", lambda x: int(x))
     if not category_id:
         return
+    # Leave both dates empty for the whole history
+    start, end = ask_date_range()
     
     try:
-        category = Category.find_by_id(category_id)
-        if not category or category.user_id != current_user.id:
+        # The report only contains this user's categories
+        category = next((cat for cat in categories if cat['id'] == category_id), None)
+        if not category:
             print("❌ Category not found or doesn't belong to you.")
             return
         
-        print(f"\n=== Transactions in '{category.name}' ===")
-        transactions = Transaction.find_by_category(category_id)
-        
-        if not transactions:
-            print("No transactions found in this category.")
-            return
+        print(f"\n=== Transactions in '{category['name']}' ===")
         
-        total_spent = 0
-        for transaction in transactions:
+        def display(transaction):
             date_str = transaction.transaction_date.strftime("%Y-%m-%d %H:%M")
-            print(f"ID: {transaction.id} | ${transaction.formatted_amount}")
+            print(f"ID: {transaction.id} | {transaction.formatted_amount}")
             print(f"  Description: {transaction.description}")
             print(f"  Date: {date_str}")
             print("-" * 50)
-            
-            if transaction.is_expense:
-                total_spent += abs(transaction.amount)
         
-        print(f"\nTotal spent in this category: ${total_spent:.2f}")
-        if category.budget_limit > 0:
-            remaining = category.remaining_budget
-            print(f"Budget limit: ${category.budget_limit:.2f}")
+        shown = page_through(
+            lambda after: Transaction.get_page(category_id=category_id, after=after, limit=PAGE_SIZE,
+                                               start=start, end=end),
+            display
+        )
+        if not shown:
+            print("No transactions found in this category.")
+            return
+        
+        if start or end:
+            # One aggregate over the range, from the category/date index
+            spent = Transaction.totals(category_id=category_id, start=start, end=end)['expenses']
+            print(f"\nSpent in this category in the period: ${spent:.2f}")
+        print(f"\nTotal spent in this category: ${category['spent']:.2f}")
+        if category['budget_limit'] > 0:
+            remaining = category['remaining_budget']
+            print(f"Budget limit: ${category['budget_limit']:.2f}")
             print(f"Remaining budget: ${remaining:.2f}")
-            if category.is_over_budget:
+            if category['is_over_budget']:
                 print("⚠️  OVER BUDGET!")
         
     except Exception as e:
@@ -420,20 +542,23 @@ def display_all_transactions():
     """Display all transactions in the system (admin function)"""
     print("\n=== All Transactions ===")
     try:
-        transactions = Transaction.get_all()
-        if not transactions:
-            print("No transactions found.")
-            return
-        
-        for transaction in transactions:
+        def display(transaction):
             trans_type = "INCOME" if transaction.is_income else "EXPENSE"
             category_name = transaction.category.name if transaction.category else "No Category"
             date_str = transaction.transaction_date.strftime("%Y-%m-%d")
             
-            print(f"ID: {transaction.id} | {trans_type} | ${transaction.formatted_amount}")
+            print(f"ID: {transaction.id} | {trans_type} | {transaction.formatted_amount}")
             print(f"  User: {transaction.user.name} | Category: {category_name}")
             print(f"  Description: {transaction.description} | Date: {date_str}")
             print("-" * 60)
+        
+        # Users and categories come back in the same query as each page
+        shown = page_through(
+            lambda after: Transaction.get_page(after=after, limit=PAGE_SIZE, with_user=True, with_category=True),
+            display
+        )
+        if not shown:
+            print("No transactions found.")
     except Exception as e:
         print(f"❌ Error retrieving transactions: {e}")
 
@@ -450,34 +575,114 @@ def delete_transaction():
         return
     
     try:
-        transaction = Transaction.find_by_id(transaction_id)
-        if not transaction:
-            print("❌ Transaction not found.")
-            return
+        # Read what to show, then let the session go: nothing stays open while we wait for an answer
+        with session_scope() as session:
+            transaction = Transaction.find_by_id(transaction_id, session=session)
+            if not transaction:
+                print("❌ Transaction not found.")
+                return
+            
+            if transaction.user_id != current_user.id:
+                print("❌ You can only delete your own transactions.")
+                return
+            
+            # Show transaction details
+            trans_type = "Income" if transaction.is_income else "Expense"
+            category_name = transaction.category.name if transaction.category else "No Category"
+            print(f"\nTransaction to delete:")
+            print(f"  {trans_type}: {transaction.formatted_amount}")
+            print(f"  Description: {transaction.description}")
+            print(f"  Category: {category_name}")
         
-        if transaction.user_id != current_user.id:
-            print("❌ You can only delete your own transactions.")
+        confirmation = input("Are you sure you want to delete this transaction? (yes/no): ").strip().lower()
+        if confirmation != 'yes':
+            print("Deletion cancelled.")
             return
         
-        # Show transaction details
-        trans_type = "Income" if transaction.is_income else "Expense"
-        category_name = transaction.category.name if transaction.category else "No Category"
-        print(f"\nTransaction to delete:")
-        print(f"  {trans_type}: ${transaction.formatted_amount}")
-        print(f"  Description: {transaction.description}")
-        print(f"  Category: {category_name}")
+        def remove():
+            """One unit of work holding the write lock; False if the transaction went meanwhile"""
+            with session_scope(write=True) as session:
+                transaction = Transaction.find_by_id(transaction_id, session=session)
+                if not transaction or transaction.user_id != current_user.id:
+                    return False
+                transaction.delete(session=session)
+                return True
         
-        confirmation = input("Are you sure you want to delete this transaction? (yes/no): ").strip().lower()
-        if confirmation == 'yes':
-            transaction.delete()
+        # Retried as a whole if another process holds the database lock
+        if call_with_retries(remove):
             print("✅ Transaction deleted successfully.")
         else:
-            print("Deletion cancelled.")
+            print("❌ Transaction not found.")
     except Exception as e:
         print(f"❌ Error deleting transaction: {e}")
 
-def view_financial_summary():
-    """Show comprehensive financial summary"""
+def import_transactions():
+    """Bulk import transactions from a CSV or OFX bank statement"""
+    if not current_user:
+        print("❌ Please login first.")
+        return
+    
+    print("\n=== Import Bank Statement ===")
+    print(f"Supported formats: {', '.join(SUPPORTED_FORMATS)}")
+    print("CSV files need a header row with date, description, amount and optionally category.")
+    
+    path = get_user_input("Enter path to statement file: ")
+    if not path:
+        return
+    path = os.path.expanduser(path)
+    if not os.path.isfile(path):
+        print("❌ File not found.")
+        return
+    
+    try:
+        result = import_statement(path, current_user.id)
+        print(f"✅ Imported {result['rows']} transactions in {result['seconds']:.2f}s "
+              f"({result['rows_per_second']:.0f} rows/sec)")
+    except Exception as e:
+        print(f"❌ Error importing statement (nothing was imported): {e}")
+
+def export_user_transactions():
+    """Export the current user's transactions to a CSV or JSONL file"""
+    if not current_user:
+        print("❌ Please login first.")
+        return
+    
+    print("\n=== Export Transactions ===")
+    print(f"Supported formats: {', '.join(EXPORT_FORMATS)} (add .gz to compress)")
+    
+    path = get_user_input("Enter output file path (e.g., ledger.csv or ledger.jsonl.gz): ")
+    if not path:
+        return
+    path = os.path.expanduser(path)
+    
+    # Work out the format from the extension, ignoring any .gz suffix
+    base = path[:-3] if path.endswith('.gz') else path
+    fmt = os.path.splitext(base)[1].lower().lstrip('.')
+    if fmt not in EXPORT_FORMATS:
+        print(f"❌ Unsupported file type. Use one of: {', '.join(EXPORT_FORMATS)}")
+        return
+    
+    start, end = ask_date_range()
+    
+    try:
+        result = export_transactions(path, fmt=fmt, user_id=current_user.id, start=start, end=end)
+        print(f"✅ Exported {result['rows']} transactions to {path} in {result['seconds']:.2f}s "
+              f"({result['rows_per_second']:.0f} rows/sec)")
+    except Exception as e:
+        print(f"❌ Error exporting transactions: {e}")
+
+def ask_financial_summary():
+    """Menu entry: ask for an optional date range, then show the financial summary"""
+    if not current_user:
+        print("❌ Please login first.")
+        return
+    
+    # Leave both dates empty for all-time totals
+    start, end = ask_date_range()
+    view_financial_summary(start, end)
+
+def view_financial_summary(start=None, end=None):
+    """Show comprehensive financial summary, for all time or an inclusive date range"""
     if not current_user:
         print("❌ Please login first.")
         return
@@ -485,45 +690,91 @@ def view_financial_summary():
     print(f"\n=== Financial Summary for {current_user.name} ===")
     
     try:
-        # Overall summary
-        balance = current_user.balance
-        total_income = current_user.total_income
-        total_expenses = current_user.total_expenses
-        
-        categories = Category.find_by_user(current_user.id)
-        transactions = Transaction.find_by_user(current_user.id)
+        # Overall summary - one aggregate query instead of loading every transaction
+        # Both reports read from the same session so they see a consistent snapshot
+        with session_scope() as session:
+            summary = current_user.summary(start, end, session=session)
+            categories = Category.spending_report(current_user.id, start, end, session=session)
         
-        print(f"💰 Total Income: ${total_income:.2f}")
-        print(f"💸 Total Expenses: ${total_expenses:.2f}")
-        print(f"💵 Net Balance: ${balance:.2f}")
+        print(f"💰 Total Income: ${summary['income']:.2f}")
+        print(f"💸 Total Expenses: ${summary['expenses']:.2f}")
+        print(f"💵 Net Balance: ${summary['balance']:.2f}")
         print(f"📁 Categories: {len(categories)}")
-        print(f"📊 Transactions: {len(transactions)}")
+        print(f"📊 Transactions: {summary['count']}")
         
         # Category breakdown
         if categories:
             print(f"\n📋 CATEGORY BREAKDOWN:")
             print("-" * 50)
             
-            categories_with_spending = [(cat, cat.total_spent) for cat in categories if cat.total_spent > 0]
-            categories_with_spending.sort(key=lambda x: x[1], reverse=True)  # Sort by spending amount
+            categories_with_spending = [cat for cat in categories if cat['spent'] > 0]
+            categories_with_spending.sort(key=lambda cat: cat['spent'], reverse=True)  # Sort by spending amount
             
-            for category, spent in categories_with_spending:
+            for category in categories_with_spending:
+                spent = category['spent']
                 budget_info = ""
-                if category.budget_limit > 0:
-                    percentage_used = (spent / category.budget_limit) * 100
-                    status = "⚠️ OVER" if category.is_over_budget else "✅"
-                    budget_info = f" | Budget: ${category.budget_limit:.2f} ({percentage_used:.1f}% used) {status}"
+                if category['budget_limit'] > 0:
+                    percentage_used = (spent / category['budget_limit']) * 100
+                    status = "⚠️ OVER" if category['is_over_budget'] else "✅"
+                    budget_info = f" | Budget: ${category['budget_limit']:.2f} ({percentage_used:.1f}% used) {status}"
                 
-                print(f"  {category.name}: ${spent:.2f}{budget_info}")
+                print(f"  {category['name']}: ${spent:.2f}{budget_info}")
         
         # Budget alerts
-        over_budget_categories = [cat for cat in categories if cat.is_over_budget]
+        over_budget_categories = [cat for cat in categories if cat['is_over_budget']]
         if over_budget_categories:
             print(f"\n⚠️  BUDGET ALERTS:")
             for category in over_budget_categories:
-                overage = category.total_spent - category.budget_limit
-                print(f"  {category.name}: Over budget by ${overage:.2f}")
+                overage = category['spent'] - category['budget_limit']
+                print(f"  {category['name']}: Over budget by ${overage:.2f}")
         
     except Exception as e:
         print(f"❌ Error generating financial summary: {e}")
-        
\ No newline at end of file
+        
+def months_ago(count, today=None):
+    """'YYYY-MM' of the month 'count' months before this one"""
+    today = today or datetime.now()
+    total = today.year * 12 + (today.month - 1) - count
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+def view_monthly_report():
+    """Show month-over-month income, expenses and category spending trends"""
+    if not current_user:
+        print("❌ Please login first.")
+        return
+    
+    start_month = months_ago(REPORT_MONTHS - 1)
+    print(f"\n=== Monthly Report for {current_user.name} (since {start_month}) ===")
+    
+    try:
+        # Read from the monthly rollup table - a few rows per month, not every transaction
+        with session_scope() as session:
+            months = MonthlyRollup.monthly_totals(current_user.id, start_month=start_month, session=session)
+            trends = MonthlyRollup.category_trends(current_user.id, start_month=start_month, session=session)
+        
+        if not months:
+            print("No transactions in this period.")
+            return
+        
+        # Income vs expenses per month, with a bar scaled to the biggest month
+        largest = max(max(month['income'], month['expenses']) for month in months) or Money(1)
+        print(f"{'Month':<8} {'Income $':>12} {'Expenses $':>12} {'Net $':>12}  Expenses")
+        print("-" * (50 + BAR_WIDTH))
+        for month in months:
+            bar = "█" * round(month['expenses'] / largest * BAR_WIDTH)
+            print(f"{month['year_month']:<8} {month['income']:>12.2f} {month['expenses']:>12.2f} "
+                  f"{month['net']:>12.2f}  {bar}")
+        
+        # Per-category trend: one column per month, biggest categories first
+        if trends:
+            month_keys = [month['year_month'] for month in months]
+            print(f"\n📋 CATEGORY TRENDS (spending per month, $):")
+            print(f"{'Category':<16}" + "".join(f"{key[2:]:>10}" for key in month_keys))
+            print("-" * (16 + 10 * len(month_keys)))
+            ordered = sorted(trends.items(), key=lambda item: sum(item[1].values()), reverse=True)
+            for name, by_month in ordered:
+                cells = "".join(f"{by_month.get(key, 0.0):>10.2f}" for key in month_keys)
+                print(f"{name[:15]:<16}{cells}")
+        
+    except Exception as e:
+        print(f"❌ Error generating monthly report: {e}")
@@ -0,0 +1,126 @@
+# lib/importer.py
+"""
+Bulk import of bank statements for Personal Finance Tracker.
+Statements are parsed as a stream and inserted in batches through
+Transaction.bulk_create, so a year of data loads in one database transaction.
+
+Supported formats:
+  CSV - header row with 'date', 'description' and 'amount' columns,
+        plus an optional 'category' column holding a category name
+  OFX - <STMTTRN> blocks from OFX 1.x (SGML) or 2.x (XML) files
+"""
+
+import csv
+import html
+import os
+import re
+import time
+from datetime import datetime
+
+from models.category import Category
+from models.money import Money
+from models.transaction import Transaction, DEFAULT_BULK_CHUNK
+
+SUPPORTED_FORMATS = ('csv', 'ofx')
+
+# Matches "<TAG>value" as well as closing tags like "</STMTTRN>"
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+
+def detect_format(path):
+    """Guess the statement format from the file extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension == 'qfx':
+        extension = 'ofx'
+    if extension not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported file type '{extension}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+    return extension
+
+def parse_date(value):
+    """Parse an ISO date (2024-01-31) or OFX date (20240131120000[-5:EST])"""
+    value = value.strip()
+    if value[:8].isdigit():
+        digits = re.match(r'\d+', value).group()
+        return datetime.strptime(digits[:14], "%Y%m%d%H%M%S" if len(digits) >= 14 else "%Y%m%d")
+    return datetime.fromisoformat(value)
+
+def parse_csv(lines, category_ids=None):
+    """
+    Yield transaction rows from CSV lines one at a time.
+    'category_ids' maps lower-case category names to ids for the optional category column.
+    """
+    category_ids = category_ids or {}
+    reader = csv.DictReader(lines)
+    fields = {name.strip().lower() for name in (reader.fieldnames or [])}
+    missing = {'date', 'description', 'amount'} - fields
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(sorted(missing))}")
+
+    for line_number, record in enumerate(reader, start=2):
+        record = {key.strip().lower(): (value or '').strip() for key, value in record.items() if key}
+        try:
+            row = {
+                'transaction_date': parse_date(record['date']),
+                'description': record['description'],
+                'amount': Money.parse(record['amount'])
+            }
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {e}")
+
+        category_name = record.get('category')
+        if category_name:
+            if category_name.lower() not in category_ids:
+                raise ValueError(f"Line {line_number}: Unknown category '{category_name}'")
+            row['category_id'] = category_ids[category_name.lower()]
+        yield row
+
+def parse_ofx(lines):
+    """Yield transaction rows from the <STMTTRN> blocks of an OFX file, line by line"""
+    current = None
+    for line in lines:
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if not closing:
+                    current = {}
+                elif current is not None:
+                    yield _ofx_row(current)
+                    current = None
+            elif current is not None and not closing:
+                # Values are SGML/XML text: "Coffee &amp; Co" means "Coffee & Co"
+                current[tag] = html.unescape(value.strip())
+
+def _ofx_row(fields):
+    """Convert the fields of one <STMTTRN> block into a transaction row"""
+    if 'DTPOSTED' not in fields or 'TRNAMT' not in fields:
+        raise ValueError(f"OFX transaction {fields.get('FITID', '?')} is missing DTPOSTED or TRNAMT")
+    return {
+        'transaction_date': parse_date(fields['DTPOSTED']),
+        'description': fields.get('NAME') or fields.get('MEMO') or fields.get('TRNTYPE', ''),
+        'amount': Money.parse(fields['TRNAMT'])
+    }
+
+def import_statement(path, user_id, fmt=None, chunk_size=DEFAULT_BULK_CHUNK):
+    """
+    Import a CSV or OFX statement for a user.
+    Everything is inserted in one database transaction: a bad row imports nothing.
+    Returns a dict with the number of rows, elapsed seconds and rows per second.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+
+    started = time.perf_counter()
+    with open(path, newline='', encoding='utf-8-sig') as statement:
+        if fmt == 'csv':
+            category_ids = {cat.name.lower(): cat.id for cat in Category.find_by_user(user_id)}
+            rows = parse_csv(statement, category_ids)
+        else:
+            rows = parse_ofx(statement)
+        count = Transaction.bulk_create(rows, user_id, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'rows': count,
+        'seconds': elapsed,
+        'rows_per_second': count / elapsed if elapsed > 0 else 0.0
+    }
@@ -0,0 +1,153 @@
+# lib/maintenance.py
+"""
+Database maintenance for Personal Finance Tracker.
+
+    analyze()            refresh the statistics SQLite's query planner uses
+    vacuum()             return free pages to the file system (incrementally)
+    integrity_check()    PRAGMA integrity_check
+    foreign_key_check()  PRAGMA foreign_key_check
+    verify_aggregates()  recompute the running totals in batches and compare
+    size_report()        space used by every table and index
+
+Every operation is safe to run while the tracker is in use: the checks only
+read, and verify_aggregates() works through users in small batches, each
+compared in single statements, so writers are never locked out for long.
+Run them from lib/debug_cleanup.py or `python lib/finance.py maintenance`.
+"""
+
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from models import engine, session_scope
+
+# Rows ANALYZE samples per index; keeps it fast on large tables (0 = read everything)
+ANALYSIS_LIMIT = 1000
+# Users whose totals are verified per batch
+DEFAULT_VERIFY_BATCH = 200
+# PRAGMA auto_vacuum value for incremental mode
+AUTO_VACUUM_INCREMENTAL = 2
+
+def analyze(full=False):
+    """
+    Refresh the query planner's statistics. By default ANALYZE samples at most
+    ANALYSIS_LIMIT rows per index, then PRAGMA optimize; full=True reads every row.
+    Returns the number of indexes that now have statistics.
+    """
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f"PRAGMA analysis_limit={0 if full else ANALYSIS_LIMIT}")
+        connection.exec_driver_sql("ANALYZE")
+        connection.exec_driver_sql("PRAGMA optimize")
+        analyzed = connection.exec_driver_sql("SELECT COUNT(DISTINCT idx) FROM sqlite_stat1").scalar()
+        connection.commit()
+        return analyzed
+
+def vacuum(pages=None):
+    """
+    Give free pages back to the file system. Databases not yet in incremental
+    auto_vacuum mode are switched over, which needs one full VACUUM (it rewrites
+    the whole file); after that only up to `pages` free pages (default: all) are
+    released, which is quick. Returns a dict describing what happened.
+    """
+    with engine.connect() as connection:
+        page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+        free_before = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        full = connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != AUTO_VACUUM_INCREMENTAL
+        if full:
+            # The new mode only takes effect once VACUUM rebuilds the file
+            connection.exec_driver_sql(f"PRAGMA auto_vacuum={AUTO_VACUUM_INCREMENTAL}")
+            connection.exec_driver_sql("VACUUM")
+        else:
+            # sqlite3's execute() steps this pragma once, which frees a single page;
+            # executescript() runs it to completion
+            limit = f"({int(pages)})" if pages else ""
+            connection.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum{limit}")
+        free_after = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        connection.commit()
+        return {
+            'full': full,
+            'freed_pages': free_before - free_after,
+            'freed_bytes': (free_before - free_after) * page_size,
+            'free_pages': free_after
+        }
+
+def integrity_check(max_errors=100, quick=False):
+    """
+    Run PRAGMA integrity_check (or the faster quick_check, which skips index contents).
+    Returns the problems found as strings; an empty list means the database is sound.
+    """
+    pragma = 'quick_check' if quick else 'integrity_check'
+    with engine.connect() as connection:
+        problems = [row[0] for row in connection.exec_driver_sql(f"PRAGMA {pragma}({int(max_errors)})")]
+    return [] if problems == ['ok'] else problems
+
+def foreign_key_check():
+    """Rows whose foreign key points at a missing parent, as dicts"""
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql("PRAGMA foreign_key_check").fetchall()
+    return [{'table': table, 'rowid': rowid, 'parent': parent} for table, rowid, parent, _ in rows]
+
+def verify_aggregates(batch_size=DEFAULT_VERIFY_BATCH, pause=0.0, progress=None):
+    """
+    Check user_balances, monthly_rollups and the category counters against totals
+    recomputed from the transactions, batch_size users at a time. pause is slept
+    between batches to leave room for other writers; progress(users_checked) is
+    called after each batch. Returns the mismatches per summary table.
+    """
+    from models.user import User
+    from models.category import Category
+    from models.user_balance import UserBalance
+    from models.monthly_rollup import MonthlyRollup
+
+    result = {'users_checked': 0, 'batches': 0, 'balances': [], 'rollups': [], 'categories': []}
+    after = 0
+    while True:
+        with session_scope() as session:
+            user_ids = [user_id for (user_id,) in session.query(User.id).filter(
+                User.id > after).order_by(User.id).limit(batch_size)]
+            if not user_ids:
+                break
+            # Each check is a single statement, so it sees one consistent snapshot
+            user_range = (user_ids[0], user_ids[-1])
+            result['balances'] += UserBalance.check_totals(user_range, session=session)
+            result['rollups'] += MonthlyRollup.check_totals(user_range, session=session)
+            result['categories'] += Category.check_counters(user_range=user_range, session=session)
+
+        after = user_ids[-1]
+        result['users_checked'] += len(user_ids)
+        result['batches'] += 1
+        if progress:
+            progress(result['users_checked'])
+        if pause:
+            time.sleep(pause)
+    return result
+
+def size_report():
+    """
+    Bytes used by every table and index (largest first), plus file totals.
+    Per-object sizes need SQLite's dbstat table; without it 'objects' is None.
+    """
+    with engine.connect() as connection:
+        page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+        page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+        free_pages = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+        try:
+            rows = connection.exec_driver_sql(
+                "SELECT stat.name, master.type, master.tbl_name, SUM(stat.pgsize), COUNT(*) "
+                "FROM dbstat AS stat LEFT JOIN sqlite_master AS master ON master.name = stat.name "
+                "GROUP BY stat.name ORDER BY SUM(stat.pgsize) DESC"
+            ).fetchall()
+            objects = [
+                # The schema table itself isn't listed in sqlite_master
+                {'name': name, 'type': kind or 'internal', 'table': table or name, 'bytes': size, 'pages': pages}
+                for name, kind, table, size, pages in rows
+            ]
+        except OperationalError:
+            # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+            objects = None
+    return {
+        'total_bytes': page_size * page_count,
+        'free_bytes': page_size * free_pages,
+        'page_size': page_size,
+        'objects': objects
+    }
@@ -0,0 +1,83 @@
+# lib/migrations/env.py
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+
+# Make the models package importable when running the alembic command line tool
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base, engine, foreign_keys_disabled, is_unversioned, BASELINE_REVISION
+# Import every model so its table is registered on Base.metadata
+from models.user import User
+from models.category import Category
+from models.transaction import Transaction
+from models.user_balance import UserBalance
+from models.monthly_rollup import MonthlyRollup
+from models.archive import ArchiveState
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# The full-text search index (migration 0007) is a virtual table with shadow tables,
+# created with raw SQL and not part of the models
+SEARCH_INDEX_PREFIX = 'transactions_fts'
+
+
+def include_name(name, type_, parent_names):
+    """Keep autogenerate away from the search index, or it would plan to drop it"""
+    if type_ == 'table':
+        return not name.startswith(SEARCH_INDEX_PREFIX)
+    return True
+
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting to the database"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_name=include_name
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run the migrations against a live connection"""
+    # models.upgrade_database() hands us its own connection
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+    
+    with engine.connect() as connection, foreign_keys_disabled(connection):
+        _run_with_connection(connection)
+
+
+def _run_with_connection(connection):
+    # Batch mode lets ALTER-style operations work on SQLite
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=True,
+        include_name=include_name
+    )
+    with context.begin_transaction():
+        # A database from before migrations already has the baseline schema: record
+        # that instead of creating its tables again (same for `alembic upgrade head`
+        # and create_tables())
+        if is_unversioned(connection):
+            context.get_context().stamp(context.script, BASELINE_REVISION)
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,25 @@
+"""Composite indexes for the per-user and per-category transaction finders
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serve "WHERE user_id = ? ORDER BY transaction_date DESC" straight from the index
+    op.create_index('ix_transactions_user_id_transaction_date', 'transactions', ['user_id', 'transaction_date'])
+    op.create_index('ix_transactions_category_id_transaction_date', 'transactions', ['category_id', 'transaction_date'])
+
+
+def downgrade():
+    op.drop_index('ix_transactions_category_id_transaction_date', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_transaction_date', table_name='transactions')
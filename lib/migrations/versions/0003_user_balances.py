@@ -0,0 +1,40 @@
+"""Per-user running balance totals
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_balances',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('income', sa.Float(), nullable=False),
+        sa.Column('expenses', sa.Float(), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    # Backfill from the existing transactions
+    op.execute(
+        "INSERT INTO user_balances (user_id, income, expenses, transaction_count) "
+        "SELECT user_id, "
+        "SUM(CASE WHEN amount > 0 THEN amount ELSE 0.0 END), "
+        "SUM(CASE WHEN amount < 0 THEN -amount ELSE 0.0 END), "
+        "COUNT(id) "
+        "FROM transactions GROUP BY user_id"
+    )
+
+
+def downgrade():
+    op.drop_table('user_balances')
@@ -0,0 +1,49 @@
+"""Monthly income/expense rollups per user and category
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'monthly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('year_month', sa.String(length=7), nullable=False),
+        sa.Column('income', sa.Float(), nullable=False),
+        sa.Column('expenses', sa.Float(), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_monthly_rollups_user_month_category', 'monthly_rollups',
+        ['user_id', 'year_month', 'category_id'], unique=True
+    )
+    # Backfill from the existing transactions
+    op.execute(
+        "INSERT INTO monthly_rollups (user_id, category_id, year_month, income, expenses, transaction_count) "
+        "SELECT user_id, category_id, strftime('%Y-%m', transaction_date), "
+        "SUM(CASE WHEN amount > 0 THEN amount ELSE 0.0 END), "
+        "SUM(CASE WHEN amount < 0 THEN -amount ELSE 0.0 END), "
+        "COUNT(id) "
+        "FROM transactions GROUP BY user_id, category_id, strftime('%Y-%m', transaction_date)"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_monthly_rollups_user_month_category', table_name='monthly_rollups')
+    op.drop_table('monthly_rollups')
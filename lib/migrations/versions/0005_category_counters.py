@@ -0,0 +1,35 @@
+"""Running spent and transaction_count counters on categories
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.add_column(sa.Column('spent', sa.Float(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'))
+    # Backfill from the existing transactions
+    op.execute(
+        "UPDATE categories SET "
+        "spent = (SELECT COALESCE(SUM(CASE WHEN amount < 0 THEN -amount ELSE 0.0 END), 0.0) "
+        "FROM transactions WHERE transactions.category_id = categories.id), "
+        "transaction_count = (SELECT COUNT(id) FROM transactions "
+        "WHERE transactions.category_id = categories.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('transaction_count')
+        batch_op.drop_column('spent')
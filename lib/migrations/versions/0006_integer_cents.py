@@ -0,0 +1,73 @@
+"""Store money as integer cents and cover the per-user SUM with an index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# (table, float column, integer cents column)
+MONEY_COLUMNS = (
+    ('transactions', 'amount', 'amount_cents'),
+    ('categories', 'budget_limit', 'budget_limit_cents'),
+    ('categories', 'spent', 'spent_cents'),
+    ('user_balances', 'income', 'income_cents'),
+    ('user_balances', 'expenses', 'expenses_cents'),
+    ('monthly_rollups', 'income', 'income_cents'),
+    ('monthly_rollups', 'expenses', 'expenses_cents'),
+)
+
+
+def _tables():
+    """Tables touched, each listed once, in order"""
+    return list(dict.fromkeys(table for table, _, _ in MONEY_COLUMNS))
+
+
+def _convert(to_cents):
+    """Add the target columns, copy the values across, then drop the source columns"""
+    for table in _tables():
+        columns = [(old, new) for name, old, new in MONEY_COLUMNS if name == table]
+        with op.batch_alter_table(table) as batch_op:
+            for old, new in columns:
+                if to_cents:
+                    batch_op.add_column(sa.Column(new, sa.Integer(), nullable=False, server_default='0'))
+                else:
+                    batch_op.add_column(sa.Column(old, sa.Float(), nullable=False, server_default='0'))
+        if to_cents:
+            # ROUND first so 19.99 (stored as 19.98999...) becomes 1999, not 1998
+            assignments = ", ".join(f"{new} = CAST(ROUND(COALESCE({old}, 0) * 100) AS INTEGER)"
+                                    for old, new in columns)
+        else:
+            assignments = ", ".join(f"{old} = {new} / 100.0" for old, new in columns)
+        op.execute(f"UPDATE {table} SET {assignments}")
+        with op.batch_alter_table(table) as batch_op:
+            for old, new in columns:
+                batch_op.drop_column(old if to_cents else new)
+
+
+def upgrade():
+    op.drop_index('ix_transactions_category_id_transaction_date', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_transaction_date', table_name='transactions')
+    _convert(to_cents=True)
+    # Same leading columns as before, plus the amount, so per-user and per-category
+    # SUM()s are answered from the index without touching the table
+    op.create_index('ix_transactions_user_date_amount', 'transactions',
+                    ['user_id', 'transaction_date', 'amount_cents'])
+    op.create_index('ix_transactions_category_date_amount', 'transactions',
+                    ['category_id', 'transaction_date', 'amount_cents'])
+
+
+def downgrade():
+    op.drop_index('ix_transactions_category_date_amount', table_name='transactions')
+    op.drop_index('ix_transactions_user_date_amount', table_name='transactions')
+    _convert(to_cents=False)
+    op.create_index('ix_transactions_user_id_transaction_date', 'transactions', ['user_id', 'transaction_date'])
+    op.create_index('ix_transactions_category_id_transaction_date', 'transactions', ['category_id', 'transaction_date'])
@@ -0,0 +1,54 @@
+"""FTS5 full-text index over transaction descriptions
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 15:00:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# External-content table: the text lives in transactions, the FTS table only holds the index.
+# prefix='2 3' keeps short prefix queries like "am*" from scanning the whole vocabulary.
+CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE transactions_fts USING fts5("
+    "description, content='transactions', content_rowid='id', prefix='2 3')"
+)
+
+# Keep the index in step with every insert, delete and description change,
+# whether it comes from the ORM, a Core bulk insert or plain SQL
+TRIGGERS = (
+    "CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "END",
+    "CREATE TRIGGER transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+)
+
+TRIGGER_NAMES = ('transactions_fts_insert', 'transactions_fts_delete', 'transactions_fts_update')
+
+
+def upgrade():
+    op.execute(CREATE_TABLE)
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+    # Index the descriptions that are already there
+    op.execute("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    for name in TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS transactions_fts")
@@ -0,0 +1,77 @@
+"""Cascade deletes through foreign keys instead of the ORM
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 16:00:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+# (child table, column, parent table) for every foreign key that now cascades
+FOREIGN_KEYS = (
+    ('categories', 'user_id', 'users'),
+    ('transactions', 'user_id', 'users'),
+    ('transactions', 'category_id', 'categories'),
+    ('user_balances', 'user_id', 'users'),
+    ('monthly_rollups', 'user_id', 'users'),
+    ('monthly_rollups', 'category_id', 'categories'),
+)
+
+# The foreign keys were created without names; this gives the reflected ones
+# a predictable name so batch mode can drop and recreate them
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+# Recreating the transactions table drops the FTS triggers from migration 0007
+FTS_TRIGGERS = (
+    "CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "END",
+    "CREATE TRIGGER transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+)
+
+
+def _tables():
+    """Tables touched, each listed once, in order"""
+    return list(dict.fromkeys(table for table, _, _ in FOREIGN_KEYS))
+
+
+def _recreate_foreign_keys(ondelete):
+    """Rebuild every table in FOREIGN_KEYS with the given ON DELETE action"""
+    for table in _tables():
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for name, column, parent in FOREIGN_KEYS:
+                if name != table:
+                    continue
+                constraint = f"fk_{table}_{column}_{parent}"
+                batch_op.drop_constraint(constraint, type_='foreignkey')
+                batch_op.create_foreign_key(constraint, parent, [column], ['id'], ondelete=ondelete)
+    # Same rowids as before, so the FTS index itself is still valid
+    for trigger in FTS_TRIGGERS:
+        op.execute(trigger)
+
+
+def upgrade():
+    _recreate_foreign_keys('CASCADE')
+    # SQLite looks up child rows by these columns for every parent row deleted
+    op.create_index('ix_categories_user_id', 'categories', ['user_id'])
+    op.create_index('ix_monthly_rollups_category_id', 'monthly_rollups', ['category_id'])
+
+
+def downgrade():
+    op.drop_index('ix_monthly_rollups_category_id', table_name='monthly_rollups')
+    op.drop_index('ix_categories_user_id', table_name='categories')
+    _recreate_foreign_keys(None)
@@ -0,0 +1,60 @@
+"""Record how far transactions have been moved to the archive database
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 17:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+# Rebuilding the transactions table drops the FTS triggers from migration 0007
+FTS_TRIGGERS = (
+    "CREATE TRIGGER transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+    "CREATE TRIGGER transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "END",
+    "CREATE TRIGGER transactions_fts_update AFTER UPDATE OF description ON transactions BEGIN "
+    "INSERT INTO transactions_fts(transactions_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO transactions_fts(rowid, description) VALUES (new.id, new.description); "
+    "END",
+)
+
+
+def _rebuild_transactions(autoincrement):
+    """Recreate the transactions table with or without AUTOINCREMENT, keeping every row and ID"""
+    with op.batch_alter_table('transactions', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for trigger in FTS_TRIGGERS:
+        op.execute(trigger)
+
+
+def upgrade():
+    # Without AUTOINCREMENT SQLite reuses the highest IDs once they are deleted,
+    # and an archived transaction's ID must never come back for a new one
+    _rebuild_transactions(True)
+    # A single row; the archive file itself is created by the first archival run
+    op.create_table(
+        'archive_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cutoff', sa.DateTime(), nullable=False),
+        sa.Column('archived_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('archive_state')
+    _rebuild_transactions(False)
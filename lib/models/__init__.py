@@ -1,11 +1,27 @@
 # lib/models/__init__.py
-from sqlalchemy import create_engine
+import functools
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from .config import load_settings, create_configured_engine
+from .profiler import create_profiler
+
 # Create database engine - using SQLite for simplicity
-# The database file will be created in the current directory
-engine = create_engine('sqlite:///finance_tracker.db')
+# By default the database file is created in the current directory; the URL,
+# pool sizing and SQLite pragmas can be changed with FINANCE_DB_* environment
+# variables or a finance_tracker.ini file (see models/config.py)
+settings = load_settings()
+engine = create_configured_engine(settings)
+
+# SQL instrumentation, off unless FINANCE_PROFILE is set or a CLI passes --profile
+profiler = create_profiler(engine)
 
 # Create a base class for all our models to inherit from
 # This gives them common functionality like table creation
@@ -13,13 +29,183 @@ Base = declarative_base()
 
 # Create a session factory - this is how we'll interact with the database
 # Sessions handle transactions and keep track of changes
-SessionLocal = sessionmaker(bind=engine)
+# expire_on_commit=False keeps loaded values readable after the session closes,
+# so models don't need an extra refresh() round trip or hand-copied fields
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+# Alembic migration scripts live next to the models package
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Revision matching the schema that create_all() used to build before migrations existed
+BASELINE_REVISION = '0001'
 
 # Function to create all tables defined by our models
 def create_tables():
-    Base.metadata.create_all(engine)
+    """
+    Create the schema or upgrade an existing database to the latest migration.
+    Skipped when the database is already current, which saves loading Alembic
+    and its migration scripts on every start.
+    """
+    if current_revision() == latest_revision():
+        return
+    upgrade_database()
+
+def latest_revision():
+    """
+    Newest migration revision, read from the script filenames.
+    Revisions are numbered '0001', '0002', ... and files are named '<revision>_<slug>.py'.
+    """
+    versions = os.listdir(os.path.join(MIGRATIONS_DIR, 'versions'))
+    revisions = [name.split('_', 1)[0] for name in versions if name.endswith('.py') and name[:4].isdigit()]
+    return max(revisions) if revisions else None
+
+def current_revision():
+    """Revision the database is stamped with, or None for a new or pre-migration database"""
+    with engine.connect() as connection:
+        try:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except OperationalError:
+            # No alembic_version table yet
+            return None
+
+def upgrade_database(revision='head'):
+    """Run Alembic migrations so existing database files are upgraded in place"""
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config()
+    config.set_main_option('script_location', MIGRATIONS_DIR)
+    
+    with engine.connect() as connection, foreign_keys_disabled(connection):
+        with connection.begin():
+            config.attributes['connection'] = connection
+            # migrations/env.py stamps databases from before migrations at the baseline first
+            command.upgrade(config, revision)
+
+def is_unversioned(connection):
+    """
+    True for databases created by the old create_all(): they have the tables
+    of the baseline revision but no alembic_version table yet
+    """
+    tables = inspect(connection).get_table_names()
+    return 'users' in tables and 'alembic_version' not in tables
+
+@contextmanager
+def foreign_keys_disabled(connection):
+    """
+    Turn SQLite foreign key enforcement off for the block (and back on afterwards).
+    Batch migrations rebuild a table by copying it, dropping the original and renaming
+    the copy; with enforcement on, dropping a parent table would cascade into its children.
+    The pragma is ignored inside a transaction, so use this before beginning one.
+    """
+    if connection.dialect.name != 'sqlite':
+        yield connection
+        return
+    connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+    connection.commit()
+    try:
+        yield connection
+    finally:
+        connection.rollback()
+        connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+        connection.commit()
 
 # Function to get a database session
 def get_session():
     return SessionLocal()
-    
\ No newline at end of file
+
+@contextmanager
+def session_scope(session=None, write=False, archive=False):
+    """
+    Unit of work: run a block of database operations in one session and one transaction.
+    Commits when the block finishes, rolls back if it raises, and always closes the session.
+    
+    Model methods accept a 'session' argument and pass it through here. When a session
+    is given, the block joins that unit of work and the outer scope commits:
+    
+        with session_scope(write=True) as session:
+            user = User.find_by_email(email, session=session)
+            Transaction.create("Lunch", -12.5, user.id, session=session)
+    
+    write=True starts the transaction with BEGIN IMMEDIATE, taking SQLite's write lock
+    up front (waiting up to busy_timeout for it). A plain transaction that has already
+    read can't wait for the lock when it comes to write, and fails at once if another
+    process wrote in between.
+    
+    archive=True attaches the archive database (see models/archive.py) first, for
+    units of work that write to or read archived transactions: SQLite can't ATTACH
+    once a transaction is open.
+    """
+    if session is not None:
+        yield session
+        return
+    
+    session = SessionLocal()
+    try:
+        if archive:
+            from .archive import attach
+            attach(session.connection())
+        if write and engine.dialect.name == 'sqlite':
+            session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+    
+def is_busy_error(error):
+    """True for SQLite's "database is locked" / "database is busy" errors"""
+    return isinstance(error, OperationalError) and any(
+        message in str(error.orig) for message in ('database is locked', 'database is busy')
+    )
+
+# Backoff between write attempts: doubles from the base up to the cap, with jitter
+# so processes that collided don't retry in lockstep
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 1.0
+
+def call_with_retries(func, *args, attempts=None, **kwargs):
+    """
+    Call func, retrying with exponential backoff while the database is locked.
+    func must run a complete unit of work, so a failed attempt has been rolled back.
+    Gives up after settings['write_attempts'] attempts and re-raises the last error.
+    """
+    attempts = attempts or settings['write_attempts']
+    for attempt in range(1, attempts + 1):
+        try:
+            return func(*args, **kwargs)
+        except OperationalError as e:
+            if attempt >= attempts or not is_busy_error(e):
+                raise
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            time.sleep(delay * random.uniform(0.5, 1.5))
+
+def retry_on_busy(method):
+    """
+    Decorator for model write methods: retry with backoff while the database is locked.
+    Only when the method runs its own unit of work - inside a caller's session the whole
+    unit of work has to be retried, so the error is passed up instead.
+    """
+    @functools.wraps(method)
+    def wrapper(*args, session=None, **kwargs):
+        if session is not None:
+            return method(*args, session=session, **kwargs)
+        return call_with_retries(method, *args, **kwargs)
+    return wrapper
+
+def get_pinned(session, model, ident):
+    """
+    Look up a row by primary key and keep it for the rest of the unit of work.
+    The session's identity map only holds weak references, so without pinning a
+    lookup repeated across several model calls would go back to the database each time.
+    """
+    pinned = session.info.setdefault('pinned', {})
+    key = (model, ident)
+    if key not in pinned:
+        instance = session.get(model, ident)
+        if instance is None:
+            return None
+        pinned[key] = instance
+    return pinned[key]
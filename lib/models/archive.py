@@ -0,0 +1,227 @@
+# lib/models/archive.py
+"""
+Cold storage for old transactions.
+
+archive_transactions(before) moves transactions dated before a cutoff out of
+the main database into a separate SQLite file - settings['archive_path'], or
+finance_tracker_archive.db next to the database - in small batches, so the
+tables and indexes every screen reads stay small. The running totals
+(user_balances, monthly_rollups, category counters) are left alone, so
+balances and reports still cover all time.
+
+The cutoff is kept in the archive_state table. A query whose date range starts
+on or after it never touches the archive; one that reaches further back (or
+has no start date) ATTACHes the archive to its connection - once per pooled
+connection - and reads the union of both tables through history() or
+history_table().
+
+Archived transactions are read-only: they are listed, exported, searched
+(without the full-text index) and included in rebuilt totals, but not
+deletable one by one (deleting their user or category removes them too).
+"""
+
+import os
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, MetaData, Table, Index, select, union_all
+from sqlalchemy.orm import aliased
+
+from . import Base, engine, settings, session_scope, call_with_retries
+from .money import MoneyType
+
+# Name the archive is attached under; its table is archive.transactions
+ARCHIVE_SCHEMA = 'archive'
+# Transactions moved per database transaction by archive_transactions
+DEFAULT_ARCHIVE_BATCH = 5000
+# archive_state only ever has this one row
+STATE_ID = 1
+
+class ArchiveState(Base):
+    """How far transactions have been archived (a single row, created by the first run)"""
+    __tablename__ = 'archive_state'
+
+    id = Column(Integer, primary_key=True)
+    # Every archived transaction is dated before this
+    cutoff = Column(DateTime, nullable=False)
+    archived_count = Column(Integer, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<ArchiveState(cutoff={self.cutoff}, archived_count={self.archived_count})>"
+
+# Same columns and indexes as transactions, without foreign keys: the parent
+# rows live in the other file. Not part of Base.metadata (it's in another database).
+archived_transactions = Table(
+    'transactions', MetaData(schema=ARCHIVE_SCHEMA),
+    Column('id', Integer, primary_key=True),
+    Column('description', String(200), nullable=False),
+    Column('amount_cents', MoneyType, nullable=False),
+    Column('transaction_date', DateTime),
+    Column('created_at', DateTime),
+    Column('user_id', Integer, nullable=False),
+    Column('category_id', Integer),
+    Index('ix_archived_transactions_user_date_amount', 'user_id', 'transaction_date', 'amount_cents'),
+    Index('ix_archived_transactions_category_date_amount', 'category_id', 'transaction_date', 'amount_cents'),
+)
+COLUMNS = [column.name for column in archived_transactions.columns]
+
+def archive_path():
+    """Path of the archive file, or None when the database is in memory"""
+    if settings.get('archive_path'):
+        return settings['archive_path']
+    database = engine.url.database
+    if not database or database == ':memory:':
+        return None
+    base, extension = os.path.splitext(database)
+    return f"{base}_archive{extension or '.db'}"
+
+def attach(connection, create=False):
+    """
+    ATTACH the archive to a connection unless it already is (attachments last as
+    long as the pooled connection). Returns False if there is no archive file and
+    create is False. Must run before the connection starts writing.
+    """
+    path = archive_path()
+    if not path or not (create or os.path.exists(path)):
+        return False
+    raw = connection.connection.driver_connection
+    if ARCHIVE_SCHEMA in {row[1] for row in raw.execute("PRAGMA database_list")}:
+        return True
+    if raw.in_transaction:
+        raise RuntimeError("The archive has to be attached before a write transaction starts "
+                           "(use session_scope(archive=True))")
+    raw.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+    return True
+
+def get_cutoff(connection):
+    """Date before which transactions may be archived, or None if nothing ever was"""
+    state = ArchiveState.__table__
+    return connection.execute(select(state.c.cutoff).where(state.c.id == STATE_ID)).scalar()
+
+def reaches_archive(connection, start=None):
+    """
+    True when transactions dated from `start` on (None = all time) may include
+    archived ones; the archive is then attached to the connection
+    """
+    cutoff = get_cutoff(connection)
+    if cutoff is None or (start is not None and start >= cutoff):
+        return False
+    return attach(connection)
+
+def history_table(connection, start=None):
+    """
+    Selectable to read transactions dated from `start` on (None = all time): the
+    transactions table, or - when the range reaches archived dates - the union of
+    live and archived rows, with the same column names.
+    """
+    from .transaction import Transaction
+    live = Transaction.__table__
+    if not reaches_archive(connection, start):
+        return live
+    parts = [select(*(table.c[name] for name in COLUMNS)) for table in (live, archived_transactions)]
+    if start is not None:
+        parts = [part.where(table.c.transaction_date >= start)
+                 for part, table in zip(parts, (live, archived_transactions))]
+    return union_all(*parts).subquery('transaction_history')
+
+def history(session, start=None):
+    """
+    ORM entity for transactions dated from `start` on: Transaction itself, or an
+    alias of it over history_table() when the range reaches the archive. Use it
+    in place of Transaction in queries and filters.
+    """
+    from .transaction import Transaction
+    source = history_table(session.connection(), start)
+    if source is Transaction.__table__:
+        return Transaction
+    return aliased(Transaction, source, adapt_on_names=True)
+
+def archived(session, start=None):
+    """
+    ORM entity for the archived transactions alone (an alias of Transaction), or
+    None when transactions dated from `start` on can't include any
+    """
+    from .transaction import Transaction
+    if not reaches_archive(session.connection(), start):
+        return None
+    return aliased(Transaction, select(archived_transactions).subquery('archived'), adapt_on_names=True)
+
+def delete_archived(session, **criteria):
+    """
+    Delete archived transactions matching column=value criteria (used by user and
+    category deletes). The session must have been opened with archive=True.
+    Returns the number of rows deleted.
+    """
+    connection = session.connection()
+    if get_cutoff(connection) is None or not attach(connection):
+        return 0
+    statement = archived_transactions.delete()
+    for name, value in criteria.items():
+        statement = statement.where(archived_transactions.c[name] == value)
+    return session.execute(statement).rowcount
+
+def archive_transactions(before, batch_size=DEFAULT_ARCHIVE_BATCH, progress=None):
+    """
+    Move transactions dated before `before` to the archive file, batch_size rows
+    per database transaction so other processes keep working meanwhile.
+    progress(moved) is called after each batch. Returns the number moved.
+    """
+    if not archive_path():
+        raise ValueError("An in-memory database has no archive file")
+    with engine.connect() as connection:
+        attach(connection, create=True)
+        # Same journal mode as the main file, so readers don't block the archiving run
+        if settings.get('journal_mode'):
+            connection.exec_driver_sql(f"PRAGMA {ARCHIVE_SCHEMA}.journal_mode={settings['journal_mode']}")
+        archived_transactions.metadata.create_all(connection)
+        connection.commit()
+
+    # Raise the cutoff first: from here on, queries reaching before it read the archive too
+    call_with_retries(_record_cutoff, before)
+    moved = 0
+    while True:
+        ids = call_with_retries(_copy_batch, before, batch_size)
+        if not ids:
+            break
+        moved += call_with_retries(_delete_batch, ids)
+        if progress:
+            progress(moved)
+    return moved
+
+def _record_cutoff(before):
+    with session_scope(write=True) as session:
+        state = session.get(ArchiveState, STATE_ID)
+        if state is None:
+            session.add(ArchiveState(id=STATE_ID, cutoff=before))
+        elif state.cutoff < before:
+            state.cutoff = before
+
+def _copy_batch(before, batch_size):
+    """
+    Copy the next batch into the archive (committed on its own) and return the IDs.
+    Copying before deleting means a crash can leave a row in both files for a
+    moment, never in neither; the next run replaces the copy and removes the original.
+    """
+    from .transaction import Transaction
+    live = Transaction.__table__
+    with session_scope(write=True, archive=True) as session:
+        # IDs are never reused (transactions is AUTOINCREMENT), so they stay unique across both files
+        ids = session.execute(
+            select(live.c.id).where(live.c.transaction_date < before)
+            .order_by(live.c.id).limit(batch_size)
+        ).scalars().all()
+        if ids:
+            session.execute(archived_transactions.insert().prefix_with('OR REPLACE').from_select(
+                COLUMNS, select(*(live.c[name] for name in COLUMNS)).where(live.c.id.in_(ids))
+            ))
+        return ids
+
+def _delete_batch(ids):
+    """Remove a copied batch from the main database; the summary tables keep counting it"""
+    from .transaction import Transaction
+    with session_scope(write=True) as session:
+        deleted = session.query(Transaction).filter(Transaction.id.in_(ids)).delete(synchronize_session=False)
+        session.query(ArchiveState).filter_by(id=STATE_ID).update(
+            {ArchiveState.archived_count: ArchiveState.archived_count + deleted}
+        )
+        return deleted
@@ -0,0 +1,124 @@
+# lib/models/cache.py
+"""
+In-process read-through cache for the small, hot lookups the CLI repeats
+on almost every screen (users by ID or email, categories by ID or user).
+
+Each LookupCache is a least-recently-used map with a time-to-live, so
+entries are dropped when the cache is full and also after TTL seconds -
+that bounds how stale a value can get when another process (a cron job
+running lib/finance.py, say) changes the database behind our back.
+Model create/delete methods, and anything that changes the cached
+columns, invalidate the affected entries.
+
+Lookups made inside a caller's unit of work (an explicit session) always
+go to the session instead, so objects from the cache are never mixed
+into a session that might write them.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+# Entries kept per cache before the least recently used one is evicted
+DEFAULT_MAX_SIZE = 1024
+# Seconds an entry stays valid
+DEFAULT_TTL = 300
+
+# Every cache created, by name, for cache_stats() and clear_caches()
+CACHES = {}
+
+class LookupCache:
+    """LRU + TTL cache of lookup results, with hit/miss counters"""
+
+    def __init__(self, name, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHES[name] = self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return (True, value) for a fresh entry, or (False, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires > self.clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key, value):
+        """Remember a value, evicting the least recently used entry if full"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        """Drop the given keys"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry (the statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def lookup(self, key, session, load):
+        """
+        Read-through lookup: return the cached value for key, or call load() and
+        cache what it returns. None results are not cached, so a row created
+        elsewhere shows up straight away. With a session, always calls load().
+        """
+        if session is not None:
+            return load()
+        hit, value = self.get(key)
+        if hit:
+            return value
+        value = load()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        """Hit/miss statistics as a dict"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl
+        }
+
+    def reset_stats(self):
+        """Zero the counters"""
+        self.hits = self.misses = self.evictions = 0
+
+def cache_stats():
+    """Statistics for every cache, by name"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+def clear_caches():
+    """Empty every cache, e.g. after bulk changes made with plain SQL"""
+    for cache in CACHES.values():
+        cache.clear()
@@ -1,7 +1,12 @@
 # lib/models/category.py
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from sqlalchemy.orm import relationship
-from . import Base, get_session
+from sqlalchemy import Column, Integer, String, ForeignKey, func, case, update, bindparam, type_coerce
+from sqlalchemy.orm import relationship, joinedload
+from . import Base, session_scope, get_pinned, retry_on_busy
+from .money import Money, MoneyType
+from .cache import LookupCache
+
+# Categories by ('id', category_id) and lists of them by ('user', user_id)
+category_cache = LookupCache('categories')
 
 class Category(Base):
     """
@@ -12,22 +17,28 @@ class Category(Base):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(50), nullable=False)
-    # Optional budget limit for this category
-    budget_limit = Column(Float, default=0.0)
-    # Foreign key to link this category to a user
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    # Optional budget limit for this category (0 means no budget), stored as cents
+    budget_limit = Column('budget_limit_cents', MoneyType, nullable=False, default=0, server_default='0')
+    # Foreign key to link this category to a user (indexed so user deletes find categories quickly)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    # Running totals of this category's transactions, kept up to date by
+    # Transaction.create/delete so budget checks don't have to sum every row
+    spent = Column('spent_cents', MoneyType, nullable=False, default=0, server_default='0')
+    transaction_count = Column(Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     user = relationship("User", back_populates="categories")
-    transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan")
+    # passive_deletes: the database's ON DELETE CASCADE removes transactions that aren't loaded
+    transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan",
+                                passive_deletes=True)
     
     def __repr__(self):
         return f"<Category(id={self.id}, name={self.name}, budget_limit={self.budget_limit})>"
     
     @property
     def total_spent(self):
-        """Calculate total amount spent in this category"""
-        return sum(abs(t.amount) for t in self.transactions if t.amount < 0)
+        """Total amount spent in this category (read from the running counter)"""
+        return self.spent or Money(0)
     
     @property
     def remaining_budget(self):
@@ -44,67 +55,209 @@ class Category(Base):
         return self.total_spent > self.budget_limit
     
     # ORM Methods
+    # Each method takes an optional session so several calls can share one unit of work
     @classmethod
-    def create(cls, name, user_id, budget_limit=0.0):
+    @retry_on_busy
+    def create(cls, name, user_id, budget_limit=0, session=None):
         """Create a new category"""
-        session = get_session()
-        try:
+        with session_scope(session, write=True) as session:
             if not name:
                 raise ValueError("Category name is required")
             
             # Verify user exists
             from .user import User
-            user = session.query(User).filter_by(id=user_id).first()
+            user = get_pinned(session, User, user_id)
             if not user:
                 raise ValueError("User not found")
             
-            category = cls(name=name, user_id=user_id, budget_limit=budget_limit)
+            category = cls(name=name, user_id=user_id, budget_limit=Money.of(budget_limit or 0))
             session.add(category)
-            session.commit()
-            session.refresh(category)
+            session.flush()
+            category_cache.invalidate(('user', user_id))
             return category
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     @classmethod
-    def get_all(cls):
-        """Get all categories"""
-        session = get_session()
-        try:
-            return session.query(cls).all()
-        finally:
-            session.close()
+    def get_all(cls, with_user=False, session=None):
+        """Get all categories (with_user loads each owner in the same query)"""
+        with session_scope(session) as session:
+            query = session.query(cls)
+            if with_user:
+                query = query.options(joinedload(cls.user))
+            return query.all()
+    
+    @classmethod
+    def find_by_id(cls, category_id, session=None):
+        """Find category by ID (cached between calls that don't pass a session)"""
+        def load():
+            with session_scope(session) as scope:
+                return scope.get(cls, category_id)
+        return category_cache.lookup(('id', category_id), session, load)
+    
+    @classmethod
+    def find_by_user(cls, user_id, session=None):
+        """Find all categories for a user (cached between calls that don't pass a session)"""
+        def load():
+            with session_scope(session) as scope:
+                return scope.query(cls).filter_by(user_id=user_id).all()
+        # Copy so callers can sort or filter the list without changing the cached one
+        return list(category_cache.lookup(('user', user_id), session, load))
+    
+    @classmethod
+    def spending_report(cls, user_id=None, start=None, end=None, session=None):
+        """
+        Get spending and budget status for every category of a user (or all users) in one query.
+        start/end restrict spending to an inclusive date range.
+        """
+        with session_scope(session) as session:
+            from .user import User
+            # The running counters make this a plain lookup - no transactions are read
+            spent, count = cls.spent, cls.transaction_count
+            ranged = None
+            if start is not None or end is not None:
+                # Only the range's rows are summed, by one grouped range scan
+                from .transaction import Transaction
+                from .archive import history
+                source = history(session, start)
+                ranged = Transaction._filter(session.query(
+                    source.category_id.label('category_id'),
+                    func.sum(case((source.amount < 0, -source.amount), else_=0)).label('spent'),
+                    func.count(source.id).label('count')
+                ), source, user_id, None, start, end).group_by(source.category_id).subquery()
+                spent = type_coerce(func.coalesce(ranged.c.spent, 0), MoneyType)
+                count = func.coalesce(ranged.c.count, 0)
+            query = session.query(
+                cls.id,
+                cls.name,
+                cls.budget_limit,
+                cls.user_id,
+                User.name,
+                spent,
+                count
+            ).join(User, User.id == cls.user_id)
+            if ranged is not None:
+                query = query.outerjoin(ranged, ranged.c.category_id == cls.id)
+            if user_id is not None:
+                query = query.filter(cls.user_id == user_id)
+            rows = query.order_by(cls.id).all()
+            
+            # Build plain dictionaries so callers don't touch lazy relationships
+            report = []
+            for cat_id, name, budget_limit, owner_id, owner_name, total_spent, count in rows:
+                budget_limit = budget_limit or Money(0)
+                has_budget = budget_limit > 0
+                report.append({
+                    'id': cat_id,
+                    'name': name,
+                    'budget_limit': budget_limit,
+                    'user_id': owner_id,
+                    'user_name': owner_name,
+                    'spent': total_spent,
+                    'remaining_budget': budget_limit - total_spent if has_budget else None,
+                    'is_over_budget': has_budget and total_spent > budget_limit,
+                    'transactions_count': count
+                })
+            return report
     
     @classmethod
-    def find_by_id(cls, category_id):
-        """Find category by ID"""
-        session = get_session()
-        try:
-            return session.query(cls).filter_by(id=category_id).first()
-        finally:
-            session.close()
+    def apply_spending(cls, session, category_id, spent=0, count=0):
+        """
+        Add to a category's running counters (pass negative values to subtract).
+        The increment happens in SQL; copies already loaded in the session are updated too.
+        """
+        session.execute(
+            update(cls)
+            .where(cls.id == category_id)
+            .values(spent=cls.spent + spent, transaction_count=cls.transaction_count + count)
+        )
+        # Cached copies now hold old counters; the cache doesn't know which user lists contain this category
+        category_cache.clear()
     
     @classmethod
-    def find_by_user(cls, user_id):
-        """Find all categories for a user"""
-        session = get_session()
-        try:
-            return session.query(cls).filter_by(user_id=user_id).all()
-        finally:
-            session.close()
+    def check_counters(cls, repair=False, user_range=None, session=None):
+        """
+        Compare every category's running counters with the transactions table (archived ones included).
+        user_range is an optional inclusive (first_user_id, last_user_id), so a large
+        database can be checked in batches. Returns a list of mismatches; with
+        repair=True the counters are also rewritten from the raw rows (in one UPDATE).
+        """
+        with session_scope(session) as session:
+            from .archive import history
+            transactions = history(session)
+            # One grouped pass over the transactions (live and archived), joined to the
+            # categories - not a correlated subquery per category over the archive union
+            actual = session.query(
+                transactions.category_id.label('category_id'),
+                func.sum(case((transactions.amount < 0, -transactions.amount), else_=0)).label('spent'),
+                func.count(transactions.id).label('count')
+            ).filter(transactions.category_id.isnot(None))
+            if user_range:
+                # By category ID, so the (category_id, transaction_date, amount_cents) index covers it
+                batch = session.query(cls.id).filter(cls.user_id.between(*user_range))
+                actual = actual.filter(transactions.category_id.in_(batch.scalar_subquery()))
+            actual = actual.group_by(transactions.category_id).subquery()
+            
+            rows = session.query(
+                cls.id, cls.name, cls.spent, cls.transaction_count,
+                type_coerce(func.coalesce(actual.c.spent, 0), MoneyType), func.coalesce(actual.c.count, 0)
+            ).outerjoin(actual, actual.c.category_id == cls.id)
+            if user_range:
+                rows = rows.filter(cls.user_id.between(*user_range))
+            mismatches = [
+                {
+                    'id': cat_id,
+                    'name': name,
+                    'stored_spent': stored_spent,
+                    'actual_spent': real_spent,
+                    'stored_count': stored_count,
+                    'actual_count': real_count
+                }
+                for cat_id, name, stored_spent, stored_count, real_spent, real_count in rows.order_by(cls.id).all()
+                # Amounts are integer cents, so the comparison is exact
+                if stored_count != real_count or stored_spent != real_spent
+            ]
+            
+            if repair and mismatches:
+                # Rewrite just the wrong rows, with the totals computed above (one executemany)
+                session.execute(REPAIR_UPDATE, [
+                    {'match_id': row['id'], 'new_spent': row['actual_spent'], 'new_count': row['actual_count']}
+                    for row in mismatches
+                ])
+                category_cache.clear()
+            return mismatches
     
-    def delete(self):
-        """Delete this category"""
-        session = get_session()
-        try:
-            session.delete(self)
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
-            
\ No newline at end of file
+    @retry_on_busy
+    def delete(self, session=None):
+        """Delete this category, with its transactions (archived ones too)"""
+        with session_scope(session, write=True, archive=True) as session:
+            category = session.get(Category, self.id)
+            if category:
+                # Its transactions are about to go, so take them out of
+                # the owner's running totals first (one aggregate query)
+                from .transaction import Transaction
+                from .user_balance import UserBalance
+                from .archive import history, delete_archived
+                transactions = history(session)
+                income, expenses, count = session.query(
+                    func.coalesce(func.sum(case((transactions.amount > 0, transactions.amount), else_=0)), 0),
+                    func.coalesce(func.sum(case((transactions.amount < 0, -transactions.amount), else_=0)), 0),
+                    func.count(transactions.id)
+                ).filter(transactions.category_id == category.id).one()
+                if count:
+                    UserBalance.apply(session, category.user_id, -income, -expenses, -count)
+                # One DELETE per table instead of loading and deleting every transaction;
+                # every monthly bucket of this category empties out completely
+                from .monthly_rollup import MonthlyRollup
+                session.query(Transaction).filter_by(category_id=category.id).delete(synchronize_session=False)
+                delete_archived(session, category_id=category.id)
+                session.query(MonthlyRollup).filter_by(category_id=category.id).delete(synchronize_session=False)
+                session.query(Category).filter_by(id=category.id).delete()
+                category_cache.invalidate(('id', category.id), ('user', category.user_id))
+
+# Used by check_counters(repair=True): overwrites one category's counters
+_categories = Category.__table__
+REPAIR_UPDATE = _categories.update().where(
+    _categories.c.id == bindparam('match_id')
+).values(
+    spent_cents=bindparam('new_spent', type_=MoneyType()),
+    transaction_count=bindparam('new_count')
+)
@@ -0,0 +1,173 @@
+# lib/models/config.py
+"""
+Database engine configuration for Personal Finance Tracker.
+
+Settings are resolved in this order (later wins):
+  1. the built-in profile ('default' unless FINANCE_DB_PROFILE or the config file says otherwise)
+  2. the [database] section of an INI config file
+     (FINANCE_DB_CONFIG, or finance_tracker.ini in the current directory if it exists)
+  3. FINANCE_DB_* environment variables, e.g. FINANCE_DB_URL or FINANCE_DB_CACHE_SIZE
+
+SQLite pragmas are applied to every new connection through a connect event.
+Foreign key enforcement is always switched on: deletes rely on ON DELETE CASCADE.
+"""
+
+import configparser
+import os
+
+from sqlalchemy import create_engine, event
+
+DEFAULT_URL = 'sqlite:///finance_tracker.db'
+DEFAULT_CONFIG_FILE = 'finance_tracker.ini'
+ENV_PREFIX = 'FINANCE_DB_'
+
+# Attempts a model write makes when the database is locked (see models.retry_on_busy)
+DEFAULT_WRITE_ATTEMPTS = 5
+
+# Built-in profiles. None means "leave SQLite's own default alone".
+PROFILES = {
+    # Safe for several processes sharing one file: write-ahead log so readers and the
+    # writer don't block each other, and writers wait up to 5s for the lock instead of
+    # failing with "database is locked". Otherwise SQLite's defaults (synchronous=FULL)
+    'default': {
+        'journal_mode': 'WAL',
+        'busy_timeout': 5000
+    },
+    # Write-ahead log with relaxed syncing: much faster writes, still crash-safe
+    # (a power cut can lose the last commits, but never corrupts the file)
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,        # negative = KiB, so 64 MiB
+        'mmap_size': 268435456,      # 256 MiB of memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000
+    },
+    # WAL for concurrent readers, but every commit is synced to disk
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000
+    }
+}
+
+# Every setting we understand and how to convert it from a string
+SETTING_TYPES = {
+    'url': str,
+    'profile': str,
+    'echo': lambda value: str(value).lower() in ('1', 'true', 'yes', 'on'),
+    'pool_size': int,
+    'max_overflow': int,
+    'pool_timeout': float,
+    'pool_recycle': int,
+    'journal_mode': str,
+    'synchronous': str,
+    'cache_size': int,
+    'mmap_size': int,
+    'temp_store': str,
+    'busy_timeout': int,
+    'write_attempts': int,
+    # Cold-storage file for archived transactions (default: next to the database, see models/archive.py)
+    'archive_path': str
+}
+
+# Allowed values for the pragmas that take keywords
+PRAGMA_CHOICES = {
+    'journal_mode': ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'),
+    'synchronous': ('OFF', 'NORMAL', 'FULL', 'EXTRA'),
+    'temp_store': ('DEFAULT', 'FILE', 'MEMORY')
+}
+
+# Pragmas applied on connect, in this order
+PRAGMAS = ('busy_timeout', 'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+
+# Engine arguments that only make sense for a real connection pool
+POOL_SETTINGS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle')
+
+def _convert(name, value):
+    """Convert a raw config value to the type the setting expects"""
+    if value is None or value == '':
+        return None
+    try:
+        return SETTING_TYPES[name](value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid value for database setting '{name}': {value!r}")
+
+def read_config_file(path=None):
+    """Read the [database] section of an INI file; missing file means no settings"""
+    path = path or os.environ.get(ENV_PREFIX + 'CONFIG') or DEFAULT_CONFIG_FILE
+    parser = configparser.ConfigParser()
+    if not parser.read(path) or not parser.has_section('database'):
+        return {}
+    return {
+        name: _convert(name, value)
+        for name, value in parser.items('database')
+        if name in SETTING_TYPES
+    }
+
+def read_environment(environ=None):
+    """Read FINANCE_DB_* environment variables"""
+    environ = os.environ if environ is None else environ
+    settings = {}
+    for name in SETTING_TYPES:
+        value = environ.get(ENV_PREFIX + name.upper())
+        if value is not None:
+            settings[name] = _convert(name, value)
+    return settings
+
+def load_settings(overrides=None, config_file=None, environ=None):
+    """Resolve the database settings from profile, config file, environment and overrides"""
+    file_settings = read_config_file(config_file)
+    env_settings = read_environment(environ)
+    overrides = overrides or {}
+
+    profile = (overrides.get('profile') or env_settings.get('profile')
+               or file_settings.get('profile') or 'default')
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}'. Use one of: {', '.join(PROFILES)}")
+
+    settings = {'url': DEFAULT_URL, 'echo': False, 'write_attempts': DEFAULT_WRITE_ATTEMPTS}
+    settings.update(PROFILES[profile])
+    for source in (file_settings, env_settings, overrides):
+        settings.update({name: value for name, value in source.items() if value is not None})
+    settings['profile'] = profile
+
+    # Validate keyword pragmas up front rather than on the first connection
+    for name, choices in PRAGMA_CHOICES.items():
+        if settings.get(name) is not None:
+            settings[name] = str(settings[name]).upper()
+            if settings[name] not in choices:
+                raise ValueError(f"Invalid {name} '{settings[name]}'. Use one of: {', '.join(choices)}")
+    return settings
+
+def _apply_pragmas(dbapi_connection, settings):
+    """Run the configured PRAGMA statements on a new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        # Off by default in SQLite; the schema needs it for ON DELETE CASCADE
+        cursor.execute("PRAGMA foreign_keys=ON")
+        for name in PRAGMAS:
+            value = settings.get(name)
+            if value is not None:
+                # Values were validated or converted to int by load_settings
+                cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def create_configured_engine(settings=None):
+    """Create the SQLAlchemy engine described by settings from load_settings()"""
+    settings = settings if settings is not None else load_settings()
+    url = settings['url']
+
+    engine_args = {'echo': settings['echo']}
+    # In-memory SQLite uses a single shared connection, so pool sizing doesn't apply
+    if ':memory:' not in url and url != 'sqlite://':
+        engine_args.update({name: settings[name] for name in POOL_SETTINGS if settings.get(name) is not None})
+    engine = create_engine(url, **engine_args)
+
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            _apply_pragmas(dbapi_connection, settings)
+
+    return engine
@@ -0,0 +1,153 @@
+# lib/models/money.py
+"""
+Exact money handling for Personal Finance Tracker.
+
+Money holds an integer number of cents, so adding up a ledger never drifts
+the way summing floats does. MoneyType stores it in the database as an
+INTEGER column, which lets SQLite SUM() amounts exactly.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from sqlalchemy.types import TypeDecorator, Integer
+
+CENTS_PER_UNIT = 100
+CENT = Decimal('0.01')
+
+class Money:
+    """
+    An immutable amount of money stored as whole cents.
+    Build one from a user-entered or decimal amount with Money.of('12.34'),
+    or from cents with Money(1234).
+    """
+    __slots__ = ('cents',)
+
+    def __init__(self, cents=0):
+        if isinstance(cents, bool) or not isinstance(cents, int):
+            raise TypeError(f"Money takes an integer number of cents, not {cents!r}; use Money.of() for amounts")
+        object.__setattr__(self, 'cents', cents)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Money is immutable")
+
+    @classmethod
+    def of(cls, value):
+        """
+        Convert an amount in currency units (12.34, '12.34', Decimal('12.34')) to Money,
+        rounding half up to the nearest cent. Money passes through unchanged.
+        """
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, float):
+            # repr() gives the shortest string that round-trips, so 0.1 stays 0.1
+            value = repr(value)
+        try:
+            amount = Decimal(str(value).strip().replace(',', '').lstrip('$'))
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {value!r}")
+        if not amount.is_finite():
+            raise ValueError(f"Invalid amount: {value!r}")
+        cents = (amount * CENTS_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+        return cls(int(cents))
+
+    # Parsing user input is the same conversion, but reads better at call sites
+    parse = of
+
+    @property
+    def amount(self):
+        """The value in currency units as an exact Decimal, e.g. Decimal('12.34')"""
+        return (Decimal(self.cents) / CENTS_PER_UNIT).quantize(CENT)
+
+    # Arithmetic - other operands are converted with Money.of, so Money + 0 works with sum()
+    def __add__(self, other):
+        return Money(self.cents + Money.of(other).cents)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return Money(self.cents - Money.of(other).cents)
+
+    def __rsub__(self, other):
+        return Money(Money.of(other).cents - self.cents)
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    def __mul__(self, factor):
+        if isinstance(factor, int) and not isinstance(factor, bool):
+            return Money(self.cents * factor)
+        return Money.of(self.amount * Decimal(str(factor)))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        """Money / Money gives a plain ratio; Money / number gives Money"""
+        if isinstance(other, Money):
+            return self.cents / other.cents
+        return Money.of(self.amount / Decimal(str(other)))
+
+    # Ordering works against Money or plain numbers (floats included), comparing cents.
+    # Equality is exact, and only against Money, ints and Decimals, so equal values
+    # hash alike: Money(100) == 1 == Decimal('1.00'), but Money(10) != 0.1 (floats aren't exact)
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        if isinstance(other, (int, Decimal)) and not isinstance(other, bool):
+            return self.amount == other
+        return NotImplemented
+
+    def __lt__(self, other):
+        return self.cents < Money.of(other).cents
+
+    def __le__(self, other):
+        return self.cents <= Money.of(other).cents
+
+    def __gt__(self, other):
+        return self.cents > Money.of(other).cents
+
+    def __ge__(self, other):
+        return self.cents >= Money.of(other).cents
+
+    def __hash__(self):
+        return hash(self.amount)
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __float__(self):
+        return self.cents / CENTS_PER_UNIT
+
+    def __str__(self):
+        sign = "-" if self.cents < 0 else ""
+        return f"{sign}${abs(self.amount)}"
+
+    def __repr__(self):
+        return f"Money('{self.amount}')"
+
+    def __format__(self, spec):
+        """Format specs like ':.2f' apply to the decimal amount; no spec gives '$12.34'"""
+        if not spec:
+            return str(self)
+        return format(self.amount, spec)
+
+class MoneyType(TypeDecorator):
+    """
+    Column type storing Money as an INTEGER number of cents.
+    Bound values may be Money or plain amounts; results always come back as Money,
+    including SUM()/CASE expressions built on a Money column.
+    """
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return Money.of(value).cents
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return Money(int(value))
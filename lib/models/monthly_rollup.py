@@ -0,0 +1,196 @@
+# lib/models/monthly_rollup.py
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, func, case, bindparam, literal, or_, select, \
+    type_coerce, union_all
+from . import Base, session_scope
+from .money import MoneyType
+
+def year_month(date):
+    """Bucket key for a date, e.g. '2024-03'"""
+    return date.strftime("%Y-%m")
+
+class MonthlyRollup(Base):
+    """
+    MonthlyRollup keeps income, expenses and transaction count per user,
+    category and calendar month, so time-series reports read a few rows per
+    month instead of scanning every transaction.
+    Rows are updated in the same database transaction as every insert or delete
+    of a Transaction; rebuild() recomputes them all in bulk.
+    """
+    __tablename__ = 'monthly_rollups'
+    __table_args__ = (
+        # One row per bucket; reports filter by user and month range
+        Index('ix_monthly_rollups_user_month_category', 'user_id', 'year_month', 'category_id', unique=True),
+        # Lets a category delete find its buckets without a scan (migration 0008)
+        Index('ix_monthly_rollups_category_id', 'category_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    # NULL for transactions without a category
+    category_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), nullable=True)
+    # 'YYYY-MM'
+    year_month = Column(String(7), nullable=False)
+    # Totals in cents; expenses are stored as a positive number
+    income = Column('income_cents', MoneyType, nullable=False, default=0)
+    expenses = Column('expenses_cents', MoneyType, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (f"<MonthlyRollup(user_id={self.user_id}, category_id={self.category_id}, "
+                f"year_month={self.year_month}, income={self.income}, expenses={self.expenses})>")
+
+    @classmethod
+    def apply(cls, session, user_id, category_id, month, income=0, expenses=0, count=0):
+        """Add to one bucket's totals (pass negative values to subtract)"""
+        updated = session.execute(APPLY_UPDATE, {
+            'match_user_id': user_id, 'match_category_id': category_id, 'match_year_month': month,
+            'delta_income': income, 'delta_expenses': expenses, 'delta_count': count
+        }).rowcount
+        if not updated:
+            session.execute(cls.__table__.insert(), {
+                'user_id': user_id, 'category_id': category_id, 'year_month': month,
+                'income_cents': income, 'expenses_cents': expenses, 'transaction_count': count
+            })
+
+    @classmethod
+    def rebuild(cls, session=None):
+        """Recompute every bucket from the transactions table (archived ones included). Returns the number of rows."""
+        with session_scope(session, write=True, archive=True) as session:
+            from .archive import history
+            transactions = history(session)
+            table = cls.__table__
+            month = func.strftime('%Y-%m', transactions.transaction_date)
+            totals = session.query(
+                transactions.user_id,
+                transactions.category_id,
+                month,
+                func.sum(case((transactions.amount > 0, transactions.amount), else_=0)),
+                func.sum(case((transactions.amount < 0, -transactions.amount), else_=0)),
+                func.count(transactions.id)
+            ).group_by(transactions.user_id, transactions.category_id, month)
+
+            session.execute(table.delete())
+            result = session.execute(
+                table.insert().from_select(
+                    ['user_id', 'category_id', 'year_month', 'income_cents', 'expenses_cents', 'transaction_count'],
+                    totals.statement
+                )
+            )
+            return result.rowcount
+
+    @classmethod
+    def check_totals(cls, user_range=None, session=None):
+        """
+        Compare every bucket with totals recomputed from the transactions table
+        (archived ones included).
+        user_range is an optional inclusive (first_user_id, last_user_id), so a large
+        database can be checked in batches. Stored and recomputed rows are combined
+        in one query, so a bucket missing on either side is found too.
+        Returns a list of mismatches.
+        """
+        with session_scope(session) as session:
+            from .archive import history
+            transactions = history(session)
+            month = func.strftime('%Y-%m', transactions.transaction_date)
+            names = ('user_id', 'category_id', 'year_month', 'stored_income', 'stored_expenses', 'stored_count',
+                     'actual_income', 'actual_expenses', 'actual_count')
+            zeros = [literal(0) for _ in range(3)]
+            stored = select(*(value.label(name) for name, value in zip(names, [
+                cls.user_id, cls.category_id, cls.year_month,
+                cls.income, cls.expenses, cls.transaction_count, *zeros
+            ])))
+            actual = select(*(value.label(name) for name, value in zip(names, [
+                transactions.user_id, transactions.category_id, month, *zeros,
+                func.sum(case((transactions.amount > 0, transactions.amount), else_=0)),
+                func.sum(case((transactions.amount < 0, -transactions.amount), else_=0)),
+                func.count(transactions.id)
+            ]))).group_by(transactions.user_id, transactions.category_id, month)
+            if user_range:
+                stored = stored.where(cls.user_id.between(*user_range))
+                actual = actual.where(transactions.user_id.between(*user_range))
+
+            combined = union_all(stored, actual).subquery()
+            key = [combined.c.user_id, combined.c.category_id, combined.c.year_month]
+            sums = {name: func.sum(combined.c[name]) for name in names[3:]}
+            rows = session.query(
+                *key,
+                *(total if name.endswith('count') else type_coerce(total, MoneyType) for name, total in sums.items())
+            ).group_by(*key).having(or_(
+                sums['stored_income'] != sums['actual_income'],
+                sums['stored_expenses'] != sums['actual_expenses'],
+                sums['stored_count'] != sums['actual_count']
+            )).order_by(*key).all()
+            return [dict(zip(names, row)) for row in rows]
+
+    @classmethod
+    def monthly_totals(cls, user_id, start_month=None, end_month=None, session=None):
+        """
+        Income, expenses, net and transaction count per month for a user, oldest first.
+        start_month and end_month are optional inclusive 'YYYY-MM' bounds.
+        """
+        with session_scope(session) as session:
+            query = session.query(
+                cls.year_month,
+                func.sum(cls.income),
+                func.sum(cls.expenses),
+                func.sum(cls.transaction_count)
+            ).filter(cls.user_id == user_id)
+            query = cls._month_range(query, start_month, end_month)
+            rows = query.group_by(cls.year_month).order_by(cls.year_month).all()
+            return [
+                {
+                    'year_month': month,
+                    'income': income,
+                    'expenses': expenses,
+                    'net': income - expenses,
+                    'count': count
+                }
+                for month, income, expenses, count in rows
+                if count
+            ]
+
+    @classmethod
+    def category_trends(cls, user_id, start_month=None, end_month=None, session=None):
+        """
+        Spending per category per month for a user.
+        Returns {category name: {'YYYY-MM': expenses}}; uncategorized spending is under 'No Category'.
+        """
+        with session_scope(session) as session:
+            from .category import Category
+            query = session.query(
+                Category.name,
+                cls.year_month,
+                func.sum(cls.expenses)
+            ).select_from(cls).outerjoin(Category, Category.id == cls.category_id).filter(
+                cls.user_id == user_id, cls.expenses > 0
+            )
+            query = cls._month_range(query, start_month, end_month)
+            rows = query.group_by(cls.category_id, cls.year_month).order_by(cls.year_month).all()
+
+            trends = {}
+            for name, month, expenses in rows:
+                trends.setdefault(name or "No Category", {})[month] = expenses
+            return trends
+
+    @classmethod
+    def _month_range(cls, query, start_month, end_month):
+        """Restrict a query to an inclusive range of 'YYYY-MM' months"""
+        if start_month:
+            query = query.filter(cls.year_month >= start_month)
+        if end_month:
+            query = query.filter(cls.year_month <= end_month)
+        return query
+
+# Built once and reused: apply() runs for every bucket touched by every write, and
+# constructing the statement each time cost more than executing it.
+# IS (not =) matches the NULL category bucket as well.
+_rollups = MonthlyRollup.__table__
+APPLY_UPDATE = _rollups.update().where(
+    _rollups.c.user_id == bindparam('match_user_id'),
+    _rollups.c.year_month == bindparam('match_year_month'),
+    _rollups.c.category_id.is_not_distinct_from(bindparam('match_category_id'))
+).values(
+    income_cents=_rollups.c.income_cents + bindparam('delta_income', type_=MoneyType()),
+    expenses_cents=_rollups.c.expenses_cents + bindparam('delta_expenses', type_=MoneyType()),
+    transaction_count=_rollups.c.transaction_count + bindparam('delta_count')
+)
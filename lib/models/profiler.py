@@ -0,0 +1,139 @@
+# lib/models/profiler.py
+"""
+Optional SQL instrumentation for Personal Finance Tracker.
+
+When enabled (FINANCE_PROFILE=1 or the --profile flag on lib/cli.py and
+lib/finance.py), every statement sent to the database is timed through the
+engine's before/after_cursor_execute events and charged to the CLI action
+that is running. After each action a short report goes to stderr:
+statement count, total database time, the most frequent statement shapes,
+and a warning for any shape repeated more than the N+1 threshold
+(FINANCE_PROFILE_THRESHOLD, default 10) - the usual sign of a lazy load
+inside a loop.
+"""
+
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+ENV_VAR = 'FINANCE_PROFILE'
+THRESHOLD_ENV_VAR = 'FINANCE_PROFILE_THRESHOLD'
+# Same statement shape more often than this in one action is reported as a likely N+1
+DEFAULT_REPEAT_THRESHOLD = 10
+# Statement shapes listed in each report
+TOP_SHAPES = 3
+
+WHITESPACE = re.compile(r'\s+')
+# "IN (?, ?, ?)" with any number of parameters is one shape
+PARAMETER_LIST = re.compile(r'\?(?:\s*,\s*\?)+')
+NUMBER = re.compile(r'\b\d+\b')
+
+def statement_shape(statement):
+    """Normalize SQL so statements differing only in parameters compare equal"""
+    shape = WHITESPACE.sub(' ', statement).strip()
+    shape = PARAMETER_LIST.sub('?, ...', shape)
+    return NUMBER.sub('N', shape)
+
+def env_enabled(environ=None):
+    """True if the environment asks for profiling"""
+    environ = os.environ if environ is None else environ
+    return environ.get(ENV_VAR, '').lower() in ('1', 'true', 'yes', 'on')
+
+class ActionStats:
+    """Statements recorded while one CLI action ran"""
+
+    def __init__(self, name):
+        self.name = name
+        self.statements = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.shape_seconds = Counter()
+
+    def record(self, statement, elapsed):
+        shape = statement_shape(statement)
+        self.statements += 1
+        self.seconds += elapsed
+        self.shapes[shape] += 1
+        self.shape_seconds[shape] += elapsed
+
+    def repeated(self, threshold):
+        """(shape, count) for shapes seen more than threshold times, most frequent first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+class QueryProfiler:
+    """Times every statement on an engine and groups them by CLI action"""
+
+    def __init__(self, engine, threshold=DEFAULT_REPEAT_THRESHOLD, output=None):
+        self.engine = engine
+        self.threshold = threshold
+        self.output = output
+        self.enabled = False
+        self.current = None
+        # Every finished action, oldest first
+        self.history = []
+
+    def enable(self):
+        if not self.enabled:
+            event.listen(self.engine, 'before_cursor_execute', self._before_execute)
+            event.listen(self.engine, 'after_cursor_execute', self._after_execute)
+            self.enabled = True
+
+    def disable(self):
+        if self.enabled:
+            event.remove(self.engine, 'before_cursor_execute', self._before_execute)
+            event.remove(self.engine, 'after_cursor_execute', self._after_execute)
+            self.enabled = False
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profiler_started', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['profiler_started'].pop()
+        if self.current is not None:
+            self.current.record(statement, time.perf_counter() - started)
+
+    @contextmanager
+    def action(self, name):
+        """
+        Charge statements run inside the block to the action `name` and report
+        afterwards. Does nothing when profiling is off; nested actions count
+        towards the outermost one.
+        """
+        if not self.enabled or self.current is not None:
+            yield self.current
+            return
+        self.current = ActionStats(name)
+        try:
+            yield self.current
+        finally:
+            stats, self.current = self.current, None
+            self.history.append(stats)
+            self.report(stats)
+
+    def report(self, stats):
+        """Write one action's summary and N+1 warnings"""
+        output = self.output or sys.stderr
+        print(f"\n📊 [{stats.name}] {stats.statements} statements, {stats.seconds * 1000:.1f} ms in the database",
+              file=output)
+        for shape, count in stats.shapes.most_common(TOP_SHAPES):
+            print(f"    {count:>5}x {stats.shape_seconds[shape] * 1000:>8.1f} ms  {shape[:100]}", file=output)
+        for shape, count in stats.repeated(self.threshold):
+            print(f"⚠️  [{stats.name}] possible N+1: same query ran {count} times "
+                  f"(threshold {self.threshold}): {shape[:160]}", file=output)
+
+def create_profiler(engine, enabled=None, environ=None):
+    """Build a profiler from the environment; enabled=True/False overrides FINANCE_PROFILE"""
+    environ = os.environ if environ is None else environ
+    try:
+        threshold = int(environ.get(THRESHOLD_ENV_VAR, DEFAULT_REPEAT_THRESHOLD))
+    except ValueError:
+        raise ValueError(f"{THRESHOLD_ENV_VAR} must be a whole number")
+    profiler = QueryProfiler(engine, threshold)
+    if env_enabled(environ) if enabled is None else enabled:
+        profiler.enable()
+    return profiler
@@ -1,8 +1,36 @@
 # lib/models/transaction.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
-from . import Base, get_session
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, or_, case, func, table, column, literal_column, text
+from sqlalchemy.orm import relationship, joinedload, selectinload
+from . import Base, session_scope, get_pinned, retry_on_busy
+from .archive import history, archived
+from .money import Money, MoneyType
 from datetime import datetime
+import re
+
+# Default number of rows returned by Transaction.get_page
+DEFAULT_PAGE_SIZE = 50
+# Default number of rows fetched per round trip by Transaction.stream
+DEFAULT_STREAM_BATCH = 1000
+# Default number of rows sent per executemany() by Transaction.bulk_create
+DEFAULT_BULK_CHUNK = 1000
+
+# FTS5 index over descriptions, maintained by triggers (created by migration 0007).
+# Not part of Base.metadata: it is a virtual table that only SQLite understands.
+search_index = table('transactions_fts', column('rowid'), column('description'))
+
+# Words in a user's search text; FTS5 operators, quotes and punctuation are dropped
+SEARCH_WORD = re.compile(r'\w+')
+
+def to_match_query(terms):
+    """
+    Turn free text typed by a user into an FTS5 MATCH expression.
+    Every word must appear, and each word also matches as a prefix ("amaz" finds "Amazon").
+    Returns None if the text has no searchable words.
+    """
+    words = SEARCH_WORD.findall(terms or '')
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
 
 class Transaction(Base):
     """
@@ -11,17 +39,28 @@ class Transaction(Base):
     Positive amounts are income, negative amounts are expenses.
     """
     __tablename__ = 'transactions'
+    # Composite indexes let the finders filter and sort by date without a table scan.
+    # amount_cents rides along so SUM()s per user or category are served from the
+    # index alone (created by migrations 0002 and 0006)
+    # AUTOINCREMENT keeps SQLite from handing out the ID of an archived transaction
+    # again (migration 0009; see models/archive.py)
+    __table_args__ = (
+        Index('ix_transactions_user_date_amount', 'user_id', 'transaction_date', 'amount_cents'),
+        Index('ix_transactions_category_date_amount', 'category_id', 'transaction_date', 'amount_cents'),
+        {'sqlite_autoincrement': True},
+    )
     
     id = Column(Integer, primary_key=True)
     description = Column(String(200), nullable=False)
     # Positive for income, negative for expenses
-    amount = Column(Float, nullable=False)
+    # Stored as integer cents in amount_cents; read and written as Money
+    amount = Column('amount_cents', MoneyType, nullable=False)
     transaction_date = Column(DateTime, default=datetime.now)
     created_at = Column(DateTime, default=datetime.now)
     
-    # Foreign keys
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    category_id = Column(Integer, ForeignKey('categories.id'), nullable=True)
+    # Foreign keys - deleting a user or category deletes its transactions in the database
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    category_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="transactions")
@@ -43,29 +82,32 @@ class Transaction(Base):
     @property
     def formatted_amount(self):
         """Return formatted amount with currency symbol"""
-        return f"${abs(self.amount):.2f}"
+        return str(abs(self.amount))
     
     # ORM Methods
+    # Each method takes an optional session so several calls can share one unit of work
     @classmethod
-    def create(cls, description, amount, user_id, category_id=None, transaction_date=None):
+    @retry_on_busy
+    def create(cls, description, amount, user_id, category_id=None, transaction_date=None, session=None):
         """Create a new transaction"""
-        session = get_session()
-        try:
+        with session_scope(session, write=True) as session:
+            amount = Money.of(amount)
             if not description:
                 raise ValueError("Description is required")
             if amount == 0:
                 raise ValueError("Amount cannot be zero")
             
             # Verify user exists
+            # Pinned lookups are answered from memory when the unit of work already loaded them
             from .user import User
-            user = session.query(User).filter_by(id=user_id).first()
+            user = get_pinned(session, User, user_id)
             if not user:
                 raise ValueError("User not found")
             
             # Verify category exists (if provided)
             if category_id:
                 from .category import Category
-                category = session.query(Category).filter_by(id=category_id).first()
+                category = get_pinned(session, Category, category_id)
                 if not category:
                     raise ValueError("Category not found")
                 if category.user_id != user_id:
@@ -79,60 +121,325 @@ class Transaction(Base):
                 transaction_date=transaction_date or datetime.now()
             )
             session.add(transaction)
-            session.commit()
-            session.refresh(transaction)
+            session.flush()
+            cls._record_change(session, transaction, 1)
             return transaction
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     @classmethod
-    def get_all(cls):
-        """Get all transactions"""
-        session = get_session()
-        try:
-            return session.query(cls).order_by(cls.transaction_date.desc()).all()
-        finally:
-            session.close()
+    def bulk_create(cls, rows, user_id, chunk_size=DEFAULT_BULK_CHUNK, session=None):
+        """
+        Insert many transactions for one user inside a single unit of work.
+        'rows' is any iterable of dicts with description, amount and optionally
+        transaction_date and category_id. Rows are validated and inserted in chunks
+        of 'chunk_size', so the iterable can be a streaming parser.
+        Returns the number of rows inserted.
+        Not retried when the database is locked (the rows may be a one-pass stream),
+        but the write lock is taken up front, waiting up to busy_timeout for it.
+        """
+        with session_scope(session, write=True) as session:
+            # Verify user exists (once, not once per row)
+            from .user import User
+            if not get_pinned(session, User, user_id):
+                raise ValueError("User not found")
+            
+            inserted = 0
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= chunk_size:
+                    inserted += cls._insert_batch(session, batch, user_id, inserted)
+                    batch = []
+            if batch:
+                inserted += cls._insert_batch(session, batch, user_id, inserted)
+            
+            return inserted
+    
+    @classmethod
+    def _insert_batch(cls, session, batch, user_id, offset):
+        """Validate one chunk of rows and insert it with a single executemany()"""
+        now = datetime.now()
+        values = []
+        for number, row in enumerate(batch, start=offset + 1):
+            if not row.get('description'):
+                raise ValueError(f"Row {number}: Description is required")
+            amount = Money.of(row.get('amount') or 0)
+            if not amount:
+                raise ValueError(f"Row {number}: Amount cannot be zero")
+            values.append({
+                'description': row['description'],
+                'amount_cents': amount,
+                'user_id': user_id,
+                'category_id': row.get('category_id'),
+                'transaction_date': row.get('transaction_date') or now,
+                'created_at': now
+            })
+        
+        # Verify every category used in this chunk with one query
+        category_ids = {value['category_id'] for value in values if value['category_id']}
+        if category_ids:
+            from .category import Category
+            owned = {cat_id for (cat_id,) in session.query(Category.id).filter(
+                Category.id.in_(category_ids), Category.user_id == user_id
+            )}
+            missing = category_ids - owned
+            if missing:
+                raise ValueError(f"Category not found or does not belong to this user: {sorted(missing)}")
+        
+        session.execute(cls.__table__.insert(), values)
+        
+        # Keep the running totals in step, once per chunk rather than once per row
+        from .user_balance import UserBalance
+        from .monthly_rollup import MonthlyRollup, year_month
+        income = sum((value['amount_cents'] for value in values if value['amount_cents'] > 0), Money(0))
+        expenses = -sum((value['amount_cents'] for value in values if value['amount_cents'] < 0), Money(0))
+        UserBalance.apply(session, user_id, income, expenses, len(values))
+        
+        buckets = {}
+        for value in values:
+            key = (value['category_id'], year_month(value['transaction_date']))
+            bucket = buckets.setdefault(key, [Money(0), Money(0), 0])
+            if value['amount_cents'] > 0:
+                bucket[0] += value['amount_cents']
+            else:
+                bucket[1] -= value['amount_cents']
+            bucket[2] += 1
+        spending = {}
+        for (category_id, month), (income, expenses, count) in buckets.items():
+            MonthlyRollup.apply(session, user_id, category_id, month, income, expenses, count)
+            if category_id:
+                totals = spending.setdefault(category_id, [Money(0), 0])
+                totals[0] += expenses
+                totals[1] += count
+        
+        from .category import Category
+        for category_id, (spent, count) in spending.items():
+            Category.apply_spending(session, category_id, spent, count)
+        return len(values)
+    
+    @classmethod
+    def _record_change(cls, session, transaction, sign):
+        """
+        Update the running totals for one inserted (sign=1) or deleted (sign=-1) transaction.
+        Runs in the caller's session so it commits or rolls back with the change itself.
+        """
+        from .user_balance import UserBalance
+        from .monthly_rollup import MonthlyRollup, year_month
+        amount = transaction.amount
+        income = (amount if amount > 0 else Money(0)) * sign
+        expenses = (-amount if amount < 0 else Money(0)) * sign
+        UserBalance.apply(session, transaction.user_id, income, expenses, sign)
+        MonthlyRollup.apply(
+            session, transaction.user_id, transaction.category_id,
+            year_month(transaction.transaction_date), income, expenses, sign
+        )
+        if transaction.category_id:
+            from .category import Category
+            Category.apply_spending(session, transaction.category_id, expenses, sign)
+    
+    @classmethod
+    def get_all(cls, with_user=False, with_category=False, session=None):
+        """Get all transactions, archived ones included (with_user/with_category load those in the same query)"""
+        with session_scope(session) as session:
+            source = history(session)
+            query = cls._load_related(session.query(source), with_user, with_category, source)
+            return query.order_by(source.transaction_date.desc()).all()
     
     @classmethod
-    def find_by_id(cls, transaction_id):
+    def find_by_id(cls, transaction_id, session=None):
         """Find transaction by ID"""
-        session = get_session()
-        try:
-            return session.query(cls).filter_by(id=transaction_id).first()
-        finally:
-            session.close()
-    
-    @classmethod
-    def find_by_user(cls, user_id):
-        """Find all transactions for a user"""
-        session = get_session()
-        try:
-            return session.query(cls).filter_by(user_id=user_id).order_by(cls.transaction_date.desc()).all()
-        finally:
-            session.close()
-    
-    @classmethod
-    def find_by_category(cls, category_id):
-        """Find all transactions for a category"""
-        session = get_session()
-        try:
-            return session.query(cls).filter_by(category_id=category_id).order_by(cls.transaction_date.desc()).all()
-        finally:
-            session.close()
-    
-    def delete(self):
-        """Delete this transaction"""
-        session = get_session()
-        try:
-            session.delete(self)
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
+        with session_scope(session) as session:
+            return session.get(cls, transaction_id)
+    
+    @classmethod
+    def find_by_user(cls, user_id, with_category=False, start=None, end=None, session=None):
+        """Find a user's transactions, archived ones included (start/end: optional inclusive date range)"""
+        with session_scope(session) as session:
+            source = history(session, start)
+            query = cls._load_related(session.query(source), False, with_category, source)
+            query = cls._filter(query, source, user_id=user_id, start=start, end=end)
+            return query.order_by(source.transaction_date.desc()).all()
+    
+    @classmethod
+    def find_by_category(cls, category_id, with_user=False, start=None, end=None, session=None):
+        """Find a category's transactions, archived ones included (start/end: optional inclusive date range)"""
+        with session_scope(session) as session:
+            source = history(session, start)
+            query = cls._load_related(session.query(source), with_user, False, source)
+            query = cls._filter(query, source, category_id=category_id, start=start, end=end)
+            return query.order_by(source.transaction_date.desc()).all()
+    
+    @classmethod
+    def totals(cls, user_id=None, category_id=None, start=None, end=None, session=None):
+        """
+        Income, expenses, balance and count of the matching transactions as a dict,
+        like UserBalance.find_by_user, for date ranges the running totals can't answer.
+        One aggregate query, read from the composite indexes alone.
+        """
+        with session_scope(session) as session:
+            source = history(session, start)
+            query = session.query(
+                func.coalesce(func.sum(case((source.amount > 0, source.amount), else_=0)), 0),
+                func.coalesce(func.sum(case((source.amount < 0, -source.amount), else_=0)), 0),
+                func.count(source.id)
+            )
+            income, expenses, count = cls._filter(query, source, user_id, category_id, start, end).one()
+            income, expenses = Money.of(income), Money.of(expenses)
+            return {
+                'income': income,
+                'expenses': expenses,
+                'balance': income - expenses,
+                'count': count
+            }
+    
+    @classmethod
+    def _filter(cls, query, source, user_id=None, category_id=None, start=None, end=None):
+        """
+        Restrict a query to a user and/or category and to an inclusive date range
+        (either end may be None). With user_id or category_id the composite indexes
+        serve the whole WHERE as one range scan.
+        """
+        if user_id is not None:
+            query = query.filter(source.user_id == user_id)
+        if category_id is not None:
+            query = query.filter(source.category_id == category_id)
+        if start is not None and end is not None:
+            query = query.filter(source.transaction_date.between(start, end))
+        elif start is not None:
+            query = query.filter(source.transaction_date >= start)
+        elif end is not None:
+            query = query.filter(source.transaction_date <= end)
+        return query
+    
+    @classmethod
+    def _load_related(cls, query, with_user=False, with_category=False, source=None):
+        """
+        Load each transaction's user and/or category in the same SELECT (LEFT OUTER JOIN),
+        so reading transaction.user.name later needs no query - and works after the session closes.
+        source is the entity queried, when it isn't Transaction itself (see archive.history)
+        """
+        source = source or cls
+        if with_user:
+            query = query.options(joinedload(source.user))
+        if with_category:
+            query = query.options(joinedload(source.category))
+        return query
+    
+    @classmethod
+    def _ordered_query(cls, session, source, user_id=None, category_id=None, with_user=False, with_category=False,
+                       start=None, end=None):
+        """Build the newest-first query shared by the paging and streaming finders"""
+        query = cls._load_related(session.query(source), with_user, with_category, source)
+        query = cls._filter(query, source, user_id, category_id, start, end)
+        # id breaks ties between transactions with the same date so the order is stable
+        return query.order_by(source.transaction_date.desc(), source.id.desc())
+    
+    @classmethod
+    def get_page(cls, user_id=None, category_id=None, after=None, limit=DEFAULT_PAGE_SIZE,
+                 with_user=False, with_category=False, start=None, end=None, session=None):
+        """
+        Get one page of transactions, newest first, archived ones included.
+        start/end give an optional inclusive date range.
+        'after' is the (transaction_date, id) cursor returned with the previous page.
+        Returns (transactions, next_cursor); next_cursor is None on the last page.
+        """
+        with session_scope(session) as session:
+            source = history(session, start)
+            query = cls._ordered_query(session, source, user_id, category_id, with_user, with_category, start, end)
+            if after is not None:
+                # Keyset pagination: seek past the cursor instead of using OFFSET,
+                # so every page costs the same no matter how deep we are
+                after_date, after_id = after
+                query = query.filter(source.transaction_date <= after_date).filter(
+                    or_(source.transaction_date < after_date, source.id < after_id)
+                )
+            # Fetch one extra row to find out whether another page exists
+            transactions = query.limit(limit + 1).all()
+            if len(transactions) > limit:
+                transactions = transactions[:limit]
+                last = transactions[-1]
+                return transactions, (last.transaction_date, last.id)
+            return transactions, None
+    
+    @classmethod
+    def search(cls, user_id, query, date_range=None, limit=DEFAULT_PAGE_SIZE, offset=None,
+               with_category=False, session=None):
+        """
+        Full-text search of a user's transaction descriptions, best match first.
+        When the range reaches archived transactions (which aren't in the full-text
+        index), they follow the live matches, newest first, matched word by word.
+        date_range is an optional (start, end) pair; either end may be None.
+        'offset' is the cursor returned with the previous page.
+        Returns (transactions, next_cursor); next_cursor is None on the last page.
+        """
+        match = to_match_query(query)
+        if match is None:
+            return [], None
+        offset = offset or 0
+        start, end = date_range or (None, None)
+        with session_scope(session) as session:
+            index = literal_column('transactions_fts')
+            results = cls._load_related(session.query(cls), False, with_category).join(
+                search_index, search_index.c.rowid == cls.id
+            ).filter(
+                index.op('MATCH')(match),
+                cls.user_id == user_id
+            )
+            results = cls._filter(results, cls, start=start, end=end)
+            # bm25() is lower for better matches; newer transactions win ties
+            results = results.order_by(func.bm25(index), cls.transaction_date.desc(), cls.id.desc())
+            
+            # Ranked results can't use a keyset cursor, so page with OFFSET and fetch one extra row
+            transactions = results.offset(offset).limit(limit + 1).all()
+            if len(transactions) > limit:
+                return transactions[:limit], offset + limit
+            
+            source = archived(session, start)
+            if source is None:
+                return transactions, None
+            # Live matches ran out on this page; carry on into the archive, where
+            # every word must appear in the description (LIKE, so case-insensitive)
+            live_count = offset + len(transactions) if transactions or not offset else results.count()
+            older = session.query(source)
+            if with_category:
+                # A JOIN can't be aliased onto the archive's table; one extra IN query instead
+                older = older.options(selectinload(source.category))
+            older = older.filter(
+                source.user_id == user_id,
+                *(source.description.contains(word, autoescape=True) for word in SEARCH_WORD.findall(query))
+            )
+            older = cls._filter(older, source, start=start, end=end).order_by(
+                source.transaction_date.desc(), source.id.desc()
+            )
+            transactions += older.offset(max(offset - live_count, 0)).limit(limit + 1 - len(transactions)).all()
+            if len(transactions) > limit:
+                return transactions[:limit], offset + limit
+            return transactions, None
+    
+    @classmethod
+    def rebuild_search_index(cls, session=None):
+        """Re-index every description from the transactions table"""
+        with session_scope(session, write=True) as session:
+            session.execute(text("INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild')"))
+    
+    @classmethod
+    def stream(cls, user_id=None, category_id=None, batch_size=DEFAULT_STREAM_BATCH,
+               with_user=False, with_category=False, start=None, end=None, session=None):
+        """
+        Yield transactions newest first (archived ones included), fetching them from
+        the database in batches. start/end give an optional inclusive date range.
+        """
+        with session_scope(session) as session:
+            source = history(session, start)
+            query = cls._ordered_query(session, source, user_id, category_id, with_user, with_category, start, end)
+            for transaction in query.yield_per(batch_size):
+                yield transaction
+    
+    @retry_on_busy
+    def delete(self, session=None):
+        """Delete this transaction (archived transactions are read-only: nothing happens)"""
+        with session_scope(session, write=True) as session:
+            transaction = session.get(Transaction, self.id)
+            if transaction:
+                session.delete(transaction)
+                Transaction._record_change(session, transaction, -1)
             
\ No newline at end of file
@@ -1,9 +1,26 @@
 # lib/models/user.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, create_engine
+from sqlalchemy import Column, Integer, String, DateTime, create_engine, func, or_, and_, type_coerce
 from sqlalchemy.orm import relationship
-from . import Base, get_session
+from . import Base, session_scope, retry_on_busy
+from .money import MoneyType
+from .cache import LookupCache
 from datetime import datetime
 
+# Users by ('id', user_id) and ('email', email)
+user_cache = LookupCache('users')
+
+# Default number of rows returned by User.get_page
+DEFAULT_PAGE_SIZE = 50
+# Sort options for User.get_page, and the listing dict key each one sorts on
+SORT_KEYS = {
+    'id': 'id',
+    'name': 'name',
+    'email': 'email',
+    'balance': 'balance',
+    'transactions': 'transactions_count',
+    'categories': 'categories_count'
+}
+
 class User(Base):
     """
     User model represents a person using the finance tracker.
@@ -22,8 +39,11 @@ class User(Base):
     
     # Relationships - SQLAlchemy will handle the foreign key connections
     # back_populates creates bidirectional relationships
-    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
-    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
+    # passive_deletes leaves children that aren't loaded to the database's ON DELETE CASCADE
+    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan",
+                              passive_deletes=True)
+    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan",
+                                passive_deletes=True)
     
     def __repr__(self):
         """String representation for debugging"""
@@ -33,139 +53,172 @@ class User(Base):
     @property
     def total_income(self):
         """Calculate total income across all transactions"""
-        # Use a fresh session to avoid lazy loading issues
-        session = get_session()
-        try:
-            from .transaction import Transaction
-            total = session.query(Transaction).filter_by(user_id=self.id).filter(Transaction.amount > 0).all()
-            return sum(t.amount for t in total) or 0.0
-        finally:
-            session.close()
+        return self.summary()['income']
     
     @property
     def total_expenses(self):
         """Calculate total expenses across all transactions"""
-        # Use a fresh session to avoid lazy loading issues
-        session = get_session()
-        try:
-            from .transaction import Transaction
-            expenses = session.query(Transaction).filter_by(user_id=self.id).filter(Transaction.amount < 0).all()
-            return sum(abs(t.amount) for t in expenses) or 0.0
-        finally:
-            session.close()
+        return self.summary()['expenses']
     
     @property
     def balance(self):
         """Calculate current balance (income - expenses)"""
-        return self.total_income - self.total_expenses
+        return self.summary()['balance']
+    
+    def summary(self, start=None, end=None, session=None):
+        """Get income, expenses, balance and transaction count (start/end: optional inclusive date range)"""
+        if start is not None or end is not None:
+            # One aggregate over the range, read from the user/date index
+            from .transaction import Transaction
+            return Transaction.totals(user_id=self.id, start=start, end=end, session=session)
+        # Read the running totals kept in user_balances - one primary-key lookup
+        # no matter how many transactions the user has
+        from .user_balance import UserBalance
+        return UserBalance.find_by_user(self.id, session=session)
     
     # ORM Methods (Create, Read, Update, Delete operations)
+    # Each method takes an optional session so several calls can share one unit of work
     @classmethod
-    def create(cls, name, email):
+    @retry_on_busy
+    def create(cls, name, email, session=None):
         """Create a new user"""
-        session = get_session()
-        try:
+        with session_scope(session, write=True) as session:
             # Validate input
             if not name or not email:
                 raise ValueError("Name and email are required")
             
             # Check if email already exists
-            existing_user = session.query(cls).filter_by(email=email).first()
+            existing_user = session.query(cls.id).filter_by(email=email).first()
             if existing_user:
                 raise ValueError("Email already exists")
             
             # Create new user
             user = cls(name=name, email=email)
             session.add(user)
-            session.commit()
-            session.refresh(user)  # Get the ID assigned by database
+            session.flush()  # Get the ID assigned by database
+            user_cache.invalidate(('id', user.id), ('email', email))
             return user
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
     
     @classmethod
-    def get_all(cls):
-        """Get all users with their related data properly loaded"""
-        session = get_session()
-        try:
-            # Get all users with proper data access while session is active
-            users = session.query(cls).all()
-            
-            # Create a list of user data dictionaries with all data accessed in session
-            user_data = []
-            for user in users:
-                # Access all needed data while session is active
-                categories_count = len(user.categories) if user.categories else 0
-                transactions_count = len(user.transactions) if user.transactions else 0
-                balance = sum(t.amount for t in user.transactions) if user.transactions else 0.0
-                
-                user_info = {
-                    'id': user.id,
-                    'name': user.name,
-                    'email': user.email,  # This was the bug - accessing after session close
-                    'categories_count': categories_count,
-                    'transactions_count': transactions_count,
-                    'balance': balance
-                }
-                user_data.append(user_info)
+    def get_all(cls, session=None):
+        """Get every user with category count, transaction count and balance, from one query"""
+        with session_scope(session) as session:
+            query, _ = cls._listing_query(session)
+            return [cls._listing_row(row) for row in query.order_by(cls.id).all()]
+    
+    @classmethod
+    def get_page(cls, sort='id', descending=False, after=None, limit=DEFAULT_PAGE_SIZE, session=None):
+        """
+        Get one page of the admin user listing, sorted by one of SORT_KEYS (id breaks ties).
+        'after' is the cursor returned with the previous page.
+        Returns (user dicts, next_cursor); next_cursor is None on the last page.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Can't sort users by '{sort}'. Use one of: {', '.join(SORT_KEYS)}")
+        with session_scope(session) as session:
+            query, columns = cls._listing_query(session)
+            sort_column = columns[sort]
+            if after is not None:
+                # Keyset pagination on (sort value, id), like Transaction.get_page
+                after_value, after_id = after
+                if descending:
+                    query = query.filter(or_(sort_column < after_value,
+                                             and_(sort_column == after_value, cls.id < after_id)))
+                else:
+                    query = query.filter(or_(sort_column > after_value,
+                                             and_(sort_column == after_value, cls.id > after_id)))
+            if descending:
+                query = query.order_by(sort_column.desc(), cls.id.desc())
+            else:
+                query = query.order_by(sort_column, cls.id)
             
-            return user_data
-        finally:
-            session.close()
+            rows = [cls._listing_row(row) for row in query.limit(limit + 1).all()]
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                return rows, (last[SORT_KEYS[sort]], last['id'])
+            return rows, None
+    
+    @classmethod
+    def _listing_query(cls, session):
+        """
+        Users joined to their running totals and a grouped count of categories.
+        No child collections are loaded, so the cost is one row per user.
+        Returns the query and its sortable column expressions by SORT_KEYS name.
+        """
+        from .category import Category
+        from .user_balance import UserBalance
+        category_counts = session.query(
+            Category.user_id, func.count(Category.id).label('count')
+        ).group_by(Category.user_id).subquery()
+        
+        columns = {
+            'id': cls.id,
+            'name': cls.name,
+            'email': cls.email,
+            # Users without transactions have no user_balances row
+            'balance': type_coerce(
+                func.coalesce(UserBalance.income, 0) - func.coalesce(UserBalance.expenses, 0), MoneyType
+            ).label('balance'),
+            'transactions': func.coalesce(UserBalance.transaction_count, 0).label('transactions_count'),
+            'categories': func.coalesce(category_counts.c.count, 0).label('categories_count')
+        }
+        query = session.query(*columns.values()).outerjoin(
+            UserBalance, UserBalance.user_id == cls.id
+        ).outerjoin(
+            category_counts, category_counts.c.user_id == cls.id
+        )
+        return query, columns
+    
+    @staticmethod
+    def _listing_row(row):
+        """One listing row as the dict display_all_users expects"""
+        return {
+            'id': row.id,
+            'name': row.name,
+            'email': row.email,
+            'categories_count': row.categories_count,
+            'transactions_count': row.transactions_count,
+            'balance': row.balance
+        }
     
     @classmethod
-    def find_by_id(cls, user_id):
-        """Find user by ID"""
-        session = get_session()
-        try:
-            user = session.query(cls).filter_by(id=user_id).first()
-            if user:
-                # Create a detached instance with all data loaded
-                detached_user = cls()
-                detached_user.id = user.id
-                detached_user.name = user.name
-                detached_user.email = user.email
-                detached_user.created_at = user.created_at
-                return detached_user
-            return None
-        finally:
-            session.close()
+    def find_by_id(cls, user_id, session=None):
+        """Find user by ID (cached between calls that don't pass a session)"""
+        def load():
+            with session_scope(session) as scope:
+                # get() checks the session's identity map before querying
+                return scope.get(cls, user_id)
+        return user_cache.lookup(('id', user_id), session, load)
     
     @classmethod
-    def find_by_email(cls, email):
-        """Find user by email"""
-        session = get_session()
-        try:
-            user = session.query(cls).filter_by(email=email).first()
-            if user:
-                # Create a detached instance with all data loaded
-                detached_user = cls()
-                detached_user.id = user.id
-                detached_user.name = user.name
-                detached_user.email = user.email
-                detached_user.created_at = user.created_at
-                return detached_user
-            return None
-        finally:
-            session.close()
+    def find_by_email(cls, email, session=None):
+        """Find user by email (cached between calls that don't pass a session)"""
+        def load():
+            with session_scope(session) as scope:
+                return scope.query(cls).filter_by(email=email).first()
+        return user_cache.lookup(('email', email), session, load)
     
-    def delete(self):
-        """Delete this user"""
-        session = get_session()
-        try:
+    @retry_on_busy
+    def delete(self, session=None):
+        """Delete this user, with everything they own (archived transactions too)"""
+        with session_scope(session, write=True, archive=True) as session:
             # Get the user from the current session to avoid detached instance issues
-            user_to_delete = session.query(User).filter_by(id=self.id).first()
+            user_to_delete = session.get(User, self.id)
             if user_to_delete:
-                # The cascade="all, delete-orphan" will automatically delete
-                # related categories and transactions
-                session.delete(user_to_delete)
-                session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
-            
\ No newline at end of file
+                # One DELETE per table, children first, instead of loading every
+                # category and transaction into the session. The foreign keys
+                # cascade as well, so rows added by other code can't be orphaned
+                from .category import Category
+                from .transaction import Transaction
+                from .user_balance import UserBalance
+                from .monthly_rollup import MonthlyRollup
+                for model in (Transaction, MonthlyRollup, UserBalance, Category):
+                    session.query(model).filter_by(user_id=self.id).delete(synchronize_session=False)
+                from .archive import delete_archived
+                delete_archived(session, user_id=self.id)
+                session.query(User).filter_by(id=self.id).delete()
+                # Their categories went with them
+                from .category import category_cache
+                user_cache.invalidate(('id', self.id), ('email', user_to_delete.email))
+                category_cache.clear()
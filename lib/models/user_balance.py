@@ -0,0 +1,136 @@
+# lib/models/user_balance.py
+from sqlalchemy import Column, Integer, ForeignKey, func, case, bindparam, type_coerce
+from . import Base, session_scope
+from .money import Money, MoneyType
+
+class UserBalance(Base):
+    """
+    UserBalance keeps running totals of each user's transactions so balances
+    can be read with a single primary-key lookup instead of summing history.
+    Rows are updated in the same database transaction as every insert or delete
+    of a Transaction; rebuild() recomputes them all from scratch.
+    """
+    __tablename__ = 'user_balances'
+
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    # Sum of positive amounts, in cents
+    income = Column('income_cents', MoneyType, nullable=False, default=0)
+    # Sum of negative amounts, stored as a positive number of cents
+    expenses = Column('expenses_cents', MoneyType, nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserBalance(user_id={self.user_id}, income={self.income}, expenses={self.expenses})>"
+
+    @property
+    def balance(self):
+        """Current balance (income - expenses)"""
+        return self.income - self.expenses
+
+    @classmethod
+    def apply(cls, session, user_id, income=0, expenses=0, count=0):
+        """
+        Add to a user's running totals (pass negative values to subtract).
+        Increments happen in SQL, so concurrent writers can't overwrite each other.
+        """
+        updated = session.execute(APPLY_UPDATE, {
+            'match_user_id': user_id,
+            'delta_income': income, 'delta_expenses': expenses, 'delta_count': count
+        }).rowcount
+        if not updated:
+            # First transaction for this user
+            session.execute(cls.__table__.insert(), {
+                'user_id': user_id, 'income_cents': income, 'expenses_cents': expenses,
+                'transaction_count': count
+            })
+
+    @classmethod
+    def find_by_user(cls, user_id, session=None):
+        """Get the running totals for a user as a dict (zeros if they have no transactions)"""
+        with session_scope(session) as session:
+            row = session.query(cls.income, cls.expenses, cls.transaction_count).filter(
+                cls.user_id == user_id
+            ).first()
+            income, expenses, count = row if row else (Money(0), Money(0), 0)
+            return {
+                'income': income,
+                'expenses': expenses,
+                'balance': income - expenses,
+                'count': count
+            }
+
+    @classmethod
+    def rebuild(cls, session=None):
+        """Recompute every user's totals from the transactions table (archived ones included). Returns the number of rows."""
+        with session_scope(session, write=True, archive=True) as session:
+            from .archive import history
+            transactions = history(session)
+            table = cls.__table__
+            totals = session.query(
+                transactions.user_id,
+                func.sum(case((transactions.amount > 0, transactions.amount), else_=0)),
+                func.sum(case((transactions.amount < 0, -transactions.amount), else_=0)),
+                func.count(transactions.id)
+            ).group_by(transactions.user_id)
+
+            session.execute(table.delete())
+            result = session.execute(
+                table.insert().from_select(
+                    ['user_id', 'income_cents', 'expenses_cents', 'transaction_count'], totals.statement
+                )
+            )
+            return result.rowcount
+
+    @classmethod
+    def check_totals(cls, user_range=None, session=None):
+        """
+        Compare users' running totals with the transactions table (archived ones included), in one query.
+        user_range is an optional inclusive (first_user_id, last_user_id), so a large
+        database can be checked in batches. A missing row counts as all zeros.
+        Returns a list of mismatches.
+        """
+        with session_scope(session) as session:
+            from .user import User
+            from .archive import history
+            transactions = history(session)
+            actual = session.query(
+                transactions.user_id.label('user_id'),
+                func.sum(case((transactions.amount > 0, transactions.amount), else_=0)).label('income'),
+                func.sum(case((transactions.amount < 0, -transactions.amount), else_=0)).label('expenses'),
+                func.count(transactions.id).label('count')
+            )
+            if user_range:
+                actual = actual.filter(transactions.user_id.between(*user_range))
+            actual = actual.group_by(transactions.user_id).subquery()
+            rows = session.query(
+                User.id,
+                cls.income, cls.expenses, cls.transaction_count,
+                type_coerce(actual.c.income, MoneyType), type_coerce(actual.c.expenses, MoneyType), actual.c.count
+            ).outerjoin(cls, cls.user_id == User.id).outerjoin(actual, actual.c.user_id == User.id)
+            if user_range:
+                rows = rows.filter(User.id.between(*user_range))
+
+            mismatches = []
+            for user_id, *values in rows.order_by(User.id).all():
+                stored_income, stored_expenses, stored_count, income, expenses, count = (
+                    value or 0 for value in values
+                )
+                # Amounts are integer cents, so the comparison is exact
+                if (stored_income, stored_expenses, stored_count) != (income, expenses, count):
+                    mismatches.append({
+                        'user_id': user_id,
+                        'stored_income': Money.of(stored_income), 'actual_income': Money.of(income),
+                        'stored_expenses': Money.of(stored_expenses), 'actual_expenses': Money.of(expenses),
+                        'stored_count': stored_count, 'actual_count': count
+                    })
+            return mismatches
+
+# Built once and reused, since apply() runs on every write
+_balances = UserBalance.__table__
+APPLY_UPDATE = _balances.update().where(
+    _balances.c.user_id == bindparam('match_user_id')
+).values(
+    income_cents=_balances.c.income_cents + bindparam('delta_income', type_=MoneyType()),
+    expenses_cents=_balances.c.expenses_cents + bindparam('delta_expenses', type_=MoneyType()),
+    transaction_count=_balances.c.transaction_count + bindparam('delta_count')
+)
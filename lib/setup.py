@@ -15,8 +15,12 @@ source venv/bin/activate
 
 # Install dependencies
 echo "Installing dependencies..."
-pip install sqlalchemy
+pip install sqlalchemy alembic numpy
 
 echo "Setup complete! You can now run the application with:"
 echo "source venv/bin/activate"
 echo "python lib/cli.py"
+echo "or run single commands for scripts and cron jobs, e.g.:"
+echo "python lib/finance.py summary --user you@example.com --json"
+echo "python lib/finance.py maintenance    # statistics, integrity checks, verification, sizes"
+echo "python lib/finance.py archive --older-than-days 365   # move old transactions to cold storage"
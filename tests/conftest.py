@@ -0,0 +1,62 @@
+# tests/conftest.py
+"""
+Shared fixtures. Run from the project root with:
+    python -m pytest
+
+The engine is configured when models is imported, so the database URL is
+pointed at a scratch file first. Every test starts from empty tables and no
+archive file.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB_DIR = os.path.join(ROOT_DIR, 'lib')
+
+WORKDIR = tempfile.mkdtemp(prefix='finance_tests_')
+os.environ['FINANCE_DB_URL'] = f"sqlite:///{os.path.join(WORKDIR, 'test.db')}"
+sys.path.insert(0, LIB_DIR)
+
+from models import Base, engine, create_tables, session_scope  # noqa: E402
+from models.archive import archive_path  # noqa: E402
+from models.cache import clear_caches  # noqa: E402
+from models.user import User  # noqa: E402
+from models.category import Category  # noqa: E402
+
+@pytest.fixture(scope='session', autouse=True)
+def schema():
+    """Build the schema once, through the migrations like a real start"""
+    create_tables()
+    yield
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+def clean_database(schema):
+    """Empty every table, drop the archive file and the caches after each test"""
+    yield
+    with session_scope(write=True) as session:
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+    # Pooled connections keep the archive attached; close them before removing the file
+    engine.dispose()
+    path = archive_path()
+    if path and os.path.exists(path):
+        os.remove(path)
+    clear_caches()
+
+@pytest.fixture
+def user():
+    """A user with two categories, 'Food' and 'Rent'"""
+    user = User.create("Test User", "test@example.com")
+    Category.create("Food", user.id)
+    Category.create("Rent", user.id)
+    return user
+
+@pytest.fixture
+def categories(user):
+    """The user's categories by name"""
+    return {category.name: category for category in Category.find_by_user(user.id)}
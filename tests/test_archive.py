@@ -0,0 +1,127 @@
+# tests/test_archive.py
+"""archive_transactions: rows move to the archive file, history and totals stay the same"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from models import session_scope
+from models.archive import archived_transactions, archive_transactions, get_cutoff, reaches_archive, ArchiveState
+from models.user import User
+from models.category import Category
+from models.transaction import Transaction
+from models.user_balance import UserBalance
+from models.monthly_rollup import MonthlyRollup
+
+FIRST_DAY = datetime(2023, 1, 1, 9, 30)
+CUTOFF = datetime(2023, 7, 1)
+
+@pytest.fixture
+def history(user, categories):
+    """A transaction every three days through 2023, alternating categories"""
+    food, rent = categories['Food'], categories['Rent']
+    Transaction.bulk_create(
+        ({'description': f"Item {i}", 'amount': 100 if i % 10 == 0 else -(i % 7 + 1),
+          'transaction_date': FIRST_DAY + timedelta(days=3 * i),
+          'category_id': (food, rent)[i % 2].id} for i in range(120)),
+        user.id
+    )
+    return Transaction.find_by_user(user.id)
+
+def snapshot(user_id):
+    """Everything a user's screens show, to compare before and after archiving"""
+    pages = []
+    cursor = None
+    while True:
+        transactions, cursor = Transaction.get_page(user_id=user_id, after=cursor, limit=25)
+        pages.extend((t.id, t.transaction_date, t.amount, t.category_id) for t in transactions)
+        if cursor is None:
+            break
+    return {
+        'pages': pages,
+        'summary': User.find_by_id(user_id).summary(),
+        'totals': Transaction.totals(user_id=user_id),
+        'first_half': Transaction.totals(user_id=user_id, start=FIRST_DAY, end=CUTOFF),
+        'report': Category.spending_report(user_id),
+        'months': MonthlyRollup.monthly_totals(user_id),
+    }
+
+def counts():
+    """(live, archived) row counts"""
+    with session_scope(archive=True) as session:
+        live = session.query(func.count(Transaction.id)).scalar()
+        archived = session.execute(select(func.count()).select_from(archived_transactions)).scalar()
+        return live, archived
+
+def test_round_trip_keeps_history_and_totals(user, history):
+    before = snapshot(user.id)
+    old = [t for t in history if t.transaction_date < CUTOFF]
+    progress = []
+
+    moved = archive_transactions(CUTOFF, batch_size=16, progress=progress.append)
+
+    assert moved == len(old)
+    assert progress[-1] == moved
+    assert progress == sorted(progress)
+    assert counts() == (len(history) - len(old), len(old))
+    assert snapshot(user.id) == before
+    assert UserBalance.check_totals() == []
+    assert MonthlyRollup.check_totals() == []
+    assert Category.check_counters() == []
+    with session_scope() as session:
+        assert session.get(ArchiveState, 1).archived_count == moved
+
+def test_running_again_moves_nothing(user, history):
+    moved = archive_transactions(CUTOFF)
+
+    assert archive_transactions(CUTOFF) == 0
+    assert counts()[1] == moved
+
+def test_cutoff_is_only_raised(user, history):
+    archive_transactions(CUTOFF)
+    earlier = CUTOFF - timedelta(days=60)
+
+    assert archive_transactions(earlier) == 0
+    with session_scope() as session:
+        assert get_cutoff(session.connection()) == CUTOFF
+
+    later = CUTOFF + timedelta(days=30)
+    assert archive_transactions(later) == 10
+    with session_scope() as session:
+        assert get_cutoff(session.connection()) == later
+
+def test_recent_ranges_skip_the_archive(user, history):
+    archive_transactions(CUTOFF)
+
+    with session_scope() as session:
+        connection = session.connection()
+        assert not reaches_archive(connection, CUTOFF)
+        assert not reaches_archive(connection, CUTOFF + timedelta(days=1))
+        assert reaches_archive(connection, CUTOFF - timedelta(seconds=1))
+        assert reaches_archive(connection, None)
+
+    recent = Transaction.find_by_user(user.id, start=CUTOFF)
+    assert recent and all(t.transaction_date >= CUTOFF for t in recent)
+    assert len(Transaction.find_by_user(user.id)) == len(history)
+
+def test_new_ids_stay_above_archived_ones(user, history):
+    newest_id = max(t.id for t in history)
+    # Archive everything, so the live table is empty and SQLite could hand out old IDs again
+    archive_transactions(datetime(2030, 1, 1))
+    assert counts() == (0, len(history))
+
+    transaction = Transaction.create("After archiving", -5, user.id, transaction_date=datetime(2024, 6, 1))
+
+    assert transaction.id > newest_id
+    assert len({t.id for t in Transaction.find_by_user(user.id)}) == len(history) + 1
+
+def test_deleting_a_category_removes_its_archived_rows(user, categories, history):
+    archive_transactions(CUTOFF)
+    food = categories['Food']
+
+    Category.find_by_id(food.id).delete()
+
+    assert all(t.category_id != food.id for t in Transaction.find_by_user(user.id))
+    assert UserBalance.check_totals() == []
+    assert MonthlyRollup.check_totals() == []
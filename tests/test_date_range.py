@@ -0,0 +1,77 @@
+# tests/test_date_range.py
+"""Date ranges from the prompts and the command line include the whole end day"""
+
+import argparse
+from datetime import datetime
+
+import pytest
+
+import finance
+import helpers
+from models.transaction import Transaction
+from models.category import Category
+
+LAST_MOMENT = datetime(2024, 3, 31, 23, 59, 59, 500000)
+
+@pytest.fixture
+def month(user, categories):
+    """Transactions on the edges of March 2024"""
+    food = categories['Food']
+    for description, date in (
+        ("Before", datetime(2024, 2, 29, 23, 59, 59, 999999)),
+        ("First", datetime(2024, 3, 1)),
+        ("Last", LAST_MOMENT),
+        ("After", datetime(2024, 4, 1)),
+    ):
+        Transaction.create(description, -10, user.id, food.id, transaction_date=date)
+    return user
+
+def answer(monkeypatch, *answers):
+    replies = iter(answers)
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(replies))
+
+def descriptions(transactions):
+    return sorted(t.description for t in transactions)
+
+def test_prompted_range_includes_the_whole_end_day(monkeypatch, month):
+    answer(monkeypatch, "2024-03-01", "2024-03-31")
+
+    start, end = helpers.ask_date_range()
+
+    assert start == datetime(2024, 3, 1)
+    assert end == datetime(2024, 3, 31, 23, 59, 59, 999999)
+    assert descriptions(Transaction.find_by_user(month.id, start=start, end=end)) == ["First", "Last"]
+    assert Transaction.totals(user_id=month.id, start=start, end=end)['count'] == 2
+
+def test_prompted_range_bounds_are_optional(monkeypatch, month):
+    answer(monkeypatch, "", "2024-03-31")
+
+    start, end = helpers.ask_date_range()
+
+    assert start is None
+    assert descriptions(Transaction.find_by_user(month.id, start=start, end=end)) == ["Before", "First", "Last"]
+
+def test_prompt_asks_again_after_a_bad_date(monkeypatch, capsys):
+    answer(monkeypatch, "31/03/2024", "2024-03-31", "")
+
+    assert helpers.ask_date_range() == (datetime(2024, 3, 31), None)
+    assert "YYYY-MM-DD" in capsys.readouterr().out
+
+def test_until_option_includes_the_whole_day(month):
+    args = argparse.Namespace(since=finance.parse_date("2024-03-01"), until=finance.parse_date("2024-03-31"), days=None)
+
+    start, end = finance.date_range(args)
+
+    assert end == datetime(2024, 3, 31, 23, 59, 59, 999999)
+    transactions, _ = Transaction.get_page(user_id=month.id, start=start, end=end)
+    assert descriptions(transactions) == ["First", "Last"]
+    report = {row['name']: row for row in Category.spending_report(month.id, start, end)}
+    assert report['Food']['transactions_count'] == 2
+
+def test_days_option_starts_at_midnight():
+    args = argparse.Namespace(since=None, until=None, days=1)
+
+    start, end = finance.date_range(args)
+
+    assert start == datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    assert end is None
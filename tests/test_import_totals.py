@@ -0,0 +1,81 @@
+# tests/test_import_totals.py
+"""Bulk imports keep the running totals (balances, monthly rollups, category counters) exact"""
+
+from datetime import datetime
+
+import pytest
+
+from importer import import_statement
+from models.money import Money
+from models.user import User
+from models.category import Category
+from models.transaction import Transaction
+from models.user_balance import UserBalance
+from models.monthly_rollup import MonthlyRollup
+
+STATEMENT = """\
+Date,Description,Amount,Category
+2024-01-03,Salary,2500.00,
+2024-01-05,Groceries,-45.10,Food
+2024-01-20,Rent,-900.00,Rent
+2024-02-02,Coffee,-3.35,Food
+2024-02-03,Refund,12.05,Food
+2024-02-28,Rent,-900.00,Rent
+"""
+
+def assert_totals_consistent():
+    """Every running total agrees with the transactions it summarises"""
+    assert UserBalance.check_totals() == []
+    assert MonthlyRollup.check_totals() == []
+    assert Category.check_counters() == []
+
+def write_statement(tmp_path, text):
+    path = tmp_path / 'statement.csv'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_import_updates_running_totals(tmp_path, user, categories):
+    Transaction.create("Opening balance", 100, user.id, transaction_date=datetime(2023, 12, 31))
+
+    result = import_statement(write_statement(tmp_path, STATEMENT), user.id)
+
+    assert result['rows'] == 6
+    assert_totals_consistent()
+    summary = User.find_by_id(user.id).summary()
+    assert summary['income'] == Money.parse('2612.05')
+    assert summary['expenses'] == Money.parse('1848.45')
+    assert summary['balance'] == Money.parse('763.60')
+    assert summary['count'] == 7
+    assert summary == Transaction.totals(user_id=user.id)
+
+    months = {row['year_month']: row for row in MonthlyRollup.monthly_totals(user.id)}
+    assert months['2024-01']['net'] == Money.parse('1554.90')
+    assert months['2024-02']['net'] == Money.parse('-891.30')
+    assert months['2024-02']['count'] == 3
+
+    food = Category.find_by_id(categories['Food'].id)
+    assert food.spent == Money.parse('48.45')
+    assert food.transaction_count == 3
+
+def test_bad_row_imports_nothing(tmp_path, user, categories):
+    statement = STATEMENT + "2024-03-01,Mystery,-5.00,Unknown\n"
+
+    with pytest.raises(ValueError, match="Unknown category"):
+        import_statement(write_statement(tmp_path, statement), user.id)
+
+    assert Transaction.totals(user_id=user.id)['count'] == 0
+    assert User.find_by_id(user.id).summary()['count'] == 0
+    assert_totals_consistent()
+
+def test_bulk_create_in_several_chunks(user, categories):
+    rent = categories['Rent']
+    rows = [
+        {'description': f"Payment {i}", 'amount': Money.parse('-10.01') if i % 3 else Money.parse('20.00'),
+         'transaction_date': datetime(2024, 1 + i % 12, 1 + i % 28), 'category_id': rent.id if i % 2 else None}
+        for i in range(250)
+    ]
+
+    assert Transaction.bulk_create(iter(rows), user.id, chunk_size=64) == 250
+
+    assert_totals_consistent()
+    assert User.find_by_id(user.id).summary() == Transaction.totals(user_id=user.id)
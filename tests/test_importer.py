@@ -0,0 +1,70 @@
+# tests/test_importer.py
+"""Statement parsers: CSV and OFX (SGML and XML) lines to transaction rows"""
+
+from datetime import datetime
+
+import pytest
+
+from importer import parse_csv, parse_ofx
+from models.money import Money
+
+SGML_STATEMENT = """\
+OFXHEADER:100
+DATA:OFXSGML
+
+<OFX>
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20240106
+<TRNAMT>-4.50
+<FITID>1001
+<NAME>Coffee &amp; Co
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20240107120000[-5:EST]
+<TRNAMT>1200.00
+<FITID>1002
+<MEMO>Salary &lt;January&gt;
+</STMTTRN>
+</BANKTRANLIST>
+</OFX>
+"""
+
+XML_STATEMENT = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240108</DTPOSTED><TRNAMT>-12.00</TRNAMT><NAME>Fish &amp; Chips</NAME></STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+
+def test_sgml_records_without_closing_tags():
+    rows = list(parse_ofx(SGML_STATEMENT.splitlines(keepends=True)))
+
+    assert rows == [
+        {'transaction_date': datetime(2024, 1, 6), 'description': "Coffee & Co", 'amount': Money(-450)},
+        {'transaction_date': datetime(2024, 1, 7, 12, 0), 'description': "Salary <January>",
+         'amount': Money(120000)},
+    ]
+
+def test_xml_entities_are_decoded():
+    rows = list(parse_ofx(XML_STATEMENT.splitlines(keepends=True)))
+
+    assert [row['description'] for row in rows] == ["Fish & Chips"]
+    assert rows[0]['amount'] == Money(-1200)
+
+def test_ofx_record_without_amount_is_rejected():
+    lines = ["<STMTTRN>\n", "<DTPOSTED>20240106\n", "<FITID>77\n", "</STMTTRN>\n"]
+
+    with pytest.raises(ValueError, match="77 is missing"):
+        list(parse_ofx(lines))
+
+def test_csv_rows_with_categories():
+    lines = ["Date,Description,Amount,Category\n", "2024-01-05,Bread & Milk,-3.20,food\n", "2024-01-06,Pay,10,\n"]
+
+    rows = list(parse_csv(lines, {'food': 7}))
+
+    assert rows[0] == {'transaction_date': datetime(2024, 1, 5), 'description': "Bread & Milk",
+                       'amount': Money(-320), 'category_id': 7}
+    assert 'category_id' not in rows[1]
@@ -0,0 +1,18 @@
+# tests/test_migrations.py
+"""The migrations build exactly the schema the models describe"""
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from models import engine, MIGRATIONS_DIR
+
+def test_autogenerate_finds_nothing_at_head():
+    config = Config()
+    config.set_main_option('script_location', MIGRATIONS_DIR)
+    with engine.connect() as connection:
+        # The search index is left out of the comparison rather than dropped
+        assert 'transactions_fts' in inspect(connection).get_table_names()
+        config.attributes['connection'] = connection
+        # Raises AutogenerateDiffsDetected if the models and the database differ
+        command.check(config)
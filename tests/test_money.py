@@ -0,0 +1,40 @@
+# tests/test_money.py
+"""Money: exact equality and hashing, ordering against Money and plain numbers"""
+
+from decimal import Decimal
+
+import pytest
+
+from models.money import Money
+
+def test_ordering_against_floats():
+    amount = Money(150)  # $1.50
+
+    assert not amount < 1.5 and amount <= 1.5 and not amount > 1.5 and amount >= 1.5
+    assert amount < 1.51 and amount <= 1.51 and not amount > 1.51 and not amount >= 1.51
+    assert not amount < 1.49 and not amount <= 1.49 and amount > 1.49 and amount >= 1.49
+
+def test_reflected_ordering_against_floats():
+    amount = Money(150)
+
+    assert 1.49 < amount and 1.5 <= amount and 1.51 > amount and 1.5 >= amount
+    assert not 1.5 < amount and not 1.5 > amount
+
+@pytest.mark.parametrize('other', [Money(150), Decimal('1.50'), 1.5, '1.50'])
+def test_ordering_against_equal_values(other):
+    amount = Money(150)
+
+    assert amount <= other and amount >= other
+    assert not amount < other and not amount > other
+
+def test_ordering_against_ints_and_money():
+    assert Money(100) < 2 and Money(300) > 2 and Money(200) >= 2 and Money(200) <= 2
+    assert Money(-5) < Money(0) <= Money(0) < Money(5)
+    assert sorted([Money(300), Money(-100), Money(0)]) == [Money(-100), Money(0), Money(300)]
+
+def test_equality_is_exact_and_consistent_with_hash():
+    assert Money(100) == 1 == Decimal('1.00')
+    assert hash(Money(100)) == hash(1) == hash(Decimal('1.00'))
+    assert Money(150) != 1.5
+    assert Money(0) != False  # noqa: E712
+    assert len({Money(100), Money(100), 1}) == 1
@@ -0,0 +1,73 @@
+# tests/test_paging.py
+"""Transaction.get_page: keyset pages are complete, never overlap and keep a stable order"""
+
+from datetime import datetime, timedelta
+
+from models.transaction import Transaction
+
+def add_transactions(user, dates):
+    """Insert one transaction per date through bulk_create"""
+    Transaction.bulk_create(
+        ({'description': f"Item {i}", 'amount': -(i + 1), 'transaction_date': date} for i, date in enumerate(dates)),
+        user.id
+    )
+
+def all_pages(limit, **filters):
+    """Follow the cursors to the end; returns the list of pages (lists of IDs)"""
+    pages = []
+    cursor = None
+    while True:
+        transactions, cursor = Transaction.get_page(after=cursor, limit=limit, **filters)
+        pages.append([transaction.id for transaction in transactions])
+        if cursor is None:
+            return pages
+
+def expected_order(**filters):
+    """IDs newest first, ties on the date broken by the higher ID first"""
+    transactions = Transaction.find_by_user(**filters)
+    return [t.id for t in sorted(transactions, key=lambda t: (t.transaction_date, t.id), reverse=True)]
+
+def test_pages_cover_everything_once_in_order(user):
+    base = datetime(2024, 3, 1, 12, 0)
+    # Groups of transactions share a date, so the cursor has to break ties on the ID
+    add_transactions(user, [base - timedelta(days=i // 4) for i in range(23)])
+
+    pages = all_pages(5, user_id=user.id)
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    ids = [transaction_id for page in pages for transaction_id in page]
+    assert len(ids) == len(set(ids)) == 23
+    assert ids == expected_order(user_id=user.id)
+
+def test_last_full_page_has_no_cursor(user):
+    add_transactions(user, [datetime(2024, 3, 1)] * 4)
+
+    transactions, cursor = Transaction.get_page(user_id=user.id, limit=4)
+
+    assert len(transactions) == 4
+    assert cursor is None
+
+def test_pages_stay_within_date_range(user):
+    base = datetime(2024, 3, 1, 12, 0)
+    add_transactions(user, [base + timedelta(hours=6 * i) for i in range(40)])
+    start, end = datetime(2024, 3, 3), datetime(2024, 3, 6, 23, 59, 59, 999999)
+
+    pages = all_pages(3, user_id=user.id, start=start, end=end)
+
+    ids = [transaction_id for page in pages for transaction_id in page]
+    assert ids == expected_order(user_id=user.id, start=start, end=end)
+    assert len(ids) == 16
+
+def test_pages_filter_by_category(user, categories):
+    food = categories['Food']
+    Transaction.bulk_create(
+        ({'description': f"Item {i}", 'amount': -1, 'transaction_date': datetime(2024, 3, 1),
+          'category_id': food.id if i % 2 else None} for i in range(10)),
+        user.id
+    )
+
+    pages = all_pages(2, category_id=food.id)
+
+    ids = [transaction_id for page in pages for transaction_id in page]
+    assert ids == sorted((t.id for t in Transaction.find_by_category(food.id)), reverse=True)
+    assert len(ids) == 5
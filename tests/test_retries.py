@@ -0,0 +1,111 @@
+# tests/test_retries.py
+"""call_with_retries / retry_on_busy: locked-database errors are retried, everything else is not"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+import models
+from models import engine, call_with_retries, retry_on_busy, session_scope
+from models.user import User
+
+def operational_error(message):
+    return OperationalError("INSERT INTO users ...", {}, sqlite3.OperationalError(message))
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Record the backoff delays instead of sleeping"""
+    delays = []
+    monkeypatch.setattr(models.time, 'sleep', delays.append)
+    return delays
+
+class Flaky:
+    """Callable that raises the given error for its first `failures` calls"""
+
+    def __init__(self, failures, message="database is locked"):
+        self.failures = failures
+        self.message = message
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise operational_error(self.message)
+        return args, kwargs
+
+def test_busy_errors_are_retried_with_backoff(no_backoff):
+    func = Flaky(3)
+
+    assert call_with_retries(func, 1, key='value', attempts=5) == ((1,), {'key': 'value'})
+
+    assert func.calls == 4
+    assert len(no_backoff) == 3
+    # Doubling delays with up to 50% jitter either way
+    for attempt, delay in enumerate(no_backoff):
+        base = models.RETRY_BASE_DELAY * 2 ** attempt
+        assert base * 0.5 <= delay <= base * 1.5
+
+def test_database_busy_is_retried_too():
+    func = Flaky(1, "database is busy")
+
+    call_with_retries(func, attempts=3)
+
+    assert func.calls == 2
+
+def test_gives_up_after_the_last_attempt():
+    func = Flaky(10)
+
+    with pytest.raises(OperationalError, match="database is locked"):
+        call_with_retries(func, attempts=3)
+
+    assert func.calls == 3
+
+def test_other_errors_are_not_retried(no_backoff):
+    func = Flaky(1, "no such table: users")
+
+    with pytest.raises(OperationalError, match="no such table"):
+        call_with_retries(func, attempts=5)
+
+    assert func.calls == 1
+    assert no_backoff == []
+
+def test_retry_on_busy_only_retries_its_own_unit_of_work():
+    in_caller = Flaky(1)
+    with pytest.raises(OperationalError):
+        retry_on_busy(in_caller)(session='caller session')
+    assert in_caller.calls == 1
+
+    own = Flaky(1)
+    assert retry_on_busy(own)(1) == ((1,), {})
+    assert own.calls == 2
+
+@pytest.fixture
+def locked_once():
+    """Make the next INSERT INTO users fail as if another process held the write lock"""
+    state = {'failed': False}
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO users") and not state['failed']:
+            state['failed'] = True
+            raise sqlite3.OperationalError("database is locked")
+
+    event.listen(engine, 'before_cursor_execute', before_execute)
+    yield state
+    event.remove(engine, 'before_cursor_execute', before_execute)
+
+def test_model_write_is_retried_after_rollback(locked_once):
+    user = User.create("Retry", "retry@example.com")
+
+    assert locked_once['failed']
+    # The failed attempt was rolled back, so the user exists exactly once
+    assert [u['email'] for u in User.get_all()] == ["retry@example.com"]
+    assert User.find_by_id(user.id).name == "Retry"
+
+def test_model_write_in_callers_session_is_not_retried(locked_once):
+    with pytest.raises(OperationalError, match="database is locked"):
+        with session_scope(write=True) as session:
+            User.create("Retry", "retry@example.com", session=session)
+
+    assert User.get_all() == []